@@ -0,0 +1,112 @@
+from collections import deque
+from typing import Dict, Iterator, List, Set, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase and collapse every run of non-alphanumerics into one space,
+    so "Self-Harm!!" scans the same as "self harm".
+    """
+    return " ".join("".join(ch if ch.isalnum() else " " for ch in text.lower()).split())
+
+
+# =========================
+# ✅ MULTI-PATTERN AUTOMATON (AHO-CORASICK)
+# =========================
+class KeywordAutomaton:
+    """
+    One linear pass over normalized text finds every term, independent of
+    how many terms are loaded. Used by the guardrails and the place
+    recognizer. A term written with a trailing "*" ("terror*") is a
+    prefix: it matches any word that starts with it.
+    """
+
+    def __init__(self, terms, allow_plural: bool = False):
+        self.allow_plural = allow_plural
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        self._prefix: Set[str] = set()
+
+        for term in terms:
+            prefix = term.rstrip().endswith("*")
+            term = normalize_text(term)
+            if term:
+                self._add(term)
+                if prefix:
+                    self._prefix.add(term)
+
+        self._build_failure_links()
+
+    def _add(self, term: str):
+        node = 0
+        for ch in term:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if term not in self._out[node]:
+            self._out[node].append(term)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yields (start, end, term) for whole-word matches in normalized
+        text: "sex" does not fire inside "Sussex" and "gun" does not fire
+        inside "gunfire". With allow_plural a trailing "s" is accepted.
+        Prefix terms must start a word and extend to the end of it
+        ("terror*" matches "terrorist", never "anti terror" inside a word).
+        """
+        node = 0
+        n = len(text)
+
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+
+            for term in self._out[node]:
+                start = i - len(term) + 1
+                if start > 0 and text[start - 1] != " ":
+                    continue
+
+                end = i + 1
+                if term in self._prefix:
+                    while end < n and text[end] != " ":
+                        end += 1
+                    yield start, end, term
+                    continue
+
+                if self.allow_plural and end < n and text[end] == "s":
+                    end += 1
+                if end < n and text[end] != " ":
+                    continue
+
+                yield start, end, term
+
+    def find(self, text: str, first_only: bool = False) -> List[str]:
+        matches = []
+        for _, _, term in self.iter_matches(text):
+            matches.append(term)
+            if first_only:
+                break
+        return matches
@@ -0,0 +1,314 @@
+import argparse
+import csv
+import heapq
+import json
+import shutil
+import time as clock
+from pathlib import Path
+
+import numpy as np
+
+# =========================
+# ✅ PATHS
+# =========================
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+GRAPH_DIR = PROJECT_ROOT / "backend" / "data" / "road_graph"
+
+CELL_DEG = 0.05            # ✅ snapping grid cell (~5.5 km)
+MAX_SPEED_KMPH = 110.0
+
+# ✅ Free-flow speeds by OSM highway class when the edge has no maxspeed
+HIGHWAY_SPEEDS = {
+    "motorway": 100, "motorway_link": 60,
+    "trunk": 80, "trunk_link": 50,
+    "primary": 65, "primary_link": 45,
+    "secondary": 55, "secondary_link": 40,
+    "tertiary": 45, "tertiary_link": 35,
+    "unclassified": 35, "residential": 25, "service": 15,
+}
+DEFAULT_SPEED = 40
+
+_TRUE = {"yes", "1", "true", "-1"}
+
+# ✅ Witness searches stop after this many nodes; a miss only adds a spare shortcut
+WITNESS_SETTLED = 60
+
+_INF = float("inf")
+
+
+# =========================
+# ✅ READ CSV EXTRACT
+# =========================
+def _speed(row) -> float:
+    raw = (row.get("maxspeed") or "").split()[0:1]
+    try:
+        speed = float(raw[0]) if raw else 0.0
+    except ValueError:
+        speed = 0.0
+    if speed <= 0:
+        speed = HIGHWAY_SPEEDS.get(row.get("highway", ""), DEFAULT_SPEED)
+    return min(speed, MAX_SPEED_KMPH)
+
+
+def read_extract(nodes_csv: Path, edges_csv: Path):
+    """
+    nodes.csv: id,lat,lon
+    edges.csv: u,v,length_m[,highway][,maxspeed][,oneway]
+    (e.g. exported from an OSM .pbf with osmium / pyrosm). Ways are
+    two-way unless oneway is yes/1/true; "-1" means reversed one-way.
+    """
+    ids, lats, lons = {}, [], []
+    with open(nodes_csv, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            ids[row["id"]] = len(lats)
+            lats.append(float(row["lat"]))
+            lons.append(float(row["lon"]))
+
+    src, dst, length, time = [], [], [], []
+
+    def add(u, v, meters, seconds):
+        src.append(u)
+        dst.append(v)
+        length.append(meters)
+        time.append(seconds)
+
+    with open(edges_csv, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            u, v = ids.get(row["u"]), ids.get(row["v"])
+            if u is None or v is None or u == v:
+                continue
+
+            meters = float(row["length_m"])
+            seconds = meters / (_speed(row) / 3.6)
+            oneway = (row.get("oneway") or "").strip().lower()
+
+            if oneway == "-1":
+                add(v, u, meters, seconds)
+                continue
+            add(u, v, meters, seconds)
+            if oneway not in _TRUE:
+                add(v, u, meters, seconds)
+
+    return (
+        np.array(lats, dtype="float32"),
+        np.array(lons, dtype="float32"),
+        np.array(src, dtype="int64"),
+        np.array(dst, dtype="int64"),
+        np.array(length, dtype="float32"),
+        np.array(time, dtype="float32"),
+    )
+
+
+# =========================
+# ✅ CSR + GRID
+# =========================
+def to_csr(n: int, src, dst, length, time):
+    order = np.argsort(src, kind="stable")
+    offsets = np.zeros(n + 1, dtype="int64")
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+    return offsets, dst[order].astype("int32"), time[order], length[order]
+
+
+# =========================
+# ✅ CONTRACTION HIERARCHY (LONG ROUTES WITHOUT OSRM)
+# =========================
+def _witness_costs(out_adj, source: int, skip: int, limit: float, targets) -> dict:
+    """Travel times from source avoiding `skip`, up to `limit` (a bounded Dijkstra)."""
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    remaining = set(targets)
+    settled = 0
+
+    while heap and remaining and settled < WITNESS_SETTLED:
+        d, x = heapq.heappop(heap)
+        if d > dist[x]:
+            continue
+        if d > limit:
+            break
+        settled += 1
+        remaining.discard(x)
+        for y, (t, _, _) in out_adj[x].items():
+            nd = d + t
+            if y != skip and nd < dist.get(y, _INF):
+                dist[y] = nd
+                heapq.heappush(heap, (nd, y))
+    return dist
+
+
+def _shortcuts(out_adj, in_adj, v: int) -> list:
+    """(u, w, time, length) shortcuts needed to take v out of the graph."""
+    outs = out_adj[v]
+    if not outs:
+        return []
+
+    longest_out = max(t for t, _, _ in outs.values())
+    found = []
+    for u, (tu, lu, _) in in_adj[v].items():
+        dist = _witness_costs(out_adj, u, v, tu + longest_out, outs.keys())
+        for w, (tw, lw, _) in outs.items():
+            if w != u and dist.get(w, _INF) > tu + tw:
+                found.append((u, w, tu + tw, lu + lw))
+    return found
+
+
+def contract(n: int, src, dst, length, time):
+    """
+    Orders the nodes by edge difference (shortcuts added minus edges
+    removed, plus contracted neighbours, updated lazily) and contracts
+    them one by one. Every route then climbs to higher-ranked nodes and
+    comes back down, so a query searches upward from both ends only.
+
+    Returns the upward edges (u → higher v) and the downward edges kept
+    at their lower end (v ← higher u, for the backward search), each as
+    (src, dst, time, length, mid) arrays; mid is the contracted node a
+    shortcut bypasses, -1 for a road.
+    """
+    out_adj = [dict() for _ in range(n)]
+    in_adj = [dict() for _ in range(n)]
+    for u, v, meters, seconds in zip(src.tolist(), dst.tolist(), length.tolist(), time.tolist()):
+        if seconds < out_adj[u].get(v, (_INF,))[0]:
+            out_adj[u][v] = in_adj[v][u] = (seconds, meters, -1)
+
+    gone_neighbours = [0] * n
+
+    def priority(v: int, shortcuts: list) -> int:
+        return len(shortcuts) - len(out_adj[v]) - len(in_adj[v]) + gone_neighbours[v]
+
+    heap = [(priority(v, _shortcuts(out_adj, in_adj, v)), v) for v in range(n)]
+    heapq.heapify(heap)
+
+    up, down = [], []
+    started = clock.perf_counter()
+    done = 0
+
+    while heap:
+        _, v = heapq.heappop(heap)
+        shortcuts = _shortcuts(out_adj, in_adj, v)
+        p = priority(v, shortcuts)
+        if heap and p > heap[0][0]:
+            heapq.heappush(heap, (p, v))
+            continue
+
+        for u, w, seconds, meters in shortcuts:
+            if seconds < out_adj[u].get(w, (_INF,))[0]:
+                out_adj[u][w] = in_adj[w][u] = (seconds, meters, v)
+
+        # Edges still attached to v lead to nodes contracted later (higher rank)
+        for w, (seconds, meters, mid) in out_adj[v].items():
+            up.append((v, w, seconds, meters, mid))
+            del in_adj[w][v]
+            gone_neighbours[w] += 1
+        for u, (seconds, meters, mid) in in_adj[v].items():
+            down.append((v, u, seconds, meters, mid))
+            del out_adj[u][v]
+            gone_neighbours[u] += 1
+        out_adj[v] = in_adj[v] = {}
+
+        done += 1
+        if done % 100_000 == 0:
+            print(f"   ... {done} / {n} nodes contracted ({clock.perf_counter() - started:.0f} s)")
+
+    def columns(edges):
+        s, d, t, m, mid = zip(*edges) if edges else ((),) * 5
+        return (
+            np.array(s, dtype="int64"), np.array(d, dtype="int64"),
+            np.array(m, dtype="float32"), np.array(t, dtype="float32"), np.array(mid, dtype="int32"),
+        )
+
+    return columns(up), columns(down)
+
+
+def to_ch_csr(n: int, src, dst, length, time, mid):
+    order = np.argsort(src, kind="stable")
+    offsets, targets, time_s, length_m = to_csr(n, src, dst, length, time)
+    return offsets, targets, time_s, length_m, mid[order]
+
+
+def build_grid(lat, lon, cell_deg: float):
+    cols = int(round(360 / cell_deg))
+    rows = np.floor((lat.astype("float64") + 90) / cell_deg).astype("int64")
+    cells = np.floor((lon.astype("float64") + 180) / cell_deg).astype("int64")
+    keys = rows * cols + cells % cols
+
+    order = np.argsort(keys, kind="stable")
+    cell_keys, starts = np.unique(keys[order], return_index=True)
+    cell_start = np.append(starts, len(keys)).astype("int64")
+    return cell_keys, cell_start, order.astype("int32")
+
+
+def build_road_graph(
+    nodes_csv: Path,
+    edges_csv: Path,
+    out_dir: Path = GRAPH_DIR,
+    cell_deg: float = CELL_DEG,
+    hierarchy: bool = True,
+):
+    print("📂 NODES:", nodes_csv)
+    print("📂 EDGES:", edges_csv)
+
+    lat, lon, src, dst, length, time = read_extract(nodes_csv, edges_csv)
+    n = len(lat)
+
+    arrays = {"node_lat": lat, "node_lon": lon}
+    arrays["offsets"], arrays["targets"], arrays["time_s"], arrays["length_m"] = to_csr(n, src, dst, length, time)
+    arrays["rev_offsets"], arrays["rev_targets"], arrays["rev_time_s"], arrays["rev_length_m"] = to_csr(
+        n, dst, src, length, time
+    )
+    arrays["cell_keys"], arrays["cell_start"], arrays["cell_nodes"] = build_grid(lat, lon, cell_deg)
+
+    shortcuts = 0
+    if hierarchy:
+        print("⚡ Contracting the graph...")
+        started = clock.perf_counter()
+        up, down = contract(n, src, dst, length, time)
+        for prefix, edges in (("up", up), ("down", down)):
+            (
+                arrays[f"{prefix}_offsets"], arrays[f"{prefix}_targets"], arrays[f"{prefix}_time_s"],
+                arrays[f"{prefix}_length_m"], arrays[f"{prefix}_mid"],
+            ) = to_ch_csr(n, *edges)
+        shortcuts = int((up[4] >= 0).sum() + (down[4] >= 0).sum())
+        print(f"   {shortcuts} shortcuts in {clock.perf_counter() - started:.0f} s")
+
+    # Write next to the target and swap directories, so a running server
+    # never maps a half-written graph
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    for name, array in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array))
+    (tmp_dir / "meta.json").write_text(json.dumps({
+        "nodes": n,
+        "edges": int(len(src)),
+        "cell_deg": cell_deg,
+        "max_speed_kmph": MAX_SPEED_KMPH,
+        "hierarchy": hierarchy,
+        "shortcuts": shortcuts,
+    }))
+
+    old_dir = out_dir.with_name(out_dir.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if out_dir.exists():
+        out_dir.rename(old_dir)
+    tmp_dir.rename(out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    size_mb = sum(p.stat().st_size for p in out_dir.glob("*.npy")) / 1e6
+    print(f"✅ ROAD GRAPH BUILT: {n} nodes, {len(src)} directed edges, {size_mb:.1f} MB")
+    print("📁 Directory:", out_dir)
+
+
+# =========================
+# ✅ RUN
+# =========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the local road graph from a CSV road extract")
+    parser.add_argument("--nodes", type=Path, required=True, help="nodes.csv (id,lat,lon)")
+    parser.add_argument("--edges", type=Path, required=True, help="edges.csv (u,v,length_m,highway,maxspeed,oneway)")
+    parser.add_argument("--out", type=Path, default=GRAPH_DIR)
+    parser.add_argument("--cell-deg", type=float, default=CELL_DEG)
+    parser.add_argument("--no-hierarchy", action="store_true",
+                        help="skip the contraction hierarchy (long routes then go to OSRM)")
+    args = parser.parse_args()
+
+    build_road_graph(args.nodes, args.edges, args.out, args.cell_deg, not args.no_hierarchy)
@@ -0,0 +1,343 @@
+import argparse
+import csv
+import io
+import json
+import math
+import shutil
+import zipfile
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# =========================
+# ✅ PATHS
+# =========================
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+TRANSIT_DIR = PROJECT_ROOT / "backend" / "data" / "transit"
+
+WALK_RADIUS_M = 400        # ✅ stops this close get a precomputed walking transfer
+WALK_SPEED_MS = 1.2
+MIN_TRANSFER_S = 120       # ✅ floor for a walking transfer (finding the platform)
+CALENDAR_MAX_DAYS = 731    # ✅ service days kept per trip (two years from the first)
+
+# GTFS route_type → pattern mode (0 bus, 1 train); extended types by hundreds
+_RAIL_TYPES = {1, 2, 12}
+
+
+def _mode(route_type: str) -> int:
+    value = int(route_type or 3)
+    if value in _RAIL_TYPES or 100 <= value < 200 or 400 <= value < 500:
+        return 1
+    return 0
+
+
+def _seconds(hms: str) -> int:
+    # GTFS times may pass 24:00:00 for trips running after midnight
+    h, m, s = (int(part) for part in hms.strip().split(":"))
+    return h * 3600 + m * 60 + s
+
+
+# =========================
+# ✅ GTFS READER (DIRECTORY OR .zip)
+# =========================
+class _Feed:
+    def __init__(self, path: Path):
+        self.path = path
+        self.zip = zipfile.ZipFile(path) if path.suffix == ".zip" else None
+
+    def rows(self, name: str, required: bool = True):
+        if self.zip is not None:
+            if name not in self.zip.namelist():
+                if required:
+                    raise RuntimeError(f"GTFS feed has no {name}")
+                return
+            with self.zip.open(name) as raw:
+                yield from csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig"))
+            return
+
+        file = self.path / name
+        if not file.exists():
+            if required:
+                raise RuntimeError(f"GTFS feed has no {name}")
+            return
+        with open(file, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+
+
+def _gtfs_date(yyyymmdd: str) -> date:
+    text = yyyymmdd.strip()
+    return date(int(text[:4]), int(text[4:6]), int(text[6:8]))
+
+
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def _service_days(calendar_rows, date_rows):
+    """
+    service_id → set of dates it runs, from calendar.txt weekday ranges
+    plus calendar_dates.txt exceptions (1 added, 2 removed).
+    """
+    days = defaultdict(set)
+    for row in calendar_rows:
+        weekdays = [row.get(name, "0").strip() == "1" for name in _WEEKDAYS]
+        day, end = _gtfs_date(row["start_date"]), _gtfs_date(row["end_date"])
+        while day <= end:
+            if weekdays[day.weekday()]:
+                days[row["service_id"]].add(day)
+            day += timedelta(days=1)
+
+    for row in date_rows:
+        day = _gtfs_date(row["date"])
+        if row["exception_type"].strip() == "1":
+            days[row["service_id"]].add(day)
+        else:
+            days[row["service_id"]].discard(day)
+    return days
+
+
+def _calendar_bits(trip_services, service_days):
+    """
+    One bit per trip and day from the first service day, packed 8 days
+    per byte. Trips of a feed without calendar files (service None) run
+    every day. Returns (first day, days, bits), or (None, 0, None) when
+    no feed has a calendar.
+    """
+    all_days = set().union(*service_days.values()) if service_days else set()
+    if not all_days:
+        return None, 0, None
+
+    first = min(all_days)
+    n_days = min((max(all_days) - first).days + 1, CALENDAR_MAX_DAYS)
+
+    rows = {None: np.ones(n_days, dtype=bool)}
+    for service, days in service_days.items():
+        row = np.zeros(n_days, dtype=bool)
+        offsets = [(day - first).days for day in days]
+        row[[o for o in offsets if o < n_days]] = True
+        rows[service] = row
+
+    missing = np.zeros(n_days, dtype=bool)    # service_id in no calendar: never runs
+    bits = np.array([rows.get(service, missing) for service in trip_services], dtype=bool).reshape(-1, n_days)
+    return first, n_days, np.packbits(bits, axis=1)
+
+
+def _offsets(counts) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype="int64")
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def build_transit(feeds, out_dir: Path = TRANSIT_DIR):
+    stop_index, stop_names, stop_lat, stop_lon = {}, [], [], []
+    route_index, route_names, route_mode, route_fare = {}, [], [], []
+    trip_route, trip_service = {}, {}
+    trip_times = defaultdict(list)
+    service_days = {}
+
+    for path in feeds:
+        print("📂 GTFS FEED:", path)
+        feed = _Feed(path)
+        prefix = f"{path.stem}:" if len(feeds) > 1 else ""
+
+        for row in feed.rows("stops.txt"):
+            if row.get("location_type", "0") not in ("", "0"):
+                continue      # stations / entrances: trips stop at platforms
+            stop_index[prefix + row["stop_id"]] = len(stop_names)
+            stop_names.append(row["stop_name"])
+            stop_lat.append(float(row["stop_lat"]))
+            stop_lon.append(float(row["stop_lon"]))
+
+        fares = {row["fare_id"]: float(row["price"]) for row in feed.rows("fare_attributes.txt", False)}
+        route_fares = {
+            row["route_id"]: fares.get(row["fare_id"])
+            for row in feed.rows("fare_rules.txt", False)
+            if row.get("route_id")
+        }
+
+        for row in feed.rows("routes.txt"):
+            route_index[prefix + row["route_id"]] = len(route_names)
+            route_names.append(row.get("route_short_name") or row.get("route_long_name") or row["route_id"])
+            route_mode.append(_mode(row.get("route_type", "3")))
+            fare = route_fares.get(row["route_id"])
+            route_fare.append(-1.0 if fare is None else fare)
+
+        calendar = _service_days(feed.rows("calendar.txt", False), feed.rows("calendar_dates.txt", False))
+        service_days.update((prefix + service, days) for service, days in calendar.items())
+
+        for row in feed.rows("trips.txt"):
+            trip_route[prefix + row["trip_id"]] = route_index[prefix + row["route_id"]]
+            # A feed without calendar files has no service days: it runs daily
+            trip_service[prefix + row["trip_id"]] = prefix + row["service_id"] if calendar else None
+
+        for row in feed.rows("stop_times.txt"):
+            stop = stop_index.get(prefix + row["stop_id"])
+            if stop is None or not row["arrival_time"] or not row["departure_time"]:
+                continue      # untimed stops are skipped rather than interpolated
+            trip_times[prefix + row["trip_id"]].append((
+                int(row["stop_sequence"]), stop,
+                _seconds(row["arrival_time"]), _seconds(row["departure_time"]),
+            ))
+
+    # ---------- patterns: trips of one route with the same stop sequence ----------
+    patterns = defaultdict(list)
+    for trip_id, times in trip_times.items():
+        if trip_id not in trip_route or len(times) < 2:
+            continue
+        times.sort()
+        stops = tuple(stop for _, stop, _, _ in times)
+        patterns[(trip_route[trip_id], stops)].append(
+            ([arr for _, _, arr, _ in times], [dep for _, _, _, dep in times], trip_service[trip_id])
+        )
+
+    pattern_stops, pattern_stop_counts, pattern_trips = [], [], []
+    pattern_mode, pattern_fare, pattern_route = [], [], []
+    arr_times, dep_times, time_counts = [], [], []
+    trip_services = []
+    serving = defaultdict(list)
+
+    for p, (route, stops, trips) in enumerate(_fifo_patterns(patterns)):
+        pattern_stops.extend(stops)
+        pattern_stop_counts.append(len(stops))
+        pattern_trips.append(len(trips))
+        pattern_mode.append(route_mode[route])
+        pattern_fare.append(route_fare[route])
+        pattern_route.append(route)
+        for arr, dep, service in trips:
+            arr_times.extend(arr)
+            dep_times.extend(dep)
+            trip_services.append(service)
+        time_counts.append(len(trips) * len(stops))
+        for pos, stop in enumerate(stops):
+            serving[stop].append((p, pos))
+
+    n_stops = len(stop_names)
+
+    # ---------- stop → patterns ----------
+    stop_pat, stop_pat_pos, stop_pat_counts = [], [], []
+    for stop in range(n_stops):
+        entries = serving.get(stop, [])
+        stop_pat.extend(p for p, _ in entries)
+        stop_pat_pos.extend(pos for _, pos in entries)
+        stop_pat_counts.append(len(entries))
+
+    # ---------- precomputed walking transfers (grid of ~WALK_RADIUS cells) ----------
+    cell = WALK_RADIUS_M / 111_000
+    grid = defaultdict(list)
+    for stop in range(n_stops):
+        grid[(int(stop_lat[stop] // cell), int(stop_lon[stop] // cell))].append(stop)
+
+    xfer_to, xfer_s, xfer_counts = [], [], []
+    for stop in range(n_stops):
+        row, col = int(stop_lat[stop] // cell), int(stop_lon[stop] // cell)
+        count = 0
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                for other in grid.get((row + dr, col + dc), ()):
+                    if other == stop:
+                        continue
+                    meters = _walk_m(stop_lat[stop], stop_lon[stop], stop_lat[other], stop_lon[other])
+                    if meters <= WALK_RADIUS_M:
+                        xfer_to.append(other)
+                        xfer_s.append(max(MIN_TRANSFER_S, int(meters / WALK_SPEED_MS)))
+                        count += 1
+        xfer_counts.append(count)
+
+    arrays = {
+        "stop_lat": np.array(stop_lat, dtype="float32"),
+        "stop_lon": np.array(stop_lon, dtype="float32"),
+        "pattern_stop_start": _offsets(pattern_stop_counts),
+        "pattern_stops": np.array(pattern_stops, dtype="int32"),
+        "pattern_trips": np.array(pattern_trips, dtype="int32"),
+        "pattern_time_start": _offsets(time_counts),
+        "arr_times": np.array(arr_times, dtype="int32"),
+        "dep_times": np.array(dep_times, dtype="int32"),
+        "pattern_mode": np.array(pattern_mode, dtype="int8"),
+        "pattern_fare": np.array(pattern_fare, dtype="float32"),
+        "pattern_route": np.array(pattern_route, dtype="int32"),
+        "stop_pat_start": _offsets(stop_pat_counts),
+        "stop_pat": np.array(stop_pat, dtype="int32"),
+        "stop_pat_pos": np.array(stop_pat_pos, dtype="int32"),
+        "xfer_start": _offsets(xfer_counts),
+        "xfer_to": np.array(xfer_to, dtype="int32"),
+        "xfer_s": np.array(xfer_s, dtype="int32"),
+    }
+
+    # Service days per trip, in pattern order; absent when no feed has a calendar
+    calendar_start, calendar_days, trip_days = _calendar_bits(trip_services, service_days)
+    if calendar_start is not None:
+        arrays["trip_days"] = trip_days
+
+    # Write next to the target and swap directories, so a running server
+    # never maps a half-written timetable
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    for name, array in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", array)
+    (tmp_dir / "meta.json").write_text(json.dumps({
+        "stop_names": stop_names,
+        "route_names": route_names,
+        "patterns": len(pattern_trips),
+        "trips": int(sum(pattern_trips)),
+        "calendar_start": calendar_start.isoformat() if calendar_start else None,
+        "calendar_days": calendar_days,
+    }))
+
+    old_dir = out_dir.with_name(out_dir.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if out_dir.exists():
+        out_dir.rename(old_dir)
+    tmp_dir.rename(out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    size_mb = sum(p.stat().st_size for p in out_dir.glob("*.npy")) / 1e6
+    print(
+        f"✅ TIMETABLE BUILT: {n_stops} stops, {len(pattern_trips)} patterns, "
+        f"{sum(pattern_trips)} trips, {len(xfer_to)} transfers, {size_mb:.1f} MB"
+    )
+    if calendar_start is not None:
+        print(f"📅 Service calendar: {calendar_days} days from {calendar_start}")
+    print("📁 Directory:", out_dir)
+
+
+def _fifo_patterns(patterns):
+    """
+    RAPTOR binary-searches the earliest trip at any stop, which needs
+    trips that never overtake each other. Trips of a pattern are sorted
+    by first departure and an overtaking trip goes to its own sub-pattern.
+    """
+    for (route, stops), trips in patterns.items():
+        trips.sort(key=lambda trip: trip[1][0])
+        groups = []
+        for trip in trips:
+            for group in groups:
+                last = group[-1]
+                if all(a <= b for a, b in zip(last[1], trip[1])) and all(a <= b for a, b in zip(last[0], trip[0])):
+                    group.append(trip)
+                    break
+            else:
+                groups.append([trip])
+        for group in groups:
+            yield route, stops, group
+
+
+def _walk_m(lat1, lon1, lat2, lon2) -> float:
+    # Equirectangular is plenty within a few hundred metres
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return 6_371_000 * math.hypot(x, y)
+
+
+# =========================
+# ✅ RUN
+# =========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the RAPTOR timetable from GTFS feeds")
+    parser.add_argument("feeds", type=Path, nargs="+", help="GTFS directories or .zip files (rail, bus, ...)")
+    parser.add_argument("--out", type=Path, default=TRANSIT_DIR)
+    args = parser.parse_args()
+
+    build_transit(args.feeds, args.out)
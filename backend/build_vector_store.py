@@ -1,8 +1,18 @@
+import argparse
+import json
+import tempfile
+import time
 from pathlib import Path
-from langchain_community.embeddings import OllamaEmbeddings
 from langchain_community.vectorstores import FAISS
-from langchain_core.documents import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+try:
+    from .dedup import RAG_DEDUP, ChunkDeduplicator
+    from .ingest import iter_chunk_batches
+    from .vector_index import RERANK_FACTOR, STORAGE_KINDS, RerankIndex, index_bytes, quantize_index, save_vectors
+except ImportError:     # run as a script: python backend/build_vector_store.py
+    from dedup import RAG_DEDUP, ChunkDeduplicator
+    from ingest import iter_chunk_batches
+    from vector_index import RERANK_FACTOR, STORAGE_KINDS, RerankIndex, index_bytes, quantize_index, save_vectors
 
 # =========================
 # ✅ CORRECTED PATHS
@@ -12,76 +22,176 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 CORPUS_DIR = PROJECT_ROOT / "data" / "corpus"
 VECTOR_DIR = PROJECT_ROOT / "backend" / "vector_store"
 
-VECTOR_DIR.mkdir(parents=True, exist_ok=True)
-
-print("📂 CORPUS DIRECTORY:", CORPUS_DIR)
-print("📂 VECTOR STORE DIRECTORY:", VECTOR_DIR)
+VECTORS_PATH = VECTOR_DIR / "vectors.npy"      # ✅ float32 copy for exact re-rank (mmap)
+STORAGE_PATH = VECTOR_DIR / "storage.json"
 
-# =========================
-# ✅ EMBEDDINGS
-# =========================
-embeddings = OllamaEmbeddings(model="mistral")
+EMBED_BATCH = 256
 
 # =========================
-# ✅ TEXT SPLITTER
+# ✅ EMBEDDINGS (created on first build, not at import)
 # =========================
-splitter = RecursiveCharacterTextSplitter(
-    chunk_size=800,
-    chunk_overlap=150,
-)
+_embeddings = None
 
-# =========================
-# ✅ LOAD DOCUMENTS
-# =========================
-def load_documents():
-    if not CORPUS_DIR.exists():
-        raise RuntimeError(f"❌ Corpus directory not found: {CORPUS_DIR}")
 
-    files = list(CORPUS_DIR.glob("*.txt"))
-    if not files:
-        raise RuntimeError(f"❌ No .txt files found in: {CORPUS_DIR}")
+def get_embeddings():
+    global _embeddings
 
-    documents = []
-
-    for file in files:
-        text = file.read_text(encoding="utf-8", errors="ignore").strip()
-        chunks = splitter.split_text(text)
-
-        for i, chunk in enumerate(chunks):
-            documents.append(
-                Document(
-                    page_content=chunk,
-                    metadata={
-                        "source": file.name,
-                        "chunk": i,
-                    },
-                )
-            )
-
-    print(f"✅ Loaded {len(documents)} chunks from {len(files)} files")
-    return documents
+    if _embeddings is None:
+        from langchain_community.embeddings import OllamaEmbeddings
+        _embeddings = OllamaEmbeddings(model="mistral")
 
+    return _embeddings
 
 # =========================
-# ✅ BUILD FAISS INDEX
+# ✅ BUILD FAISS INDEX (EMBEDDED IN BATCHES)
 # =========================
-def build_faiss():
-    docs = load_documents()
+def build_faiss(storage: str = "flat", pq_m: int = 64, rerank: int = RERANK_FACTOR, report: bool = False):
+    VECTOR_DIR.mkdir(parents=True, exist_ok=True)
+
+    print("📂 CORPUS DIRECTORY:", CORPUS_DIR)
+    print("📂 VECTOR STORE DIRECTORY:", VECTOR_DIR)
+
+    # Dedup needs every chunk before provenance is final, so chunks are
+    # collected first (text only); embedding is still done batch by batch.
+    dedup = ChunkDeduplicator() if RAG_DEDUP else None
+    docs = []
+
+    for batch in iter_chunk_batches(CORPUS_DIR, chunk_size=800, chunk_overlap=150):
+        for doc in batch:
+            doc.metadata["source"] = doc.metadata["source_file"]
+            if dedup is None or dedup.add(doc) is not None:
+                docs.append(doc)
+
+    if dedup is not None:
+        report = dedup.report()
+        print(
+            f"🧹 Dedup: {report['chunks_in']} → {report['chunks_out']} chunks "
+            f"({report['chunks_removed']} removed), "
+            f"{report['chars_saved']} chars saved ({report['saved_pct']}%)"
+        )
 
     print("⚡ Creating embeddings...")
-    db = FAISS.from_documents(docs, embeddings)
+    db = None
+    total = len(docs)
+
+    for start in range(0, total, EMBED_BATCH):
+        batch = docs[start:start + EMBED_BATCH]
+        if db is None:
+            db = FAISS.from_documents(batch, get_embeddings())
+        else:
+            db.add_documents(batch)
+        print(f"   ... {start + len(batch)} / {total} chunks embedded")
+
+    if storage != "flat":
+        # Keep float32 only on disk (for re-rank); the index holds compact codes
+        vectors = db.index.reconstruct_n(0, db.index.ntotal)
+        save_vectors(VECTORS_PATH, vectors)
+        db.index = quantize_index(vectors, storage, pq_m)
 
     db.save_local(VECTOR_DIR)
+    STORAGE_PATH.write_text(json.dumps({"storage": storage, "pq_m": pq_m, "rerank": rerank}))
 
-    print("✅ FAISS INDEX BUILT SUCCESSFULLY")
+    print(f"✅ FAISS INDEX BUILT SUCCESSFULLY ({total} chunks, {storage} storage)")
     print("📁 Files created:")
     print("   - index.faiss")
     print("   - index.pkl")
+    if storage != "flat":
+        print("   - vectors.npy")
+
+    if report:
+        vectors = vectors if storage != "flat" else db.index.reconstruct_n(0, db.index.ntotal)
+        print(json.dumps(storage_report(vectors, pq_m=pq_m, rerank=rerank), indent=2))
+
+
+# =========================
+# ✅ LOAD (USED BY THE SERVING PATH)
+# =========================
+def load_vector_store():
+    """
+    Load the embedding store. Quantized stores get an exact re-rank over
+    the memory-mapped float32 vectors.
+    """
+    db = FAISS.load_local(
+        str(VECTOR_DIR),
+        get_embeddings(),
+        allow_dangerous_deserialization=True,   # our own index.pkl
+    )
+
+    config = json.loads(STORAGE_PATH.read_text()) if STORAGE_PATH.exists() else {"storage": "flat"}
+    if config["storage"] != "flat":
+        db.index = RerankIndex(db.index, VECTORS_PATH, config.get("rerank", RERANK_FACTOR))
+
+    return db
+
+
+# =========================
+# ✅ MEMORY / RECALL / LATENCY REPORT
+# =========================
+def storage_report(vectors, k: int = 4, queries: int = 200, pq_m: int = 64, rerank: int = RERANK_FACTOR):
+    """
+    Compare every storage kind against exact float32 search. Queries are
+    stored vectors plus a little noise; recall@k is measured against the
+    exact top-k of the same query.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n = len(vectors)
+    picks = rng.choice(n, size=min(queries, n), replace=False)
+    noise = rng.normal(0, vectors.std() * 0.1, size=(len(picks), vectors.shape[1]))
+    probe = (vectors[picks] + noise).astype("float32")
+
+    exact = quantize_index(vectors, "flat")
+    _, truth = exact.search(probe, k)
+
+    tmp_dir = tempfile.TemporaryDirectory()
+    vectors_path = Path(tmp_dir.name) / "vectors.npy"
+    save_vectors(vectors_path, vectors)
+
+    rows = {}
+    for kind in STORAGE_KINDS:
+        try:
+            coarse = quantize_index(vectors, kind, pq_m)
+        except ValueError as e:
+            rows[kind] = {"error": str(e)}
+            continue
+
+        index = coarse if kind == "flat" else RerankIndex(coarse, vectors_path, rerank)
+
+        timings, hits = [], 0
+        for i, query in enumerate(probe):
+            start = time.perf_counter()
+            _, found = index.search(query[None, :], k)
+            timings.append(time.perf_counter() - start)
+            hits += len(set(found[0]) & set(truth[i]))
+
+        timings.sort()
+        size = index_bytes(coarse)
+        rows[kind] = {
+            "index_mb": round(size / 1e6, 2),
+            "bytes_per_vector": round(size / n, 1),
+            "recall_at_k": round(hits / (k * len(probe)), 4),
+            "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+            "p95_ms": round(timings[int(len(timings) * 0.95)] * 1000, 3),
+        }
+
+    tmp_dir.cleanup()
+    return {"vectors": n, "dim": int(vectors.shape[1]), "k": k, "rerank": rerank, "storage": rows}
 
 
 # =========================
 # ✅ RUN
 # =========================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the embedding vector store")
+    parser.add_argument("--storage", choices=STORAGE_KINDS, default="flat",
+                        help="float32 (flat), float16, int8 scalar-quantized or PQ codes")
+    parser.add_argument("--pq-m", type=int, default=64, help="PQ sub-quantizers (bytes per vector)")
+    parser.add_argument("--rerank", type=int, default=RERANK_FACTOR,
+                        help="candidates per result re-ranked exactly in float32")
+    parser.add_argument("--report", action="store_true", help="print memory / recall / latency per storage")
+    args = parser.parse_args()
+
     print("🔄 Building FAISS index from corpus...")
-    build_faiss()
+    build_faiss(args.storage, args.pq_m, args.rerank, args.report)
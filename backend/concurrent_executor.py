@@ -0,0 +1,139 @@
+import contextvars
+import json
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+
+TOOL_POOL_SIZE = 8
+DEFAULT_TOOL_TIMEOUT = 20.0
+TOOL_TIMEOUTS = {
+    "weather": 12.0,
+    "routes": 30.0,
+    "rag": 10.0,
+}
+
+_tool_pool = ThreadPoolExecutor(
+    max_workers=TOOL_POOL_SIZE, thread_name_prefix="agent-tool"
+)
+
+# (action, future) pairs started by the running _iter_next_step and
+# collected in _perform_agent_action; one list per invocation
+_pending: contextvars.ContextVar[Optional[List[Tuple[AgentAction, Future]]]] = contextvars.ContextVar(
+    "agent_pending_tools", default=None
+)
+
+
+def _call_key(action: AgentAction) -> Tuple[str, str]:
+    try:
+        args = json.dumps(action.tool_input, sort_keys=True, default=str)
+    except TypeError:
+        args = str(action.tool_input)
+    return action.tool, args
+
+
+def _done_future(observation: Any) -> Future:
+    future = Future()
+    future.set_result(observation)
+    return future
+
+
+# =========================
+# ✅ CONCURRENT TOOL DISPATCH
+# =========================
+class ConcurrentAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor that starts every tool call of a planning step on a
+    thread pool as soon as the agent emits it, so a multi-tool step
+    takes as long as its slowest tool. Identical calls (same tool and
+    arguments) inside one turn reuse the earlier observation.
+    """
+
+    def _iter_next_step(
+        self,
+        name_to_tool_map,
+        color_mapping,
+        inputs,
+        intermediate_steps: List[Tuple[AgentAction, Any]],
+        run_manager=None,
+    ) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        # Turn-local cache: observations from earlier iterations of this turn
+        turn_cache: Dict[Tuple[str, str], Future] = {
+            _call_key(action): _done_future(observation)
+            for action, observation in intermediate_steps
+            if not str(observation).startswith("ERROR")
+        }
+
+        pending: List[Tuple[AgentAction, Future]] = []
+        previous = _pending.get()
+        _pending.set(pending)
+
+        try:
+            for item in super()._iter_next_step(
+                name_to_tool_map,
+                color_mapping,
+                inputs,
+                intermediate_steps,
+                run_manager,
+            ):
+                if isinstance(item, AgentAction):
+                    key = _call_key(item)
+                    future = turn_cache.get(key)
+
+                    if future is None:
+                        # The request context goes along, e.g. for mark_degraded()
+                        future = _tool_pool.submit(
+                            contextvars.copy_context().run,
+                            self._run_tool,
+                            name_to_tool_map,
+                            color_mapping,
+                            item,
+                            run_manager,
+                        )
+                        turn_cache[key] = future
+
+                    pending.append((item, future))
+
+                yield item
+        finally:
+            # A step that raised leaves nothing behind; queued calls are dropped
+            for _, future in pending:
+                future.cancel()
+            pending.clear()
+            _pending.set(previous)
+
+    def _run_tool(self, name_to_tool_map, color_mapping, agent_action, run_manager):
+        step = AgentExecutor._perform_agent_action(
+            self, name_to_tool_map, color_mapping, agent_action, run_manager
+        )
+        return step.observation
+
+    def _perform_agent_action(
+        self,
+        name_to_tool_map,
+        color_mapping,
+        agent_action: AgentAction,
+        run_manager=None,
+    ) -> AgentStep:
+        future: Optional[Future] = next(
+            (f for action, f in _pending.get() or () if action is agent_action), None
+        )
+
+        if future is None:
+            return super()._perform_agent_action(
+                name_to_tool_map, color_mapping, agent_action, run_manager
+            )
+
+        timeout = TOOL_TIMEOUTS.get(agent_action.tool, DEFAULT_TOOL_TIMEOUT)
+
+        try:
+            observation = future.result(timeout=timeout)
+        except TimeoutError:
+            observation = (
+                f"ERROR: Tool '{agent_action.tool}' timed out after {timeout:g}s"
+            )
+        except Exception as e:
+            observation = f"ERROR: Tool '{agent_action.tool}' failed: {e}"
+
+        return AgentStep(action=agent_action, observation=observation)
@@ -0,0 +1,132 @@
+import os
+import re
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+# ✅ Chunks whose word-shingle Jaccard similarity reaches this are collapsed
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+RAG_DEDUP = os.getenv("RAG_DEDUP", "1") != "0"
+
+SHINGLE_WORDS = 5
+NUM_PERM = 64
+BANDS = 16                 # ✅ 16 bands x 4 rows: pairs above ~0.5 become candidates
+ROWS = NUM_PERM // BANDS
+
+_PRIME = (1 << 31) - 1     # a * x + b stays below 2**63 for 31-bit hashes
+_WORD = re.compile(r"\w+")
+
+_rng = np.random.RandomState(1634)
+_A = _rng.randint(1, _PRIME, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+
+def shingles(text: str) -> Set[int]:
+    """
+    Hashed, case-folded word 5-grams. Whitespace, punctuation and
+    line-wrapping differences between two copies do not matter.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {zlib.crc32(" ".join(words).encode()) & _PRIME}
+
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode()) & _PRIME
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash(shingle_set: Set[int]) -> np.ndarray:
+    x = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+    return ((_A[:, None] * x[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+# =========================
+# ✅ NEAR-DUPLICATE CHUNK FILTER (MINHASH + LSH)
+# =========================
+class ChunkDeduplicator:
+    """
+    Streaming near-duplicate filter. Each chunk is MinHashed and looked
+    up in banded LSH buckets; candidates are confirmed with the exact
+    shingle Jaccard. The first copy seen is kept and collects the
+    provenance of every copy dropped after it in metadata["sources"].
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._kept: List[Document] = []
+        self._shingles: List[Set[int]] = []
+        self.chunks_in = 0
+        self.chars_in = 0
+        self.chars_out = 0
+
+    def _match(self, shingle_set: Set[int], keys: List[Tuple[int, bytes]]) -> Optional[int]:
+        seen = set()
+        for key in keys:
+            for idx in self._buckets.get(key, ()):
+                if idx not in seen:
+                    seen.add(idx)
+                    if jaccard(shingle_set, self._shingles[idx]) >= self.threshold:
+                        return idx
+        return None
+
+    def add(self, doc: Document) -> Optional[Document]:
+        """
+        Returns the chunk if it is new, or None if it was folded into an
+        earlier near-duplicate.
+        """
+        self.chunks_in += 1
+        self.chars_in += len(doc.page_content)
+
+        shingle_set = shingles(doc.page_content)
+        signature = minhash(shingle_set)
+        keys = [(band, signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+        match = self._match(shingle_set, keys)
+        if match is not None:
+            kept = self._kept[match]
+            kept.metadata["duplicates"] = kept.metadata.get("duplicates", 0) + 1
+            source = doc.metadata.get("source_file")
+            if source and source not in kept.metadata["sources"]:
+                kept.metadata["sources"].append(source)
+            return None
+
+        source = doc.metadata.get("source_file")
+        doc.metadata["sources"] = [source] if source else []
+
+        idx = len(self._kept)
+        self._kept.append(doc)
+        self._shingles.append(shingle_set)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(idx)
+
+        self.chars_out += len(doc.page_content)
+        return doc
+
+    def report(self) -> Dict[str, float]:
+        saved = self.chars_in - self.chars_out
+        return {
+            "chunks_in": self.chunks_in,
+            "chunks_out": len(self._kept),
+            "chunks_removed": self.chunks_in - len(self._kept),
+            "chars_saved": saved,
+            "saved_pct": round(100.0 * saved / self.chars_in, 1) if self.chars_in else 0.0,
+        }
+
+
+def dedupe_chunks(
+    chunks: List[Document],
+    threshold: float = DEDUP_THRESHOLD,
+) -> Tuple[List[Document], Dict[str, float]]:
+    dedup = ChunkDeduplicator(threshold)
+    kept = [doc for doc in chunks if dedup.add(doc) is not None]
+    return kept, dedup.report()
@@ -0,0 +1,28 @@
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional, Set
+
+# Upstreams whose stale or fallback answer went into the current request.
+# A mutable set: sync endpoints and agent tools run in copies of the
+# request context and add to the same set.
+_degraded: contextvars.ContextVar[Optional[Set[str]]] = contextvars.ContextVar(
+    "upstream_degraded", default=None
+)
+
+
+@contextmanager
+def track_degraded() -> Iterator[Set[str]]:
+    """Collects mark_degraded() calls made while handling one request."""
+    sources: Set[str] = set()
+    token = _degraded.set(sources)
+    try:
+        yield sources
+    finally:
+        _degraded.reset(token)
+
+
+def mark_degraded(upstream: str):
+    """Called where a stale or fallback value replaces a live answer."""
+    sources = _degraded.get()
+    if sources is not None:
+        sources.add(upstream)
@@ -1,40 +1,117 @@
 # =========================
-# ✅ GUARDRail SYSTEM (NO REGEX)
+# ✅ GUARDRail SYSTEM (AHO-CORASICK, NO REGEX)
 # =========================
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
 
+from .automaton import KeywordAutomaton, normalize_text
+
+# ✅ Fallback when the terms file is missing (same entries, see guardrail_terms.txt)
 SENSITIVE_KEYWORDS = {
-    "child abuse",
-    "sexual abuse",
+    "child abuse*",
+    "sexual abuse*",
+    "sexual assault*",
     "rape",
-    "molest",
-    "porn",
+    "raped",
+    "rapes",
+    "raping",
+    "rapist",
+    "molest*",
+    "porn*",
     "nude",
-    "suicide",
-    "self harm",
-    "kill",
-    "murder",
-    "terror",
+    "nudes",
+    "nudity",
+    "suicid*",
+    "self harm*",
+    "kill*",
+    "murder*",
+    "terror*",
     "bomb",
-    "drugs",
-    "weapon",
+    "bombed",
+    "bomber",
+    "bombing",
+    "drug*",
+    "weapon*",
     "gun",
+    "gunman",
+    "gunmen",
+    "gunpoint",
     "sex",
-    "violence",
+    "violen*",
 }
 
+# ✅ One term per line, "#" for comments. Edits are picked up without a restart.
+TERMS_PATH = Path(
+    os.getenv(
+        "GUARDRAIL_TERMS_PATH",
+        Path(__file__).resolve().parent / "data" / "guardrail_terms.txt",
+    )
+)
+RELOAD_CHECK_SECONDS = 5.0
+
+
+# =========================
+# ✅ HOT-RELOADABLE TERM LIST
+# =========================
+_automaton: Optional[KeywordAutomaton] = None
+_terms_mtime: Optional[float] = None
+_last_check = 0.0
+_reload_lock = threading.Lock()
+
+
+def _load_terms() -> set:
+    if not TERMS_PATH.exists():
+        return set(SENSITIVE_KEYWORDS)
+
+    terms = set()
+    for line in TERMS_PATH.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            terms.add(line)
+    return terms
+
+
+def reload_terms() -> int:
+    global _automaton, _terms_mtime, _last_check
+
+    with _reload_lock:
+        _terms_mtime = TERMS_PATH.stat().st_mtime if TERMS_PATH.exists() else None
+        terms = _load_terms()
+        _automaton = KeywordAutomaton(terms, allow_plural=True)
+        _last_check = time.monotonic()
+
+    print(f"🛡️ Guardrail automaton loaded ({len(terms)} terms)")
+    return len(terms)
+
+
+def _get_automaton() -> KeywordAutomaton:
+    global _last_check
+
+    now = time.monotonic()
+    if _automaton is None:
+        reload_terms()
+    elif now - _last_check > RELOAD_CHECK_SECONDS:
+        _last_check = now
+        mtime = TERMS_PATH.stat().st_mtime if TERMS_PATH.exists() else None
+        if mtime != _terms_mtime:
+            reload_terms()
+
+    return _automaton
+
+
+def find_violations(message: str) -> List[str]:
+    return _get_automaton().find(normalize_text(message))
+
 
 def violates_guardrails(message: str) -> bool:
     """
-    Returns True if the message contains any blocked keyword.
-    No regex used. Pure keyword scanning.
+    Returns True if the message contains any blocked term as a whole word
+    (or, for prefix entries, any inflection of it).
     """
-    msg = message.lower()
-
-    for keyword in SENSITIVE_KEYWORDS:
-        if keyword in msg:
-            return True
-
-    return False
+    return bool(_get_automaton().find(normalize_text(message), first_only=True))
 
 
 def guardrail_response() -> str:
@@ -0,0 +1,221 @@
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+PARALLEL_MIN_BYTES = 1_000_000      # ✅ smaller corpora split in-process (no pool start-up)
+MAX_UNIT_CHARS = 200_000            # ✅ a section longer than this is cut at a line break
+TASK_CHARS = 256_000                # ✅ text shipped to a worker per task
+DEFAULT_BATCH_SIZE = 256
+
+_TOP_HEADING = re.compile(r"^\d+\)\s+\S")               # "12) KERALA – ..."
+_SUB_HEADING = re.compile(r"^\[(.+)\]$")                # "[Best Time to Visit]"
+_RULE = re.compile(r"^\s*([=\-])\1{2,}\s*$")            # "=====" / "-----"
+
+# (source_file, section, text)
+Unit = Tuple[str, str, str]
+
+
+# =========================
+# ✅ STREAMING, SECTION-AWARE READER
+# =========================
+def _iter_blocks(path: Path) -> Iterator[Tuple[bool, str, str, List[str]]]:
+    """
+    Yields (starts_section, section, heading, lines) per heading-delimited
+    block that has content. Top-level headings ("12) KERALA", titles
+    underlined with "===") open a new section; "[...]" and titles
+    underlined with "---" only open a block. Reads one line ahead to
+    recognise underlined titles; rule lines themselves are dropped.
+    """
+    section, heading, lines = "", "", []
+    new_section = True
+    size = 0
+
+    def _has_text(block):
+        return any(line.strip() for line in block)
+
+    with path.open("r", encoding="utf-8", errors="ignore") as f:
+        previous: Optional[str] = None
+
+        for raw in f:
+            line = raw.rstrip("\n")
+            rule = _RULE.match(line)
+            title = None
+
+            if rule and previous is not None and previous.strip() and not _RULE.match(previous):
+                # The line before an underline is a title: "===" top level, "---" sub level
+                if lines and lines[-1] == previous:
+                    lines.pop()
+                title = previous.strip()
+                top = rule.group(1) == "=" or bool(_TOP_HEADING.match(title))
+            elif not rule:
+                stripped = line.strip()
+                if _TOP_HEADING.match(stripped) or _SUB_HEADING.match(stripped):
+                    title = stripped.strip("[]")
+                    top = bool(_TOP_HEADING.match(stripped))
+
+            previous = line
+
+            if title is not None:
+                if _has_text(lines):
+                    yield new_section, section, heading, lines
+                    new_section = False
+                # A heading with no text of its own hands its role to the next block
+                if top:
+                    section, new_section = title, True
+                if title != section or top:
+                    heading = title
+                lines, size = [], 0
+                continue
+
+            if rule:
+                continue
+
+            lines.append(line)
+            size += len(line) + 1
+
+            if size >= MAX_UNIT_CHARS:
+                yield new_section, section, heading, lines
+                new_section, lines, size = False, [], 0
+
+    if _has_text(lines):
+        yield new_section, section, heading, lines
+
+
+def iter_units(path: Path, chunk_size: int) -> Iterator[Unit]:
+    """
+    Packs consecutive small blocks into units of about chunk_size
+    characters. A unit never spans two top-level sections, so no chunk
+    mixes two states or two policy documents.
+    """
+    section, parts, size = "", [], 0
+
+    for new_section, block_section, heading, lines in _iter_blocks(path):
+        text = "\n".join(lines).strip()
+        if heading and heading != block_section:
+            text = f"{heading}\n{text}"
+
+        if parts and (new_section or size + len(text) > chunk_size):
+            yield path.name, section, "\n\n".join(parts)
+            parts, size = [], 0
+
+        # Every unit opens with its section title (e.g. the state name)
+        if not parts and block_section:
+            text = f"{block_section}\n{text}"
+
+        section = block_section
+        parts.append(text)
+        size += len(text) + 2
+
+    if parts:
+        yield path.name, section, "\n\n".join(parts)
+
+
+# =========================
+# ✅ SPLITTING (RUNS IN WORKER PROCESSES)
+# =========================
+_splitters = {}
+
+
+def _split_task(task: Tuple[List[Unit], int, int]) -> List[Tuple[str, dict]]:
+    units, chunk_size, chunk_overlap = task
+
+    splitter = _splitters.get((chunk_size, chunk_overlap))
+    if splitter is None:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        splitter = _splitters[(chunk_size, chunk_overlap)] = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+
+    chunks = []
+    for source, section, text in units:
+        for piece in splitter.split_text(text):
+            chunks.append((piece, {"source_file": source, "section": section}))
+    return chunks
+
+
+def _iter_tasks(files: Iterable[Path], chunk_size: int, chunk_overlap: int):
+    task, size = [], 0
+    for path in files:
+        for unit in iter_units(path, chunk_size):
+            task.append(unit)
+            size += len(unit[2])
+            if size >= TASK_CHARS:
+                yield task, chunk_size, chunk_overlap
+                task, size = [], 0
+    if task:
+        yield task, chunk_size, chunk_overlap
+
+
+def _ordered_map(fn, tasks: Iterator, workers: int) -> Iterator:
+    """
+    Like pool.map, but only workers * 2 tasks are ever in flight, so a
+    huge corpus is never queued (or held) in memory all at once.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window: Deque = deque()
+        for task in tasks:
+            window.append(pool.submit(fn, task))
+            if len(window) >= workers * 2:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def corpus_files(corpus_dir) -> List[Path]:
+    base_path = Path(corpus_dir)
+
+    if not base_path.exists():
+        raise RuntimeError(f"Corpus directory not found: {corpus_dir}")
+
+    files = sorted(base_path.glob("*.txt"))
+    if not files:
+        raise RuntimeError("No .txt files found in corpus directory")
+
+    return files
+
+
+def iter_chunk_batches(
+    corpus_dir,
+    chunk_size: int = 700,
+    chunk_overlap: int = 100,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: Optional[int] = None,
+    files: Optional[List[Path]] = None,
+) -> Iterator[List[Document]]:
+    """
+    Streams the corpus (or just `files` from it) as List[Document]
+    batches of at most batch_size: files are read line by line, cut into
+    section-aware units and split on a process pool, so memory stays
+    flat however large the corpus.
+    """
+    files = corpus_files(corpus_dir) if files is None else files
+    workers = INGEST_WORKERS if workers is None else workers
+    tasks = _iter_tasks(files, chunk_size, chunk_overlap)
+
+    total_bytes = sum(path.stat().st_size for path in files)
+    if workers > 1 and total_bytes >= PARALLEL_MIN_BYTES:
+        results = _ordered_map(_split_task, tasks, workers)
+    else:
+        results = map(_split_task, tasks)
+
+    counters = {}
+    batch: List[Document] = []
+    for chunks in results:
+        for text, metadata in chunks:
+            source = metadata["source_file"]
+            counters[source] = counters.get(source, -1) + 1
+            metadata["chunk"] = counters[source]
+            batch.append(Document(page_content=text, metadata=metadata))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
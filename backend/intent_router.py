@@ -0,0 +1,209 @@
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .rag_pipeline import get_vectorizer
+from .places import extract_places, lookup_place
+from .tools.forecast_tool import DAY_PHRASE
+
+CLASSIFIER_THRESHOLD = 0.25     # ✅ min cosine similarity to an intent centroid
+CLASSIFIER_MARGIN = 0.05        # ✅ min lead over the runner-up intent
+
+
+@dataclass
+class Intent:
+    name: str                   # weather | route | policy | agent
+    confidence: float
+    args: Dict[str, str] = field(default_factory=dict)
+
+
+# =========================
+# ✅ KEYWORD / REGEX RULES
+# =========================
+# A weather noun or a weather question frame; "hot springs" or "during
+# rain" alone are sightseeing questions, not weather lookups
+_WEATHER_KEYWORDS = re.compile(
+    r"\b(?:weather|temperature|temp|forecast|humidity)\b|"
+    r"\b(?:is|will|does|did)\s+it\s+(?:be\s+|going\s+to\s+)?"
+    r"(?:rain|raining|rainy|hot|cold|humid|sunny|snow|snowing|cloudy|windy)\b|"
+    r"\bhow\s+(?:hot|cold|humid)\s+is\s+it\b",
+    re.IGNORECASE,
+)
+_WEATHER_CITY = [
+    re.compile(
+        r"\b(?:weather|temperature|temp|forecast)\s+(?:like\s+)?(?:in|at|of|for)\s+"
+        r"([A-Za-z][A-Za-z ]*?)(?:\s+(?:today|now|right now|currently))?\s*[?.!]*$",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"^\s*(?:how is the\s+|what is the\s+|what's the\s+)?([A-Za-z][A-Za-z ]*?)\s+"
+        r"(?:weather|temperature)(?:\s+(?:today|now|right now))?\s*[?.!]*$",
+        re.IGNORECASE,
+    ),
+]
+
+_ROUTE_KEYWORDS = re.compile(
+    r"\b(route|routes|distance|how far|travel from|go from|get from|way from|reach)\b",
+    re.IGNORECASE,
+)
+_ROUTE_CITIES = re.compile(
+    r"(?:from\s+)?\b([A-Za-z][A-Za-z ]*?)\s+to\s+([A-Za-z][A-Za-z ]*?)"
+    r"(?:\s+(?:route|routes|distance|by road|by train|trip))?\s*[?.!]*$",
+    re.IGNORECASE,
+)
+_ROUTE_PREFIX = re.compile(
+    r"^\s*(?:what(?:'s| is) the\s+)?(?:best\s+)?(?:route|routes|distance|way|how (?:do i|to|can i) "
+    r"(?:go|get|travel|reach))?\s*(?:from|between)?\s*",
+    re.IGNORECASE,
+)
+
+_POLICY_KEYWORDS = re.compile(
+    r"\b(refund|refunds|cancel|cancellation|policy|policies|terms|conditions|"
+    r"helpline|support timings?|customer care|airport transfer)\b",
+    re.IGNORECASE,
+)
+
+
+def _clean_place(text: str) -> str:
+    text = " ".join(text.split()).strip()
+    place = lookup_place(text)
+    return place.name if place else text.title()
+
+
+def _match_weather(message: str) -> Optional[Intent]:
+    if not _WEATHER_KEYWORDS.search(message):
+        return None
+
+    # "weather in goa tomorrow" → city "goa", answered from the forecast
+    when = DAY_PHRASE.search(message)
+    args = {"when": when.group(0)} if when else {}
+    text = DAY_PHRASE.sub(" ", message) if when else message
+
+    for pattern in _WEATHER_CITY:
+        m = pattern.search(text)
+        if m:
+            return Intent("weather", 1.0, {"city": _clean_place(m.group(1)), **args})
+
+    # "is it raining in goa" → a single recognized place is enough
+    places = extract_places(text)
+    if len(places) == 1:
+        return Intent("weather", 0.9, {"city": places[0].name, **args})
+
+    # "will it rain on day 2?" → the caller fills in the trip destination
+    if when:
+        return Intent("weather", 0.8, args)
+
+    return None
+
+
+def _match_route(message: str) -> Optional[Intent]:
+    stripped = _ROUTE_PREFIX.sub("", message, count=1)
+    m = _ROUTE_CITIES.match(stripped)
+    if not m or len(re.findall(r"\bto\b", stripped, re.IGNORECASE)) != 1:
+        return None
+
+    # Place names are short; "I want to travel to goa" is not a route query
+    if any(len(group.split()) > 3 for group in m.groups()):
+        return None
+
+    # Bare "Delhi to Agra" is clear; anything wordier needs a route keyword
+    if len(stripped.split()) > 4 and not _ROUTE_KEYWORDS.search(message):
+        return None
+
+    return Intent(
+        "route",
+        1.0,
+        {"origin": _clean_place(m.group(1)), "destination": _clean_place(m.group(2))},
+    )
+
+
+# =========================
+# ✅ TINY TF-IDF CLASSIFIER
+# =========================
+# Centroids are built from these seeds with the RAG TfidfVectorizer,
+# so the classifier shares the corpus vocabulary.
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "policy": [
+        "what is your refund policy",
+        "how do i cancel my booking",
+        "cancellation charges for my package",
+        "terms and conditions of booking",
+        "customer support helpline number",
+        "support timings and contact",
+        "airport transfer pickup policy",
+        "when will i get my refund",
+    ],
+    "agent": [
+        "plan a trip to goa with family",
+        "suggest places to visit in kerala",
+        "best beaches and nightlife",
+        "what food should i try in rajasthan",
+        "recommend a honeymoon destination",
+        "things to do in jaipur for three days",
+        "best time to visit himachal",
+        "show me goa packages",
+    ],
+}
+
+# Centroids belong to one vectorizer; a reindex swaps in a new vocabulary
+_centroids: Optional[Tuple[object, Dict[str, np.ndarray]]] = None
+_centroid_lock = threading.Lock()
+
+
+def _get_centroids(vectorizer) -> Dict[str, np.ndarray]:
+    global _centroids
+
+    cached = _centroids
+    if cached is None or cached[0] is not vectorizer:
+        with _centroid_lock:
+            cached = _centroids
+            if cached is None or cached[0] is not vectorizer:
+                centroids = {}
+                for name, examples in SEED_EXAMPLES.items():
+                    vecs = vectorizer.transform(examples).toarray()
+                    centroid = vecs.mean(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[name] = centroid / norm if norm else centroid
+                cached = _centroids = (vectorizer, centroids)
+
+    return cached[1]
+
+
+def _classify_tfidf(message: str) -> Intent:
+    vectorizer = get_vectorizer()
+    vec = vectorizer.transform([message]).toarray()[0]
+
+    scores = sorted(
+        ((float(vec @ centroid), name) for name, centroid in _get_centroids(vectorizer).items()),
+        reverse=True,
+    )
+    best_score, best_name = scores[0]
+    runner_up = scores[1][0] if len(scores) > 1 else 0.0
+
+    if best_score < CLASSIFIER_THRESHOLD or best_score - runner_up < CLASSIFIER_MARGIN:
+        return Intent("agent", best_score)
+
+    return Intent(best_name, best_score)
+
+
+# =========================
+# ✅ ROUTER ENTRY
+# =========================
+def classify_intent(message: str) -> Intent:
+    """
+    Rules first (they also extract tool arguments); the TF-IDF
+    classifier only decides policy vs. open-ended agent queries.
+    Anything not clearly matched goes to the full agent.
+    """
+    for matcher in (_match_weather, _match_route):
+        intent = matcher(message)
+        if intent:
+            return intent
+
+    if _POLICY_KEYWORDS.search(message):
+        return _classify_tfidf(message)
+
+    return Intent("agent", 0.0)
@@ -8,10 +8,21 @@ def build_itinerary(
     interests: list,
     food_pref: str | None,
     rag_context: str,
+    weather_forecast: str = "",
 ) -> str:
     interests_text = ", ".join(interests) if interests else "general sightseeing"
     food_text = food_pref if food_pref else "no specific preference"
 
+    # Per-day forecast for trips starting within the next few days
+    forecast_text = ""
+    if weather_forecast:
+        forecast_text = f"""
+Weather forecast for the trip days (plan outdoor activities on dry days,
+indoor ones when rain is likely, and mention each day's weather):
+
+{weather_forecast}
+"""
+
     system_prompt = """
 You are a professional travel planner AI.
 
@@ -122,6 +133,7 @@ Create a clean markdown table with these rows:
 Use the following verified destination knowledge while generating:
 
 {rag_context[:4000]}
+{forecast_text}
 
 Make it visually clean, well-spaced, and UI-friendly.
 """
@@ -130,4 +142,5 @@ Make it visually clean, well-spaced, and UI-friendly.
         prompt=user_prompt,
         system_message=system_prompt,
         history=None,
+        task="itinerary",
     )
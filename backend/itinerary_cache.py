@@ -0,0 +1,199 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from .metrics import record_cache
+from .sqlite_writer import connect, enable_wal, get_writer
+
+CACHE_DB_PATH = "itinerary_cache.db"
+CACHE_TTL_SECONDS = 6 * 3600        # ✅ fresh for 6 hours
+CACHE_STALE_SECONDS = 24 * 3600     # ✅ then served stale (and refreshed) for 24 more
+CACHE_MAX_ENTRIES = 500
+STALE_WHILE_REVALIDATE = True
+
+
+# =========================
+# ✅ CANONICAL CACHE KEY
+# =========================
+def make_cache_key(
+    destination: str,
+    days: int,
+    budget: float,
+    interests: List[str],
+    food_preferences: Optional[str],
+    index_version: str,
+    start_date: Optional[str] = None,
+    forecast_date: Optional[str] = None,
+) -> str:
+    canonical = {
+        "destination": " ".join(destination.lower().split()),
+        "days": int(days),
+        # Exact: the prompt asks for a total of exactly this budget
+        "budget": round(float(budget), 2),
+        "interests": sorted({i.strip().lower() for i in interests if i.strip()}),
+        "food": " ".join((food_preferences or "").lower().split()),
+        "index_version": index_version,
+    }
+    # Only dated trips carry these, so undated keys stay what they were
+    if start_date:
+        canonical["start_date"] = start_date
+    if forecast_date:
+        canonical["forecast_date"] = forecast_date
+    raw = json.dumps(canonical, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# =========================
+# ✅ PERSISTENT ITINERARY CACHE
+# =========================
+class ItineraryCache:
+    def __init__(self, db_path: str = CACHE_DB_PATH):
+        self.db_path = db_path
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._opened = False
+
+    # ✅ Schema + startup eviction run once, on warm-up or first use
+    def open(self):
+        if self._opened:
+            return
+
+        with self._lock:
+            if not self._opened:
+                self._init_db()
+                self._opened = True
+
+        self.evict()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.open()
+        return connect(self.db_path)
+
+    def _writer(self):
+        self.open()
+        return get_writer(self.db_path)
+
+    def _init_db(self):
+        conn = connect(self.db_path)
+        enable_wal(conn)
+        c = conn.cursor()
+
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS itinerary_cache (
+                cache_key TEXT PRIMARY KEY,
+                itinerary_text TEXT,
+                created_at REAL,
+                last_access REAL
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def get(self, cache_key: str) -> Optional[Tuple[str, float]]:
+        conn = self._connect()
+        c = conn.cursor()
+
+        c.execute(
+            "SELECT itinerary_text, created_at FROM itinerary_cache WHERE cache_key = ?",
+            (cache_key,),
+        )
+        row = c.fetchone()
+        conn.close()
+
+        # ✅ LRU touch is fire-and-forget, the read never waits on it
+        if row:
+            self._writer().submit((
+                "UPDATE itinerary_cache SET last_access = ? WHERE cache_key = ?",
+                (time.time(), cache_key),
+            ))
+
+        return row
+
+    def set(self, cache_key: str, itinerary_text: str):
+        now = time.time()
+
+        self._writer().write(("""
+            INSERT INTO itinerary_cache (cache_key, itinerary_text, created_at, last_access)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                itinerary_text = excluded.itinerary_text,
+                created_at = excluded.created_at,
+                last_access = excluded.last_access
+        """, (cache_key, itinerary_text, now, now)))
+
+        self.evict()
+
+    # ✅ TTL + size eviction
+    def evict(self):
+        cutoff = time.time() - (CACHE_TTL_SECONDS + CACHE_STALE_SECONDS)
+
+        self._writer().write(
+            ("DELETE FROM itinerary_cache WHERE created_at < ?", (cutoff,)),
+            # Least recently used entries go first once over capacity
+            ("""
+                DELETE FROM itinerary_cache WHERE cache_key IN (
+                    SELECT cache_key FROM itinerary_cache
+                    ORDER BY last_access DESC
+                    LIMIT -1 OFFSET ?
+                )
+            """, (CACHE_MAX_ENTRIES,)),
+        )
+
+    def get_or_generate(
+        self,
+        cache_key: str,
+        generate: Callable[[], str],
+    ) -> Tuple[str, str]:
+        """
+        Returns (itinerary_text, cache_status) where cache_status is
+        HIT, STALE (served while refreshing in background) or MISS.
+        """
+        text, status = self._get_or_generate(cache_key, generate)
+        record_cache("itinerary", status)
+        return text, status
+
+    def _get_or_generate(
+        self,
+        cache_key: str,
+        generate: Callable[[], str],
+    ) -> Tuple[str, str]:
+        row = self.get(cache_key)
+
+        if row:
+            text, created_at = row
+            age = time.time() - created_at
+
+            if age <= CACHE_TTL_SECONDS:
+                return text, "HIT"
+
+            if STALE_WHILE_REVALIDATE and age <= CACHE_TTL_SECONDS + CACHE_STALE_SECONDS:
+                self._refresh_async(cache_key, generate)
+                return text, "STALE"
+
+        text = generate()
+        self.set(cache_key, text)
+        return text, "MISS"
+
+    def _refresh_async(self, cache_key: str, generate: Callable[[], str]):
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        def _refresh():
+            try:
+                self.set(cache_key, generate())
+            except Exception as e:
+                print(f"⚠️ Itinerary cache refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+
+        threading.Thread(target=_refresh, daemon=True).start()
+
+
+itinerary_cache = ItineraryCache()
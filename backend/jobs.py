@@ -0,0 +1,150 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+MAX_WORKERS = 4                 # ✅ total concurrent generations
+MAX_PER_TENANT = 2              # ✅ concurrent generations per tenant
+MAX_PENDING = 100               # ✅ queued jobs before submit is rejected
+JOB_RETENTION_SECONDS = 3600    # ✅ finished jobs kept for polling
+
+
+class QueueFullError(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    job_id: str
+    tenant: str
+    dedup_key: str
+    fn: Callable[[], Any]
+    status: str = "queued"      # queued | running | done | failed
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+# =========================
+# ✅ BOUNDED, TENANT-FAIR JOB QUEUE
+# =========================
+class JobQueue:
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        max_per_tenant: int = MAX_PER_TENANT,
+        max_pending: int = MAX_PENDING,
+    ):
+        self.max_workers = max_workers
+        self.max_per_tenant = max_per_tenant
+        self.max_pending = max_pending
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="itinerary-job"
+        )
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._inflight: Dict[str, Job] = {}
+        self._pending: "OrderedDict[str, deque]" = OrderedDict()
+        self._pending_count = 0
+        self._running: Dict[str, int] = {}
+        self._running_total = 0
+
+    def submit(self, tenant: str, dedup_key: str, fn: Callable[[], Any]) -> Job:
+        """
+        Queues fn for execution. If a job with the same dedup_key is
+        already queued or running, that job is returned instead.
+        """
+        with self._lock:
+            self._purge_finished()
+
+            existing = self._inflight.get(dedup_key)
+            if existing:
+                return existing
+
+            if self._pending_count >= self.max_pending:
+                raise QueueFullError("Itinerary queue is full, retry later")
+
+            job = Job(
+                job_id=uuid.uuid4().hex,
+                tenant=tenant,
+                dedup_key=dedup_key,
+                fn=fn,
+            )
+            self._jobs[job.job_id] = job
+            self._inflight[dedup_key] = job
+            self._pending.setdefault(tenant, deque()).append(job)
+            self._pending_count += 1
+
+            self._dispatch()
+            return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    # ✅ Must be called with the lock held
+    def _dispatch(self):
+        while self._running_total < self.max_workers and self._pending:
+            tenant = next(
+                (
+                    t for t in self._pending
+                    if self._running.get(t, 0) < self.max_per_tenant
+                ),
+                None,
+            )
+            if tenant is None:
+                return
+
+            queue = self._pending[tenant]
+            job = queue.popleft()
+            self._pending_count -= 1
+
+            # Round-robin: served tenant moves to the back
+            del self._pending[tenant]
+            if queue:
+                self._pending[tenant] = queue
+
+            job.status = "running"
+            self._running[tenant] = self._running.get(tenant, 0) + 1
+            self._running_total += 1
+
+            self._executor.submit(self._run, job)
+
+    def _run(self, job: Job):
+        try:
+            job.result = job.fn()
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            job.fn = None
+
+            with self._lock:
+                self._inflight.pop(job.dedup_key, None)
+                self._running[job.tenant] -= 1
+                if not self._running[job.tenant]:
+                    del self._running[job.tenant]
+                self._running_total -= 1
+                self._dispatch()
+
+            job.done.set()
+
+    def _purge_finished(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+itinerary_jobs = JobQueue()
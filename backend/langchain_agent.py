@@ -1,16 +1,27 @@
-from typing import List
+import re
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, List, Tuple
 from pydantic import BaseModel
 
-from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain.agents import create_tool_calling_agent
 from langchain.tools import StructuredTool
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_groq import ChatGroq
 
-from .rag_pipeline import retrieve_context
+from .retrievers import retrieve_context
 from .tools.weather_tool import get_live_weather
+from .tools.forecast_tool import forecast_answer
 from .tools.free_routes_tool import get_multiple_routes
 from .memory import memory
+from .concurrent_executor import ConcurrentAgentExecutor
+from .intent_router import classify_intent, Intent
+from .guardrails import violates_guardrails, guardrail_response
+from .metrics import registry
+from .llm_gateway import EXPECTED_COMPLETION_TOKENS, estimate_tokens, gateway
 from .config import GROQ_API_KEY
+from .llm_router import GROQ_BASE_URL, SMALL_MODEL, llm_router
 
 
 # =========================
@@ -30,12 +41,47 @@ class RagInput(BaseModel):
 
 
 # =========================
-# ✅ LLM
+# ✅ LLM (ADMITTED BY THE SHARED GATEWAY)
 # =========================
-llm = ChatGroq(
+class GovernedChatGroq(ChatGroq):
+    """
+    ChatGroq whose calls wait for the LLM gateway's rate limiter and
+    are retried by it, on the chat lane. The model is picked per call
+    by llm_router (task "agent") and its latency fed back to it.
+    """
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        estimated = (
+            sum(estimate_tokens(str(m.content)) for m in messages)
+            + EXPECTED_COMPLETION_TOKENS
+        )
+        candidate = llm_router.select("agent")
+
+        def request():
+            start = time.perf_counter()
+            try:
+                result = super(GovernedChatGroq, self)._generate(
+                    messages, stop=stop, run_manager=run_manager,
+                    model=candidate.model, **kwargs
+                )
+            except Exception:
+                llm_router.record(candidate, time.perf_counter() - start, ok=False)
+                raise
+            llm_router.record(candidate, time.perf_counter() - start)
+
+            usage = (result.llm_output or {}).get("token_usage") or {}
+            gateway.record_usage(estimated, usage.get("total_tokens"))
+            return result
+
+        return gateway.call(request, lane="chat", tokens=estimated)
+
+
+llm = GovernedChatGroq(
     groq_api_key=GROQ_API_KEY,
-    model="llama-3.1-8b-instant",
+    groq_api_base=GROQ_BASE_URL,
+    model=SMALL_MODEL,
     temperature=0.2,
+    max_retries=0,
 )
 
 
@@ -57,7 +103,7 @@ routes_tool = StructuredTool.from_function(
 )
 
 def rag_fn(query: str) -> str:
-    context, _ = retrieve_context(query, k=4)
+    context, _ = retrieve_context(query, k=4, endpoint="agent")
     return context
 
 rag_tool = StructuredTool.from_function(
@@ -105,7 +151,8 @@ agent = create_tool_calling_agent(
     
 )
 
-agent_executor = AgentExecutor(
+# Tool calls from the same step run concurrently (see concurrent_executor)
+agent_executor = ConcurrentAgentExecutor(
     agent=agent,
     tools=tools,
     verbose=True,
@@ -113,10 +160,166 @@ agent_executor = AgentExecutor(
 )
 
 
+# =========================
+# ✅ GROUNDING CHECK (SINGLE-PASS MODE)
+# =========================
+# "verify": re-ground with a second LLM call only when the agent's answer
+#           drops live tool facts.  "always": legacy forced second call.
+GROUNDING_MODE = "verify"
+
+_TEMP_RE = re.compile(r"(-?\d+(?:\.\d+)?)\s*°C")
+_HUMIDITY_RE = re.compile(r"Humidity\s+(\d+)%")
+
+GROUNDING_STATS: Dict[str, float] = {
+    "fast_path": 0,
+    "fast_path_seconds": 0.0,
+    "single_pass": 0,
+    "grounding_calls": 0,
+    "agent_seconds": 0.0,
+    "grounding_seconds": 0.0,
+}
+_stats_lock = threading.Lock()
+
+
+def _record_stat(name: str, value: float):
+    with _stats_lock:
+        GROUNDING_STATS[name] += value
+
+    if name.endswith("_seconds"):
+        registry.observe("travel_stage_seconds", value, stage=name[: -len("_seconds")])
+    else:
+        registry.inc("travel_agent_turns_total", amount=value, path=name)
+
+
+def _tool_facts(steps: List[Tuple[Any, Any]]) -> List[List[str]]:
+    """
+    Key facts each tool output must contribute to the answer.
+    Every fact is a list of acceptable spellings (e.g. 31.4 or 31).
+    """
+    facts = []
+
+    for action, observation in steps:
+        if isinstance(observation, dict):
+            # routes tool → recommended total distance
+            distance = observation.get("recommended", {}).get("total_distance_km")
+            if distance is not None:
+                facts.append([f"{distance:g}", str(int(round(distance)))])
+            continue
+
+        text = str(observation)
+        if text.startswith("ERROR"):
+            continue
+
+        # weather tool → actual temperature + humidity (feels-like optional)
+        temp = _TEMP_RE.search(text)
+        if temp:
+            number = float(temp.group(1))
+            facts.append([f"{number:g}", str(int(round(number)))])
+
+        humidity = _HUMIDITY_RE.search(text)
+        if humidity:
+            facts.append([humidity.group(1)])
+
+    return facts
+
+
+def _is_grounded(output: str, steps: List[Tuple[Any, Any]]) -> bool:
+    return all(
+        any(spelling in output for spelling in fact)
+        for fact in _tool_facts(steps)
+    )
+
+
+# =========================
+# ✅ FAST PATH (NO TOOL-SELECTION ROUND-TRIP)
+# =========================
+FAST_PATH_INTENTS = {"weather", "route", "policy"}
+
+FAST_PATH_INSTRUCTIONS = {
+    "weather": (
+        "Quote the exact temperature (or forecast range), humidity and description, "
+        "then say casually whether it is a good time to go out."
+    ),
+    "route": (
+        "Summarise the recommended, fastest and cheapest options with their "
+        "distance and time."
+    ),
+    "policy": (
+        "Answer strictly from the policy text. If it does not cover the question, say so."
+    ),
+}
+
+# Same system rules as the agent, tool data injected up front
+fast_path_prompt = ChatPromptTemplate.from_messages(
+    [
+        prompt.messages[0],
+        MessagesPlaceholder(variable_name="chat_history"),
+        (
+            "human",
+            "{input}\n\nLIVE DATA (MANDATORY):\n{tool_data}\n\nINSTRUCTION:\n{instruction}",
+        ),
+    ]
+)
+
+
+def _route_summary(routes: Dict[str, Any]) -> str:
+    lines = []
+    for label, option in routes.items():
+        legs = ", ".join(
+            f"{seg['mode']} {seg['from']} → {seg['to']} ({seg['distance_km']} km, {seg['time_min']} min)"
+            for seg in option["segments"]
+        )
+        lines.append(
+            f"{label.upper()}: {option['total_distance_km']} km, "
+            f"{option['total_time_min']} min | {legs}"
+        )
+    return "\n".join(lines)
+
+
+def _trip_start(user_prefs: Dict[str, Any]) -> date | None:
+    start = user_prefs.get("start_date")
+    return date.fromisoformat(start) if start else None
+
+
+def _run_fast_path_tool(intent: Intent, message: str, user_prefs: Dict[str, Any]) -> str:
+    if intent.name == "weather":
+        # Day follow-ups come from the cached per-day forecast
+        if "when" in intent.args:
+            return forecast_answer(intent.args["city"], intent.args["when"], _trip_start(user_prefs))
+        return get_live_weather(intent.args["city"])
+    if intent.name == "route":
+        return _route_summary(
+            get_multiple_routes(intent.args["origin"], intent.args["destination"])
+        )
+    return rag_fn(message)
+
+
+def _fast_path_answer(
+    intent: Intent,
+    message: str,
+    chat_history: List[Tuple[str, str]],
+    context_block: str,
+    user_prefs: Dict[str, Any],
+) -> str:
+    tool_data = _run_fast_path_tool(intent, message, user_prefs)
+
+    return llm.invoke(
+        fast_path_prompt.format_messages(
+            input=message + context_block,
+            chat_history=chat_history,
+            tool_data=tool_data,
+            instruction=FAST_PATH_INSTRUCTIONS[intent.name],
+        )
+    ).content
+
+
 # =========================
 # ✅ MAIN AGENT ENTRY
 # =========================
 def agentic_answer(session_id: str, message: str, name: str | None = None) -> str:
+    if violates_guardrails(message):
+        return guardrail_response()
+
     if name:
         memory.update_prefs(session_id, {"name": name})
 
@@ -135,21 +338,53 @@ def agentic_answer(session_id: str, message: str, name: str | None = None) -> st
         elif msg.startswith("Assistant:"):
             chat_history.append(("ai", msg.replace("Assistant:", "").strip()))
 
+    # =========================
+    # ✅ FAST PATH: obvious weather / route / policy queries
+    # =========================
+    intent = classify_intent(message)
+
+    # "will it rain on day 2?" → the destination of the planned trip
+    if intent.name == "weather" and "city" not in intent.args:
+        if user_prefs.get("destination"):
+            intent.args["city"] = user_prefs["destination"]
+        else:
+            intent = Intent("agent", 0.0)
+
+    if intent.name in FAST_PATH_INTENTS:
+        start = time.perf_counter()
+        output = _fast_path_answer(intent, message, chat_history, context_block, user_prefs)
+        _record_stat("fast_path", 1)
+        _record_stat("fast_path_seconds", time.perf_counter() - start)
+
+        memory.add_turn(session_id, f"User: {message}")
+        memory.add_turn(session_id, f"Assistant: {output}")
+        return output
+
+    start = time.perf_counter()
     result = agent_executor.invoke(
         {
             "input": message + context_block,
             "chat_history": chat_history,
         }
     )
+    _record_stat("agent_seconds", time.perf_counter() - start)
 
 
     output = result["output"]
     steps = result.get("intermediate_steps", [])
 
     # =========================
-    # ✅ FORCE TOOL OUTPUT (NO GENERIC REPLIES)
+    # ✅ FORCE TOOL OUTPUT ONLY WHEN THE ANSWER DROPPED IT
     # =========================
-    if steps:
+    needs_grounding = bool(steps) and (
+        GROUNDING_MODE == "always" or not _is_grounded(output, steps)
+    )
+
+    if steps and not needs_grounding:
+        # Tool data already in the answer → second LLM call skipped
+        _record_stat("single_pass", 1)
+    elif needs_grounding:
+        start = time.perf_counter()
         tool_results = "\n".join([str(step[1]) for step in steps])
 
         final_prompt = f"""
@@ -165,6 +400,9 @@ Give a direct factual answer.
 """
 
         output = llm.invoke(final_prompt).content
+        _record_stat("grounding_calls", 1)
+        _record_stat("grounding_seconds", time.perf_counter() - start)
+        print(f"🔁 Agent answer re-grounded on tool data | stats={GROUNDING_STATS}")
 
     memory.add_turn(session_id, f"User: {message}")
     memory.add_turn(session_id, f"Assistant: {output}")
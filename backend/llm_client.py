@@ -1,17 +1,23 @@
+import json
 from typing import List, Optional
-from groq import Groq
 from .config import GROQ_API_KEY
+from .llm_gateway import GatewayOverloaded, estimate_tokens, gateway
+from .llm_router import GROQ_BASE_URL, TASK_LANE, llm_router
+from .metrics import span, record_upstream_error
+from .shared_cache import shared_cache
 
 if not GROQ_API_KEY or GROQ_API_KEY == "YOUR_GROQ_API_KEY_HERE":
     raise RuntimeError("GROQ_API_KEY is missing in backend/config.py")
 
-client = Groq(api_key=GROQ_API_KEY)
+LLM_CACHE_TTL = 3600       # ✅ identical prompts (same history) answered from cache
+SHORT_CHAT_TOKENS = 1500   # ✅ longer chat prompts go to the larger model first
 
 
 def chat_with_llm(
     prompt: str,
     system_message: Optional[str] = None,
     history: Optional[List[str]] = None,
+    task: str = "chat",
 ) -> str:
     messages = []
 
@@ -34,31 +40,26 @@ def chat_with_llm(
 
     messages.append({"role": "user", "content": prompt})
 
-    # response = client.chat.completions.create(
-    #     model="llama-3.1-8b-instant",
-    #     messages=messages,
-    #     temperature=0.4,
-    #     max_tokens=2000,
-    # )
-    #meta-llama/llama-4-scout-17b-16e-instruct
-
-    response = client.chat.completions.create(
-        model="meta-llama/llama-4-scout-17b-16e-instruct",
-        messages=messages,
-        temperature=0.4,
-        max_tokens=2000,
-    )
-    return response.choices[0].message.content.strip()
-
-
-
-
-
-
-
-
-
-
-
-
-
+    # Model per task is chosen by llm_router (see TASK_MODELS there)
+    if task == "chat" and sum(estimate_tokens(m["content"]) for m in messages) > SHORT_CHAT_TOKENS:
+        task = "chat_long"
+
+    return _complete(task, messages)
+
+
+@shared_cache.cached("llm", ttl=LLM_CACHE_TTL, scope=GROQ_BASE_URL or "")
+def _complete(task: str, messages: List[dict]) -> str:
+    def request():
+        with span("llm_call"):
+            return llm_router.complete(task, messages, temperature=0.4, max_tokens=2000)
+
+    try:
+        return gateway.coalesce(
+            (task, json.dumps(messages, sort_keys=True)), request, lane=TASK_LANE[task]
+        )
+    except GatewayOverloaded:
+        record_upstream_error("groq", "shed")
+        raise
+    except Exception:
+        record_upstream_error("groq")
+        raise
@@ -0,0 +1,276 @@
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .metrics import registry
+
+# ✅ Provider limits (defaults are Groq's free tier, override per account)
+GROQ_TPM = int(os.getenv("GROQ_TPM", "30000"))
+GROQ_RPM = int(os.getenv("GROQ_RPM", "30"))
+
+MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "64"))
+MAX_RETRIES = 3
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+EXPECTED_COMPLETION_TOKENS = 512    # ✅ debited up front, corrected from usage
+
+# ✅ Lower number is served first; deadlines are seconds from submission
+LANE_PRIORITY = {"chat": 0, "itinerary": 1}
+LANE_DEADLINE = {"chat": 30.0, "itinerary": 120.0}
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class GatewayOverloaded(RuntimeError):
+    """
+    Raised instead of calling the provider when the request could not be
+    admitted before its deadline (queue full or limiter too far behind).
+    """
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prompts
+    return max(1, len(text) // 4)
+
+
+# =========================
+# ✅ TOKEN BUCKET
+# =========================
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def backlog_time(self, amount: float, now: float) -> float:
+        # Time until `amount` tokens (possibly several requests) are paid off
+        self._refill(now)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount: float):
+        # May go negative when actual usage exceeds the estimate
+        self.tokens -= amount
+
+
+class _Waiter:
+    __slots__ = ("lane", "tokens")
+
+    def __init__(self, lane: str, tokens: int):
+        self.lane = lane
+        self.tokens = tokens
+
+
+# =========================
+# ✅ GATEWAY
+# =========================
+class LLMGateway:
+    """
+    Every LLM call in the backend goes through call(). Requests wait in
+    a priority queue (chat lane ahead of itinerary lane) until both the
+    requests-per-minute and tokens-per-minute buckets allow them, are
+    shed with GatewayOverloaded when they cannot start before their
+    deadline, and are retried on 429 / 5xx / connection errors with
+    full-jitter exponential backoff. Identical concurrent requests
+    (same coalesce_key) share one upstream call.
+    """
+
+    def __init__(self, tpm: int = GROQ_TPM, rpm: int = GROQ_RPM, max_queue: int = MAX_QUEUE):
+        self.tpm = TokenBucket(tpm)
+        self.rpm = TokenBucket(rpm)
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._blocked_until = 0.0
+        self._inflight: Dict[Hashable, Future] = {}
+
+    # ---------- admission ----------
+    def _estimated_wait(self, tokens: int, now: float) -> float:
+        queued = sum(w.tokens for _, _, w in self._heap) + tokens
+        backlog = max(
+            self.tpm.backlog_time(queued, now),
+            self.rpm.backlog_time(len(self._heap) + 1, now),
+        )
+        return max(backlog, self._blocked_until - now)
+
+    def _admit(self, lane: str, tokens: int, deadline: float):
+        priority = LANE_PRIORITY.get(lane, len(LANE_PRIORITY))
+        waiter = _Waiter(lane, tokens)
+
+        with self._cond:
+            now = time.monotonic()
+            if len(self._heap) >= self.max_queue:
+                self._shed(lane, "queue_full")
+            if now + self._estimated_wait(tokens, now) > deadline:
+                self._shed(lane, "deadline")
+
+            heapq.heappush(self._heap, (priority, next(self._seq), waiter))
+            enqueued = now
+
+            while True:
+                now = time.monotonic()
+                head = self._heap[0][2]
+
+                if head is waiter:
+                    wait = max(
+                        self.tpm.wait_time(tokens, now),
+                        self.rpm.wait_time(1, now),
+                        self._blocked_until - now,
+                    )
+                    if wait <= 0:
+                        heapq.heappop(self._heap)
+                        self.tpm.take(tokens)
+                        self.rpm.take(1)
+                        self._cond.notify_all()
+                        break
+                else:
+                    wait = 0.05
+
+                if now + wait > deadline:
+                    self._heap.remove(next(e for e in self._heap if e[2] is waiter))
+                    heapq.heapify(self._heap)
+                    self._cond.notify_all()
+                    self._shed(lane, "deadline")
+
+                self._cond.wait(timeout=min(wait, deadline - now))
+
+        registry.observe("travel_llm_queue_seconds", time.monotonic() - enqueued, lane=lane)
+
+    def _shed(self, lane: str, reason: str):
+        registry.inc("travel_llm_requests_total", lane=lane, outcome=f"shed_{reason}")
+        raise GatewayOverloaded(f"LLM gateway shed {lane} request ({reason})")
+
+    def record_usage(self, estimated: int, actual: Optional[int]):
+        """
+        Correct the TPM bucket once the provider reports real usage.
+        """
+        if actual is None:
+            return
+        with self._cond:
+            self.tpm.take(actual - estimated)
+
+    def _back_off(self, seconds: float):
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    # ---------- call ----------
+    def call(
+        self,
+        fn: Callable[[], Any],
+        *,
+        lane: str = "chat",
+        tokens: int = 1,
+        deadline: Optional[float] = None,
+        coalesce_key: Optional[Hashable] = None,
+    ) -> Any:
+        if coalesce_key is not None:
+            return self.coalesce(
+                coalesce_key, lambda: self._call(fn, lane, tokens, deadline), lane=lane
+            )
+
+        return self._call(fn, lane, tokens, deadline)
+
+    def coalesce(self, key: Hashable, fn: Callable[[], Any], lane: str = "chat") -> Any:
+        """
+        Run fn once for all concurrent callers passing the same key.
+        """
+        with self._cond:
+            shared = self._inflight.get(key)
+            if shared is None:
+                self._inflight[key] = future = Future()
+        if shared is not None:
+            registry.inc("travel_llm_requests_total", lane=lane, outcome="coalesced")
+            return shared.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._cond:
+                self._inflight.pop(key, None)
+
+    def _call(self, fn, lane: str, tokens: int, deadline: Optional[float]) -> Any:
+        deadline_at = time.monotonic() + (deadline or LANE_DEADLINE.get(lane, 60.0))
+
+        for attempt in range(MAX_RETRIES + 1):
+            self._admit(lane, tokens, deadline_at)
+            try:
+                result = fn()
+                registry.inc("travel_llm_requests_total", lane=lane, outcome="ok")
+                return result
+            except Exception as e:
+                status = _status_code(e)
+                if not _is_retryable(e, status) or attempt == MAX_RETRIES:
+                    registry.inc("travel_llm_requests_total", lane=lane, outcome="error")
+                    raise
+
+                delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+                retry_after = _retry_after(e)
+                if status == 429:
+                    # Provider says we are over the limit: pause every lane
+                    delay = max(delay, retry_after or 1.0)
+                    self._back_off(delay)
+
+                if time.monotonic() + delay > deadline_at:
+                    registry.inc("travel_llm_requests_total", lane=lane, outcome="error")
+                    raise
+
+                registry.inc("travel_llm_requests_total", lane=lane, outcome="retry")
+                time.sleep(delay)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = (
+        getattr(error, "headers", None)
+        or getattr(getattr(error, "response", None), "headers", None)
+        or {}
+    )
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(error: Exception, status: Optional[int]) -> bool:
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # Socket errors (e.g. a pooled keep-alive connection closed by the server),
+    # groq.APIConnectionError / APITimeoutError, requests ConnectionError / Timeout
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    name = type(error).__name__
+    return "Connection" in name or "Timeout" in name
+
+
+registry.describe("travel_llm_requests_total", "LLM gateway outcomes by lane")
+registry.describe("travel_llm_queue_seconds", "Time an LLM request waited for admission")
+
+gateway = LLMGateway()
@@ -0,0 +1,386 @@
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import GROQ_API_KEY
+from .llm_gateway import EXPECTED_COMPLETION_TOKENS, estimate_tokens, gateway
+from .metrics import registry
+
+# ✅ Point at a local OpenAI-compatible stub for benchmarks/tests
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+
+# ✅ Optional second OpenAI-compatible provider (vLLM, Ollama /v1, OpenRouter...)
+LLM_FALLBACK_BASE_URL = os.getenv("LLM_FALLBACK_BASE_URL")
+LLM_FALLBACK_API_KEY = os.getenv("LLM_FALLBACK_API_KEY", "")
+LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL")
+
+SMALL_MODEL = "llama-3.1-8b-instant"
+LARGE_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+XL_MODEL = "llama-3.3-70b-versatile"
+
+REQUEST_TIMEOUT = 60.0
+EWMA_ALPHA = 0.2
+PRIOR_SECONDS = 2.0          # ✅ assumed latency before a model has samples
+PREFERENCE_STEP = 0.5        # ✅ a lower-ranked model must be this much faster to win
+FAILURES_BEFORE_COOLDOWN = 3
+COOLDOWN_SECONDS = 30.0
+
+HEDGING = os.getenv("LLM_HEDGING", "1") != "0"
+HEDGE_MIN_SAMPLES = 20       # ✅ below this, hedge after HEDGE_DEFAULT_SECONDS
+HEDGE_DEFAULT_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "10"))
+HEDGE_FLOOR_SECONDS = 0.5
+
+TASK_LANE = {"chat": "chat", "chat_long": "chat", "agent": "chat", "itinerary": "itinerary"}
+
+
+@dataclass(frozen=True)
+class Provider:
+    name: str
+    base_url: str            # OpenAI-compatible root, e.g. https://api.groq.com/openai/v1
+    api_key: str
+
+
+@dataclass(frozen=True)
+class Candidate:
+    provider: Provider
+    model: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider.name}:{self.model}"
+
+
+GROQ = Provider("groq", f"{(GROQ_BASE_URL or 'https://api.groq.com').rstrip('/')}/openai/v1", GROQ_API_KEY)
+FALLBACK = (
+    Provider("fallback", LLM_FALLBACK_BASE_URL.rstrip("/"), LLM_FALLBACK_API_KEY)
+    if LLM_FALLBACK_BASE_URL and LLM_FALLBACK_MODEL
+    else None
+)
+
+
+def _candidates(*models: str, fallback: bool = True) -> List[Candidate]:
+    candidates = [Candidate(GROQ, model) for model in models]
+    if fallback and FALLBACK:
+        candidates.append(Candidate(FALLBACK, LLM_FALLBACK_MODEL))
+    return candidates
+
+
+# ✅ Preference order per task: small model for short turns and tool selection
+TASK_MODELS: Dict[str, List[Candidate]] = {
+    "chat": _candidates(SMALL_MODEL, LARGE_MODEL),
+    "chat_long": _candidates(LARGE_MODEL, SMALL_MODEL),
+    "agent": _candidates(SMALL_MODEL, XL_MODEL, fallback=False),   # ChatGroq only
+    "itinerary": _candidates(LARGE_MODEL, XL_MODEL),
+}
+
+
+class LLMHTTPError(RuntimeError):
+    def __init__(self, status_code: int, headers, body: bytes):
+        super().__init__(f"LLM provider returned {status_code}: {body[:200]!r}")
+        self.status_code = status_code
+        self.headers = headers
+
+
+class AttemptCancelled(RuntimeError):
+    """
+    The attempt lost a hedge race and its connection was torn down.
+    """
+
+
+# =========================
+# ✅ LATENCY TRACKING
+# =========================
+class _ModelStats:
+    def __init__(self):
+        self.ewma: Optional[float] = None
+        self.samples: Deque[float] = deque(maxlen=200)
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+# =========================
+# ✅ KEEP-ALIVE CONNECTIONS THAT CAN BE ABORTED
+# =========================
+class _ConnectionPool:
+    """
+    http.client connections kept alive per host. Unlike a requests
+    Session, the attempt owns its socket, so a hedging loser can be
+    shut down mid-read instead of running to completion.
+    """
+
+    def __init__(self, max_idle: int = 8):
+        self.max_idle = max_idle
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _origin(base_url: str) -> Tuple[str, str, int]:
+        parts = urlsplit(base_url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        return parts.scheme, parts.hostname, port
+
+    def acquire(self, base_url: str) -> http.client.HTTPConnection:
+        origin = self._origin(base_url)
+        with self._lock:
+            idle = self._idle.get(origin)
+            if idle:
+                return idle.pop()
+
+        scheme, host, port = origin
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return conn_cls(host, port, timeout=REQUEST_TIMEOUT)
+
+    def release(self, base_url: str, conn: http.client.HTTPConnection):
+        origin = self._origin(base_url)
+        with self._lock:
+            idle = self._idle.setdefault(origin, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def warm(self, base_url: str):
+        conn = self.acquire(base_url)
+        conn.connect()
+        self.release(base_url, conn)
+
+
+_connections = _ConnectionPool()
+
+
+class _Attempt:
+    def __init__(self, candidate: Candidate, messages: List[dict], temperature: float, max_tokens: int):
+        self.candidate = candidate
+        self.payload = json.dumps({
+            "model": candidate.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        })
+        self.conn: Optional[http.client.HTTPConnection] = None
+        self.cancelled = False
+        self.started: Optional[float] = None
+        self.elapsed = 0.0
+        self.usage: Optional[int] = None
+
+    def run(self) -> str:
+        provider = self.candidate.provider
+        conn = self.conn = _connections.acquire(provider.base_url)
+        if self.cancelled:
+            conn.close()
+            raise AttemptCancelled(self.candidate.key)
+
+        start = self.started = time.perf_counter()
+        try:
+            conn.request(
+                "POST",
+                urlsplit(provider.base_url).path + "/chat/completions",
+                body=self.payload,
+                headers={
+                    "Authorization": f"Bearer {provider.api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            if self.cancelled:
+                raise AttemptCancelled(self.candidate.key)
+            raise
+        self.elapsed = time.perf_counter() - start
+
+        if response.will_close:
+            conn.close()
+        else:
+            _connections.release(provider.base_url, conn)
+
+        if response.status >= 400:
+            raise LLMHTTPError(response.status, response.headers, body)
+
+        data = json.loads(body)
+        self.usage = (data.get("usage") or {}).get("total_tokens")
+        return data["choices"][0]["message"]["content"].strip()
+
+    def cancel(self):
+        self.cancelled = True
+        sock = getattr(self.conn, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+# =========================
+# ✅ ROUTER
+# =========================
+class LLMRouter:
+    """
+    Picks a (provider, model) per task from live latency EWMAs and the
+    task's preference order, and hedges: if the chosen model has not
+    answered by its own p95, the next candidate gets the same request
+    and whichever finishes first wins; the loser's socket is shut down.
+    """
+
+    def __init__(self, task_models: Dict[str, List[Candidate]] = TASK_MODELS):
+        self.task_models = task_models
+        self._stats: Dict[str, _ModelStats] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-attempt")
+
+    def _stat(self, candidate: Candidate) -> _ModelStats:
+        with self._lock:
+            stat = self._stats.get(candidate.key)
+            if stat is None:
+                stat = self._stats[candidate.key] = _ModelStats()
+            return stat
+
+    def rank(self, task: str) -> List[Candidate]:
+        candidates = self.task_models.get(task) or self.task_models["chat"]
+        now = time.monotonic()
+
+        def score(item):
+            position, candidate = item
+            stat = self._stat(candidate)
+            cooling = stat.cooldown_until > now
+            latency = stat.ewma if stat.ewma is not None else PRIOR_SECONDS
+            return cooling, latency * (1 + PREFERENCE_STEP * position)
+
+        return [c for _, c in sorted(enumerate(candidates), key=score)]
+
+    def select(self, task: str) -> Candidate:
+        return self.rank(task)[0]
+
+    def record(self, candidate: Candidate, seconds: float, ok: bool = True):
+        stat = self._stat(candidate)
+        with self._lock:
+            if ok:
+                stat.ewma = seconds if stat.ewma is None else (
+                    EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * stat.ewma
+                )
+                stat.samples.append(seconds)
+                stat.failures = 0
+            else:
+                stat.failures += 1
+                if stat.failures >= FAILURES_BEFORE_COOLDOWN:
+                    stat.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+                    stat.failures = 0
+
+        if ok:
+            registry.observe("travel_llm_model_seconds", seconds, model=candidate.key)
+        else:
+            registry.inc("travel_llm_model_errors_total", model=candidate.key)
+
+    def hedge_after(self, candidate: Candidate) -> float:
+        p95 = self._stat(candidate).p95()
+        return max(HEDGE_FLOOR_SECONDS, p95 if p95 is not None else HEDGE_DEFAULT_SECONDS)
+
+    def _run(self, attempt: _Attempt, lane: str, tokens: int) -> str:
+        try:
+            text = gateway.call(attempt.run, lane=lane, tokens=tokens)
+        except AttemptCancelled:
+            # Lost the race: its latency so far is a lower bound, still worth learning
+            if attempt.started is not None:
+                self.record(attempt.candidate, time.perf_counter() - attempt.started)
+            raise
+        except Exception:
+            if not attempt.cancelled:
+                self.record(attempt.candidate, attempt.elapsed, ok=False)
+            raise
+
+        self.record(attempt.candidate, attempt.elapsed)
+        gateway.record_usage(tokens, attempt.usage)
+        return text
+
+    def complete(
+        self,
+        task: str,
+        messages: List[dict],
+        temperature: float = 0.4,
+        max_tokens: int = 2000,
+    ) -> str:
+        ranked = self.rank(task)
+        lane = TASK_LANE.get(task, "chat")
+        tokens = sum(estimate_tokens(m["content"]) for m in messages) + EXPECTED_COMPLETION_TOKENS
+
+        attempts = {}
+
+        def launch(candidate: Candidate):
+            attempt = _Attempt(candidate, messages, temperature, max_tokens)
+            attempts[self._pool.submit(self._run, attempt, lane, tokens)] = attempt
+
+        launch(ranked[0])
+        backups = ranked[1:]
+        hedge_at = self.hedge_after(ranked[0]) if HEDGING and backups else None
+        errors: List[Exception] = []
+
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, timeout=hedge_at, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Slower than its p95: race the next candidate
+                hedge_at = None
+                launch(backups.pop(0))
+                registry.inc("travel_llm_hedges_total", task=task, result="launched")
+                pending = {f for f in attempts if not f.done()}
+                continue
+
+            for future in done:
+                try:
+                    text = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+
+                winner = attempts[future]
+                for other_future, other in attempts.items():
+                    if other is not winner and not other_future.done():
+                        other.cancel()
+                if len(attempts) > 1:
+                    result = "primary_won" if winner.candidate == ranked[0] else "hedge_won"
+                    registry.inc("travel_llm_hedges_total", task=task, result=result)
+                return text
+
+            # Failed outright: fail over to the next candidate right away
+            if not pending and backups:
+                hedge_at = None
+                launch(backups.pop(0))
+                pending = {f for f in attempts if not f.done()}
+
+        raise errors[-1]
+
+    def warm(self):
+        providers = {c.provider.base_url for cands in self.task_models.values() for c in cands}
+        for base_url in providers:
+            _connections.warm(base_url)
+
+    def _ewma_samples(self):
+        with self._lock:
+            items = [(key, stat.ewma) for key, stat in self._stats.items() if stat.ewma is not None]
+        for key, ewma in items:
+            yield "travel_llm_model_ewma_seconds", "gauge", {"model": key}, ewma
+
+
+registry.describe("travel_llm_model_seconds", "Provider latency per model")
+registry.describe("travel_llm_model_errors_total", "Failed LLM attempts per model")
+registry.describe("travel_llm_hedges_total", "Hedged LLM requests by outcome")
+registry.describe("travel_llm_model_ewma_seconds", "Latency EWMA used for model selection")
+
+llm_router = LLMRouter()
+registry.register_collector(llm_router._ewma_samples)
@@ -1,20 +1,68 @@
-from typing import Dict, Any, List
-
-from fastapi import FastAPI
+import asyncio
+import hmac
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Dict, Any, List, Tuple
+
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
 from .llm_client import chat_with_llm
-from .rag_pipeline import retrieve_context
+from .llm_gateway import GatewayOverloaded
+from .rag_pipeline import REINDEX_STATUS, get_index_version, start_reindex
+from .retrievers import RETRIEVER_BACKENDS, RETRIEVER_DEFAULT, RETRIEVER_SHADOW_RATE, retrieve_context, shadow_stats
 from .itinerary import build_itinerary
+from .itinerary_cache import itinerary_cache, make_cache_key
 from .memory import memory
+from .degradation import track_degraded
+from .jobs import itinerary_jobs, QueueFullError
+from .middleware import GuardrailMiddleware
+from .metrics import registry, render_prometheus, span
+from .profiler import (
+    PROFILE_SAMPLE_RATE, profile_request, profiled, profiling_switch, recent_profiles, select_reason,
+)
+from .startup import STARTUP_ERRORS, STARTUP_TIMINGS, is_ready, warm_up
 
+from .tools.circuit_breaker import circuit_summary, open_circuits
 from .tools.free_routes_tool import get_multiple_routes
 from .tools.weather_tool import get_live_weather
-import re
+from .tools.forecast_tool import DAY_PHRASE, forecast_answer, starts_in_window, trip_forecast
+from .places import extract_places, lookup_place
+
+
+# ✅ Indexes, DBs and clients are warmed before the app reports ready
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(warm_up)
+    yield
 
-app = FastAPI(title="Travel Planner Chatbot")
 
+app = FastAPI(title="Travel Planner Chatbot", lifespan=lifespan)
+
+# ✅ /admin/* requires a matching X-Admin-Token; without ADMIN_TOKEN the admin API is off
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+LLM_RETRY_AFTER_SECONDS = 5
+
+
+# ✅ Shed by the LLM gateway → fast 503 instead of a long wait and a 500
+@app.exception_handler(GatewayOverloaded)
+async def llm_overloaded_handler(request: Request, exc: GatewayOverloaded):
+    return JSONResponse(
+        {"detail": "The assistant is busy right now, please retry shortly."},
+        status_code=503,
+        headers={"Retry-After": str(LLM_RETRY_AFTER_SECONDS)},
+    )
+
+
+# ✅ Blocked content is rejected before any retrieval or LLM work.
+# Added before CORS so CORS wraps it: blocked replies keep their
+# Access-Control-Allow-Origin and browser clients can read them.
+app.add_middleware(GuardrailMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +73,45 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        # Set only when this answer used a stale reading or a fallback route
+        with track_degraded() as degraded:
+            response = await call_next(request)
+        status = response.status_code
+
+        if degraded:
+            response.headers["X-Upstream-Degraded"] = ",".join(sorted(degraded))
+        return response
+    finally:
+        route = request.scope.get("route")
+        registry.observe(
+            "travel_request_seconds",
+            time.perf_counter() - start,
+            path=getattr(route, "path", "unmatched"),
+            method=request.method,
+            status=str(status),
+        )
+
+
+# ✅ X-Profile: <admin token> (or a sampled fraction) → flamegraph files in PROFILE_DIR
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    reason = select_reason(request.headers.get("x-profile"), ADMIN_TOKEN)
+    if reason is None:
+        return await call_next(request)
+
+    with profile_request(reason, request.method, request.url.path) as meta:
+        response = await call_next(request)
+
+    if "profile_id" in meta:
+        response.headers["X-Profile-Id"] = meta["profile_id"]
+    return response
+
+
 class ChatRequest(BaseModel):
     session_id: str
     message: str
@@ -43,49 +130,75 @@ class ItineraryRequest(BaseModel):
     budget: float = 500.0
     interests: List[str] = []
     food_preferences: str | None = None
+    start_date: date | None = None
 
 
 class ItineraryResponse(BaseModel):
     itinerary_text: str
 
 
+class ItineraryJobResponse(BaseModel):
+    job_id: str
+    status: str
+    itinerary_text: str | None = None
+    cache: str | None = None
+    error: str | None = None
+
+
 @app.get("/")
 def root() -> Dict[str, str]:
     return {"message": "Travel planner backend running"}
 
 
-from .tools.weather_tool import get_live_weather
-import re
+@app.get("/ready")
+def ready_endpoint() -> JSONResponse:
+    payload = {
+        "ready": is_ready(),
+        "startup_seconds": dict(STARTUP_TIMINGS),
+        "errors": dict(STARTUP_ERRORS),
+    }
+    return JSONResponse(payload, status_code=200 if payload["ready"] else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    return PlainTextResponse(
+        render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
 
 
 @app.post("/chat", response_model=ChatResponse)
+@profiled
 def chat_endpoint(body: ChatRequest):
   
 
     if body.name:
         memory.update_prefs(body.session_id, {"name": body.name})
 
-    # ✅ CITY EXTRACTION
-    city_match = re.findall(
-        r"visit ([A-Za-z ]+)|in ([A-Za-z ]+)|weather in ([A-Za-z ]+)",
-        body.message,
-        re.IGNORECASE,
-    )
-
-    extracted_city = None
-    if city_match:
-        extracted_city = next(
-            (c.strip() for group in city_match for c in group if c),
-            None,
-        )
+    # ✅ PLACE EXTRACTION (gazetteer automaton, canonical names)
+    with span("place_extraction"):
+        places = extract_places(body.message)
+    extracted_place = places[0] if places else None
 
-    # ✅ LIVE WEATHER (FORCED)
+    # ✅ LIVE WEATHER (FORCED) / DAY FORECAST FOR "TOMORROW", "DAY 2", ...
     weather_info = None
-    if extracted_city:
-        weather_info = get_live_weather(extracted_city)
+    when = DAY_PHRASE.search(body.message)
+    if when:
+        prefs = memory.get_prefs(body.session_id)
+        place = extracted_place or lookup_place(prefs.get("destination") or "")
+        start = prefs.get("start_date")
+        if place:
+            weather_info = forecast_answer(
+                place.name, when.group(0), date.fromisoformat(start) if start else None,
+                place.lat, place.lon,
+            )
+    elif extracted_place:
+        weather_info = get_live_weather(
+            extracted_place.name, extracted_place.lat, extracted_place.lon
+        )
 
     # ✅ RAG + MEMORY
-    rag_context, _ = retrieve_context(body.message, k=4)
+    rag_context, _ = retrieve_context(body.message, k=4, endpoint="chat")
     history = memory.get_history(body.session_id)
 
     system_msg = (
@@ -119,9 +232,50 @@ def chat_endpoint(body: ChatRequest):
     return ChatResponse(reply=reply, used_rag=True)
 
 
-@app.post("/generate_itinerary", response_model=ItineraryResponse)
-def generate_itinerary_endpoint(body: ItineraryRequest) -> ItineraryResponse:
-    # store prefs
+def _trip_forecast(body: ItineraryRequest) -> str:
+    if body.start_date is None:
+        return ""
+    place = lookup_place(body.destination)
+    return trip_forecast(
+        place.name if place else body.destination, body.start_date, body.days,
+        place.lat if place else None, place.lon if place else None,
+    )
+
+
+def _generate_itinerary_text(body: ItineraryRequest) -> str:
+    question = f"Travel guide and main attractions for {body.destination}"
+    rag_context, _ = retrieve_context(question, k=6, endpoint="itinerary")
+
+    return build_itinerary(
+        destination=body.destination,
+        days=body.days,
+        budget=body.budget,
+        interests=body.interests,
+        food_pref=body.food_preferences,
+        rag_context=rag_context,
+        weather_forecast=_trip_forecast(body),
+    )
+
+
+def _itinerary_cache_key(body: ItineraryRequest) -> str:
+    # A trip inside the forecast window is re-planned once a day with fresh weather
+    forecast_date = None
+    if body.start_date is not None and starts_in_window(body.start_date):
+        forecast_date = date.today().isoformat()
+
+    return make_cache_key(
+        destination=body.destination,
+        days=body.days,
+        budget=body.budget,
+        interests=body.interests,
+        food_preferences=body.food_preferences,
+        index_version=get_index_version(),
+        start_date=body.start_date.isoformat() if body.start_date else None,
+        forecast_date=forecast_date,
+    )
+
+
+def _store_itinerary_prefs(body: ItineraryRequest):
     memory.update_prefs(
         body.session_id,
         {
@@ -130,27 +284,193 @@ def generate_itinerary_endpoint(body: ItineraryRequest) -> ItineraryResponse:
             "budget": body.budget,
             "interests": body.interests,
             "food_preferences": body.food_preferences,
+            "start_date": body.start_date.isoformat() if body.start_date else None,
         },
     )
 
-    question = f"Travel guide and main attractions for {body.destination}"
-    rag_context, _ = retrieve_context(question, k=6)
 
-    text = build_itinerary(
-        destination=body.destination,
-        days=body.days,
-        budget=body.budget,
-        interests=body.interests,
-        food_pref=body.food_preferences,
-        rag_context=rag_context,
+def _cached_itinerary(body: ItineraryRequest, cache_key: str) -> Tuple[str, str]:
+    return itinerary_cache.get_or_generate(
+        cache_key, lambda: _generate_itinerary_text(body)
     )
+
+
+@app.post("/generate_itinerary", response_model=ItineraryResponse)
+@profiled
+def generate_itinerary_endpoint(
+    body: ItineraryRequest, response: Response
+) -> ItineraryResponse:
+    _store_itinerary_prefs(body)
+
+    # ✅ CACHE (canonical trip params + corpus index version)
+    text, cache_status = _cached_itinerary(body, _itinerary_cache_key(body))
+    response.headers["X-Itinerary-Cache"] = cache_status
+
     return ItineraryResponse(itinerary_text=text)
 
+
+# =========================
+# ✅ ITINERARY JOBS (submit → poll / SSE)
+# =========================
+def _job_response(job) -> ItineraryJobResponse:
+    text, cache_status = job.result if job.status == "done" else (None, None)
+    return ItineraryJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        itinerary_text=text,
+        cache=cache_status,
+        error=job.error,
+    )
+
+
+@app.post("/itinerary_jobs", response_model=ItineraryJobResponse, status_code=202)
+def submit_itinerary_job(
+    body: ItineraryRequest,
+    x_tenant_id: str | None = Header(default=None),
+) -> ItineraryJobResponse:
+    _store_itinerary_prefs(body)
+
+    cache_key = _itinerary_cache_key(body)
+
+    try:
+        job = itinerary_jobs.submit(
+            tenant=x_tenant_id or body.session_id,
+            dedup_key=cache_key,
+            fn=lambda: _cached_itinerary(body, cache_key),
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return _job_response(job)
+
+
+@app.get("/itinerary_jobs/{job_id}", response_model=ItineraryJobResponse)
+def get_itinerary_job(job_id: str) -> ItineraryJobResponse:
+    job = itinerary_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+
+@app.get("/itinerary_jobs/{job_id}/events")
+async def itinerary_job_events(job_id: str):
+    job = itinerary_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        last_status = None
+        while True:
+            if job.status != last_status:
+                last_status = job.status
+                payload = _job_response(job).model_dump()
+                yield f"event: {job.status}\ndata: {json.dumps(payload)}\n\n"
+
+            if job.done.is_set() and job.status == last_status:
+                return
+
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+# =========================
+# ✅ ADMIN
+# =========================
+def _require_admin(token: str | None):
+    # Fail closed: no configured token means no admin API at all
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.post("/admin/reindex", status_code=202)
+def admin_reindex(
+    shards: str | None = None,
+    x_admin_token: str | None = Header(default=None),
+) -> Dict[str, Any]:
+    _require_admin(x_admin_token)
+
+    # ?shards=policy,company rebuilds only those; default is every shard
+    selected = [name.strip() for name in shards.split(",") if name.strip()] if shards else None
+    try:
+        started = start_reindex(selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "started": started,
+        "current_version": get_index_version(),
+        "rebuild": dict(REINDEX_STATUS),
+    }
+
+
+@app.get("/admin/reindex")
+def admin_reindex_status(x_admin_token: str | None = Header(default=None)) -> Dict[str, Any]:
+    _require_admin(x_admin_token)
+
+    return {
+        "current_version": get_index_version(),
+        "rebuild": dict(REINDEX_STATUS),
+    }
+
+
+@app.get("/admin/retrievers")
+def admin_retrievers(x_admin_token: str | None = Header(default=None)) -> Dict[str, Any]:
+    _require_admin(x_admin_token)
+
+    return {
+        "default": RETRIEVER_DEFAULT,
+        "endpoints": dict(RETRIEVER_BACKENDS),
+        "shadow_rate": RETRIEVER_SHADOW_RATE,
+        "shadow": shadow_stats.summary(),
+        "shadow_errors": shadow_stats.errors,
+    }
+
+
+@app.get("/admin/circuits")
+def admin_circuits(x_admin_token: str | None = Header(default=None)) -> Dict[str, Any]:
+    _require_admin(x_admin_token)
+
+    return {"open": open_circuits(), "hosts": circuit_summary()}
+
+
+@app.get("/admin/profiling")
+def admin_profiling(
+    limit: int = 20,
+    x_admin_token: str | None = Header(default=None),
+) -> Dict[str, Any]:
+    _require_admin(x_admin_token)
+
+    return {
+        "rate": profiling_switch.rate(),
+        "default_rate": PROFILE_SAMPLE_RATE,
+        "override": profiling_switch.settings(),
+        "profiles": recent_profiles(limit),
+    }
+
+
+@app.post("/admin/profiling")
+def admin_set_profiling(
+    rate: float,
+    minutes: float = 10.0,
+    x_admin_token: str | None = Header(default=None),
+) -> Dict[str, Any]:
+    _require_admin(x_admin_token)
+
+    if not 0.0 <= rate <= 1.0 or minutes <= 0:
+        raise HTTPException(status_code=400, detail="rate must be in [0, 1] and minutes > 0")
+
+    # Expires on its own, so a forgotten toggle never profiles forever
+    return {"override": profiling_switch.set(rate, minutes)}
+
+
 class RouteRequest(BaseModel):
     origin: str
     destination: str
 
 
 @app.post("/routes")
+@profiled
 def routes_endpoint(body: RouteRequest):
     return get_multiple_routes(body.origin, body.destination)
@@ -1,19 +1,45 @@
 import sqlite3
+import threading
 from typing import List, Dict, Any
 import json
 import time
 
+from .metrics import span
+from .sqlite_writer import connect, enable_wal, get_writer
+
 DB_PATH = "memory.db"
 TTL_SECONDS = 1800   # ✅ 30 minutes TTL (change as needed)
 
 
 class Memory:
-    def __init__(self):
-        self._init_db()
-        self.cleanup_old_data()   # ✅ auto cleanup on startup
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._opened = False
+        self._open_lock = threading.Lock()
+
+    # ✅ Schema + startup cleanup run once, on warm-up or first use
+    def open(self):
+        if self._opened:
+            return
+
+        with self._open_lock:
+            if not self._opened:
+                self._init_db()
+                self._opened = True
+                self.cleanup_old_data()   # ✅ auto cleanup on startup
+
+    # ✅ Reads open their own connection; writes go through the single writer
+    def _connect(self) -> sqlite3.Connection:
+        self.open()
+        return connect(self.db_path)
+
+    def _write(self, *statements) -> int:
+        self.open()
+        return get_writer(self.db_path).write(*statements)
 
     def _init_db(self):
-        conn = sqlite3.connect(DB_PATH)
+        conn = connect(self.db_path)
+        enable_wal(conn)
         c = conn.cursor()
 
         c.execute("""
@@ -25,6 +51,12 @@ class Memory:
             )
         """)
 
+        # ✅ TTL cleanup runs on every turn; history is read per session in ts order
+        c.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_ts ON chat_history (ts)")
+        c.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chat_history_session_ts ON chat_history (session_id, ts)"
+        )
+
         c.execute("""
             CREATE TABLE IF NOT EXISTS user_prefs (
                 session_id TEXT PRIMARY KEY,
@@ -38,49 +70,43 @@ class Memory:
     # ✅ TTL Cleanup Function
     def cleanup_old_data(self):
         cutoff = time.time() - TTL_SECONDS
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
 
         # Delete expired chat messages
-        c.execute("DELETE FROM chat_history WHERE ts < ?", (cutoff,))
-
-        conn.commit()
-        conn.close()
+        self._write(("DELETE FROM chat_history WHERE ts < ?", (cutoff,)))
 
     def get_history(self, session_id: str) -> List[str]:
-        self.cleanup_old_data()   # ✅ cleanup before fetching
+        with span("history_load"):
+            self.cleanup_old_data()   # ✅ cleanup before fetching
 
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
+            conn = self._connect()
+            c = conn.cursor()
 
-        c.execute(
-            "SELECT role, content FROM chat_history WHERE session_id = ? ORDER BY ts",
-            (session_id,),
-        )
+            c.execute(
+                "SELECT role, content FROM chat_history WHERE session_id = ? ORDER BY ts",
+                (session_id,),
+            )
 
-        rows = c.fetchall()
-        conn.close()
+            rows = c.fetchall()
+            conn.close()
 
         return [f"{r.capitalize()}: {c}" for r, c in rows]
 
     def add_turn(self, session_id: str, text: str):
-        self.cleanup_old_data()   # ✅ cleanup before inserting
-
-        role, content = text.split(":", 1)
-
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-
-        c.execute(
-            "INSERT INTO chat_history VALUES (?, ?, ?, ?)",
-            (session_id, role.lower(), content.strip(), time.time()),
-        )
-
-        conn.commit()
-        conn.close()
+        with span("memory_write"):
+            role, content = text.split(":", 1)
+            now = time.time()
+
+            # ✅ cleanup + insert committed together
+            self._write(
+                ("DELETE FROM chat_history WHERE ts < ?", (now - TTL_SECONDS,)),
+                (
+                    "INSERT INTO chat_history VALUES (?, ?, ?, ?)",
+                    (session_id, role.lower(), content.strip(), now),
+                ),
+            )
 
     def get_prefs(self, session_id: str) -> Dict[str, Any]:
-        conn = sqlite3.connect(DB_PATH)
+        conn = self._connect()
         c = conn.cursor()
 
         c.execute(
@@ -100,28 +126,18 @@ class Memory:
         current = self.get_prefs(session_id)
         current.update(updates)
 
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-
-        c.execute("""
+        self._write(("""
             INSERT INTO user_prefs (session_id, prefs)
             VALUES (?, ?)
             ON CONFLICT(session_id) DO UPDATE SET prefs = excluded.prefs
-        """, (session_id, json.dumps(current)))
-
-        conn.commit()
-        conn.close()
+        """, (session_id, json.dumps(current))))
 
     # ✅ Optional: Explicitly delete a session
     def delete_session_data(self, session_id: str):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-
-        c.execute("DELETE FROM chat_history WHERE session_id = ?", (session_id,))
-        c.execute("DELETE FROM user_prefs WHERE session_id = ?", (session_id,))
-
-        conn.commit()
-        conn.close()
+        self._write(
+            ("DELETE FROM chat_history WHERE session_id = ?", (session_id,)),
+            ("DELETE FROM user_prefs WHERE session_id = ?", (session_id,)),
+        )
 
 
 memory = Memory()
@@ -0,0 +1,155 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# ✅ Seconds; upper bounds of the Prometheus histogram buckets
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.total += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+# =========================
+# ✅ IN-PROCESS METRICS REGISTRY
+# =========================
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, str] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._collectors: List[Callable[[], Iterator[Tuple[str, str, Dict[str, str], float]]]] = []
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram()
+            hist.observe(value)
+
+    def register_collector(self, fn):
+        """
+        fn() yields (name, type, labels, value) samples computed at scrape
+        time, e.g. from lru_cache.cache_info().
+        """
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        lines = []
+
+        with self._lock:
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            histograms = {
+                n: {k: (list(h.buckets), list(h.counts), h.total, h.sum) for k, h in s.items()}
+                for n, s in self._histograms.items()
+            }
+
+        for name, series in sorted(counters.items()):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+        for name, series in sorted(histograms.items()):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, (buckets, counts, total, total_sum) in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(buckets, counts):
+                    cumulative += count
+                    le = (("le", f"{bound:g}"),)
+                    lines.append(f"{name}_bucket{_format_labels(key, le)} {cumulative}")
+                lines.append(f'{name}_bucket{_format_labels(key, (("le", "+Inf"),))} {total}')
+                lines.append(f"{name}_sum{_format_labels(key)} {total_sum:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {total}")
+
+        typed = set()
+        for collector in self._collectors:
+            for name, kind, labels, value in collector():
+                if name not in typed:
+                    typed.add(name)
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+registry.describe("travel_request_seconds", "HTTP request latency by route")
+registry.describe("travel_stage_seconds", "Latency of one pipeline stage")
+registry.describe("travel_cache_requests_total", "Cache lookups by cache and result")
+registry.describe("travel_upstream_errors_total", "Failed calls to external services")
+
+
+# =========================
+# ✅ HELPERS USED ACROSS THE BACKEND
+# =========================
+@contextmanager
+def span(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe("travel_stage_seconds", time.perf_counter() - start, stage=stage)
+
+
+def record_cache(cache: str, result: str):
+    registry.inc("travel_cache_requests_total", cache=cache, result=result.lower())
+
+
+def record_upstream_error(upstream: str, reason: str = "error"):
+    registry.inc("travel_upstream_errors_total", upstream=upstream, reason=reason)
+
+
+def render_prometheus() -> str:
+    return registry.render()
@@ -0,0 +1,99 @@
+import json
+from typing import Any, Dict, List
+
+from fastapi.responses import JSONResponse
+
+from .guardrails import violates_guardrails, guardrail_response
+
+
+# =========================
+# ✅ GUARDRAIL MIDDLEWARE (PRE-RETRIEVAL, PRE-LLM)
+# =========================
+# path → request fields that are scanned
+GUARDED_FIELDS: Dict[str, List[str]] = {
+    "/chat": ["message"],
+    "/generate_itinerary": ["destination", "interests", "food_preferences"],
+    "/itinerary_jobs": ["destination", "interests", "food_preferences"],
+}
+
+
+def _blocked_payload(path: str) -> Dict[str, Any]:
+    if path == "/chat":
+        return {"reply": guardrail_response(), "used_rag": False}
+    if path == "/generate_itinerary":
+        return {"itinerary_text": guardrail_response()}
+    if path == "/itinerary_jobs":
+        # An already finished job: clients stop polling and show the text
+        return {
+            "job_id": "blocked",
+            "status": "done",
+            "itinerary_text": guardrail_response(),
+            "cache": None,
+            "error": None,
+        }
+    return {"detail": guardrail_response()}
+
+
+def _scanned_text(path: str, body: bytes) -> str:
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        return ""
+
+    if not isinstance(payload, dict):
+        return ""
+
+    parts = []
+    for name in GUARDED_FIELDS[path]:
+        value = payload.get(name)
+        if isinstance(value, list):
+            parts.extend(str(v) for v in value)
+        elif value:
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+class GuardrailMiddleware:
+    """
+    Pure ASGI middleware: buffers the JSON body of guarded POSTs, rejects
+    blocked content before the endpoint runs, and replays the body
+    untouched otherwise.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in GUARDED_FIELDS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        path = scope["path"]
+        if violates_guardrails(_scanned_text(path, body)):
+            response = JSONResponse(_blocked_payload(path), status_code=200)
+            await response(scope, receive, send)
+            return
+
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay_receive, send)
@@ -0,0 +1,169 @@
+import json
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .automaton import KeywordAutomaton, normalize_text
+from .config import CORPUS_DIR
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / "data" / "gazetteer.json"
+GUIDE_GLOB = "india_*_guide.txt"
+
+# Corpus headings that look like places but are not
+_NOT_PLACES = {"north", "south", "east", "west", "central", "coast", "hills"}
+_GENERIC_SUFFIXES = {"belt", "region", "area", "circuit"}
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    kind: str                   # state | city
+    state: str
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+
+
+# =========================
+# ✅ GAZETTEER + CORPUS PLACE NAMES
+# =========================
+_STATE_HEADING = re.compile(r"^\d+\)\s+([A-Z][A-Z &]+?)(?:\s+–.*)?$")
+_SECTION = re.compile(r"^\[(.+)\]$")
+
+
+def _split_names(text: str) -> List[str]:
+    names = []
+    for part in re.split(r"[/,&]", text):
+        main = re.sub(r"\(.*?\)", "", part)
+        names.append(main)
+        names.extend(re.findall(r"\((.*?)\)", part))
+
+    cleaned = []
+    for name in names:
+        words = name.replace(".", " ").split()
+        while words and words[-1].lower() in _GENERIC_SUFFIXES:
+            words.pop()
+        name = " ".join(words)
+        if (
+            name
+            and len(name.split()) <= 3
+            and all(w.isalpha() for w in name.split())
+            and name.lower() not in _NOT_PLACES
+        ):
+            cleaned.append(name)
+    return cleaned
+
+
+def _corpus_places() -> List[Place]:
+    """
+    State headings ("12) KERALA – ...") plus the city lists under
+    [Key Areas to Stay] and [Top Cities & Regions] in the state guides.
+    """
+    places = []
+
+    for path in sorted(Path(CORPUS_DIR).glob(GUIDE_GLOB)):
+        state = None
+        section = None
+
+        for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+            line = line.strip()
+
+            heading = _STATE_HEADING.match(line)
+            if heading:
+                state = heading.group(1).strip().title()
+                places.append(Place(name=state, kind="state", state=state))
+                section = None
+                continue
+
+            sec = _SECTION.match(line)
+            if sec:
+                section = sec.group(1)
+                continue
+
+            if not state or not line:
+                continue
+
+            if section == "Key Areas to Stay":
+                names = _split_names(line)
+            elif section == "Top Cities & Regions" and line.startswith("-"):
+                names = _split_names(line.lstrip("- ").split("–")[0])
+            else:
+                continue
+
+            places.extend(Place(name=n, kind="city", state=state) for n in names)
+
+    return places
+
+
+class PlaceRecognizer:
+    def __init__(self, gazetteer_path: Path = GAZETTEER_PATH, use_corpus: bool = True):
+        self._by_alias: Dict[str, Place] = {}
+
+        with open(gazetteer_path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+
+        # Gazetteer entries (with coordinates) win over corpus-only names
+        for entry in entries:
+            place = Place(
+                name=entry["name"],
+                kind=entry["kind"],
+                state=entry["state"],
+                lat=entry["lat"],
+                lon=entry["lon"],
+            )
+            for alias in [entry["name"], *entry.get("aliases", [])]:
+                self._by_alias.setdefault(normalize_text(alias), place)
+
+        if use_corpus:
+            for place in _corpus_places():
+                self._by_alias.setdefault(normalize_text(place.name), place)
+
+        self._automaton = KeywordAutomaton(self._by_alias.keys())
+
+    def extract(self, text: str) -> List[Place]:
+        """
+        Canonical places in order of appearance. Overlaps resolve to the
+        longest name ("New Delhi" over "Delhi").
+        """
+        spans = sorted(
+            self._automaton.iter_matches(normalize_text(text)),
+            key=lambda m: (m[0], -(m[1] - m[0])),
+        )
+
+        places = []
+        last_end = -1
+        for start, end, term in spans:
+            if start < last_end:
+                continue
+            last_end = end
+
+            place = self._by_alias[term]
+            if place not in places:
+                places.append(place)
+        return places
+
+    def lookup(self, name: str) -> Optional[Place]:
+        return self._by_alias.get(normalize_text(name))
+
+
+_recognizer: Optional[PlaceRecognizer] = None
+_recognizer_lock = threading.Lock()
+
+
+def get_recognizer() -> PlaceRecognizer:
+    global _recognizer
+
+    if _recognizer is None:
+        with _recognizer_lock:
+            if _recognizer is None:
+                _recognizer = PlaceRecognizer()
+    return _recognizer
+
+
+def extract_places(text: str) -> List[Place]:
+    return get_recognizer().extract(text)
+
+
+def lookup_place(name: str) -> Optional[Place]:
+    return get_recognizer().lookup(name)
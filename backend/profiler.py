@@ -0,0 +1,250 @@
+import contextvars
+import functools
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .metrics import registry
+from .shared_cache import shared_cache
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR") or PROJECT_ROOT / "backend" / "data" / "profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))   # ✅ fraction of traffic profiled
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))                  # ✅ newest profiles kept on disk
+SETTINGS_REFRESH_SECONDS = 2.0
+
+# Set by the HTTP middleware for a request that should be profiled
+_request_meta: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    "profile_request", default=None
+)
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    for marker in ("site-packages/", "dist-packages/"):
+        if marker in path:
+            path = path.split(marker, 1)[1]
+            break
+    else:
+        if path.startswith(str(PROJECT_ROOT)):
+            path = path[len(str(PROJECT_ROOT)) + 1:]
+    return f"{code.co_name} ({path})"
+
+
+# =========================
+# ✅ STACK SAMPLER (ONE THREAD, ONE REQUEST)
+# =========================
+class StackSampler:
+    """
+    Samples one thread's Python stack from a background thread through
+    sys._current_frames() and counts collapsed stacks ("root;...;leaf"),
+    the input format of flamegraph.pl and speedscope. Frames above
+    `stop_code` (the threadpool plumbing under an endpoint) are dropped.
+    """
+
+    def __init__(self, thread_id: int, interval_s: float, stop_code=None):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stop_code = stop_code
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            labels = []
+            while frame is not None and frame.f_code is not self.stop_code:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            del frame
+
+            if labels:
+                labels.reverse()
+                self.counts[";".join(labels)] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+    def top_self(self, limit: int = 10) -> List[Dict[str, Any]]:
+        leaves: Counter = Counter()
+        for stack, count in self.counts.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [
+            {"frame": frame, "samples": count, "pct": round(100 * count / self.samples, 1)}
+            for frame, count in leaves.most_common(limit)
+        ]
+
+
+# =========================
+# ✅ RUNTIME SWITCH (ADMIN TOGGLE, SHARED BY WORKERS)
+# =========================
+class ProfilingSwitch:
+    """
+    Sampling rate set from /admin/profiling for a limited time. It is
+    kept locally and in the shared cache, so every worker on the host
+    picks it up within SETTINGS_REFRESH_SECONDS. When it expires, the
+    PROFILE_SAMPLE_RATE default applies again.
+    """
+
+    def __init__(self):
+        self._local: Optional[Dict[str, float]] = None
+        self._shared: Optional[Dict[str, float]] = None
+        self._checked = 0.0
+
+    def set(self, rate: float, minutes: float) -> Dict[str, float]:
+        now = time.time()
+        settings = {"rate": rate, "set_at": now, "until": now + minutes * 60}
+        self._local = settings
+        shared_cache.set("profiling", "settings", settings, ttl=minutes * 60)
+        return settings
+
+    def settings(self) -> Optional[Dict[str, float]]:
+        now = time.time()
+        if now - self._checked > SETTINGS_REFRESH_SECONDS:
+            self._checked = now
+            self._shared = shared_cache.get("profiling", "settings")
+
+        live = [s for s in (self._local, self._shared) if s and s["until"] > now]
+        return max(live, key=lambda s: s["set_at"]) if live else None
+
+    def rate(self) -> float:
+        settings = self.settings()
+        return settings["rate"] if settings else PROFILE_SAMPLE_RATE
+
+
+profiling_switch = ProfilingSwitch()
+
+
+def select_reason(header_token: str | None, admin_token: str | None) -> Optional[str]:
+    """
+    Why this request is profiled, or None. The X-Profile header is
+    privileged: it must carry the admin token, and it is ignored when
+    no token is configured.
+    """
+    if header_token and admin_token and hmac.compare_digest(header_token.encode(), admin_token.encode()):
+        return "header"
+
+    rate = profiling_switch.rate()
+    if rate > 0 and random.random() < rate:
+        return "sampled"
+    return None
+
+
+@contextmanager
+def profile_request(reason: str, method: str, path: str):
+    """Marks the current request for profiling; yields its metadata."""
+    meta = {"reason": reason, "method": method, "path": path}
+    token = _request_meta.set(meta)
+    try:
+        yield meta
+    finally:
+        _request_meta.reset(token)
+
+
+# =========================
+# ✅ ENDPOINT DECORATOR
+# =========================
+def profiled(fn):
+    """
+    Profiles a sync endpoint when the request was marked by
+    profile_request(). The sampler follows the threadpool thread that
+    runs the endpoint; work handed to other pools is not sampled.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        meta = _request_meta.get()
+        if meta is None or "profile_id" in meta:
+            return fn(*args, **kwargs)
+
+        meta["profile_id"] = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        sampler = StackSampler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000, wrapper.__code__)
+        started = time.time()
+        start = time.perf_counter()
+        error = None
+
+        sampler.start()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            sampler.stop()
+            _write_profile(fn.__name__, meta, sampler, started, time.perf_counter() - start, error)
+
+    return wrapper
+
+
+def _write_profile(endpoint, meta, sampler: StackSampler, started, seconds, error):
+    profile_id = meta["profile_id"]
+    record = {
+        **meta,
+        "endpoint": endpoint,
+        "started_at": datetime.fromtimestamp(started, timezone.utc).isoformat(),
+        "duration_ms": round(seconds * 1000, 1),
+        "samples": sampler.samples,
+        "interval_ms": PROFILE_INTERVAL_MS,
+        "pid": os.getpid(),
+        "error": error,
+        "top_self": sampler.top_self(),
+        "collapsed": f"{profile_id}.collapsed",
+    }
+
+    try:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        (PROFILE_DIR / f"{profile_id}.collapsed").write_text(sampler.collapsed())
+        (PROFILE_DIR / f"{profile_id}.json").write_text(json.dumps(record, indent=2))
+        _prune()
+    except OSError as e:
+        print("⚠️ Profile not written:", e)
+        return
+
+    registry.inc("travel_profiles_total", endpoint=endpoint, reason=meta["reason"])
+    print(f"🔥 Profile {profile_id}: {endpoint} {record['duration_ms']} ms, {sampler.samples} samples")
+
+
+def _prune():
+    records = sorted(PROFILE_DIR.glob("*.json"))
+    for old in records[:-PROFILE_KEEP] if PROFILE_KEEP > 0 else []:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".collapsed").unlink(missing_ok=True)
+
+
+def recent_profiles(limit: int = 20) -> List[Dict[str, Any]]:
+    if not PROFILE_DIR.is_dir():
+        return []
+
+    profiles = []
+    for path in sorted(PROFILE_DIR.glob("*.json"), reverse=True)[:limit]:
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+registry.describe("travel_profiles_total", "Request profiles written, by endpoint and trigger")
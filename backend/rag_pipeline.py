@@ -1,112 +1,584 @@
 import os
+import fnmatch
+import hashlib
+import heapq
 import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Tuple
-
-import numpy as np
-import faiss
-from sklearn.feature_extraction.text import TfidfVectorizer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from langchain_core.documents import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from .config import CORPUS_DIR
+from .metrics import registry, span
+from .shard_router import route_shards
 
 DATA_DIR = Path(__file__).resolve().parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
-FAISS_PATH = DATA_DIR / "tfidf.index"
-VECTORIZER_PATH = DATA_DIR / "tfidf_vectorizer.pkl"
-CHUNKS_PATH = DATA_DIR / "tfidf_chunks.pkl"
+SHARDS_DIR = DATA_DIR / "shards"
+
+# ✅ Corpus category per file: first matching shard wins
+SHARD_PATTERNS: Dict[str, Tuple[str, ...]] = {
+    "policy": ("*policy*.txt", "terms*.txt"),
+    "company": ("company_profile.txt", "helpline*.txt", "support*.txt", "airport*.txt"),
+    "destinations": ("*.txt",),
+}
+SHARDS = tuple(SHARD_PATTERNS)
+
+# ✅ Multi-worker mode: search a memory-mapped vector file shared by all workers
+RAG_MMAP = os.getenv("RAG_MMAP", "0") == "1"
+
+RELOAD_CHECK_SECONDS = 5   # ✅ how often to notice an index rebuilt by another worker
+
+CHUNK_SIZE = 700
+CHUNK_OVERLAP = 100
+VECTORIZE_BATCH = 1024     # ✅ chunks turned into dense vectors at a time
+SHARD_CANDIDATES = 4       # ✅ per-shard candidates (x k) re-scored in the global space
+
+# ✅ Near-duplicate collapse report per shard from the last build in this process
+DEDUP_STATS: Dict[str, Dict[str, Any]] = {}
+
+
+# =========================
+# ✅ SHARD LAYOUT
+# =========================
+@dataclass(frozen=True)
+class ShardFiles:
+    index: Path
+    vectorizer: Path
+    chunks: Path
+    vectors: Path
+
+    @property
+    def built(self) -> Tuple[Path, Path, Path]:
+        return self.index, self.vectorizer, self.chunks
+
 
-_vectorizer = None
-_faiss_index = None
-_chunks: List[Document] = []
+def _shard_files(shard: str) -> ShardFiles:
+    base = SHARDS_DIR / shard
+    return ShardFiles(
+        index=base / "tfidf.index",
+        vectorizer=base / "tfidf_vectorizer.pkl",
+        chunks=base / "tfidf_chunks.pkl",
+        vectors=base / "tfidf_vectors.npy",
+    )
+
+
+def shard_of(filename: str) -> str:
+    for shard, patterns in SHARD_PATTERNS.items():
+        if any(fnmatch.fnmatch(filename, pattern) for pattern in patterns):
+            return shard
+    return SHARDS[-1]
 
 
-def _load_documents() -> List[Document]:
-    base_path = Path(CORPUS_DIR)
+def _corpus_files_for(shard: str) -> List[Path]:
+    from .ingest import corpus_files
+    return [path for path in corpus_files(CORPUS_DIR) if shard_of(path.name) == shard]
 
-    if not base_path.exists():
-        raise RuntimeError(f"Corpus directory not found: {CORPUS_DIR}")
 
-    docs = []
-    txt_files = list(base_path.glob("*.txt"))
+# faiss / scikit-learn / the splitter are imported lazily so importing the
+# app stays cheap; the lifespan warm-up (startup.py) pays for them instead.
+def _load_chunks(shard: str, files: List[Path]) -> List[Document]:
+    from .ingest import iter_chunk_batches
 
-    if not txt_files:
-        raise RuntimeError("No .txt files found in corpus directory")
+    from .dedup import RAG_DEDUP, ChunkDeduplicator
 
-    for file_path in txt_files:
-        with file_path.open("r", encoding="utf-8") as f:
-            text = f.read().strip()
+    dedup = ChunkDeduplicator() if RAG_DEDUP else None
 
-        docs.append(
-            Document(
-                page_content=text,
-                metadata={"source_file": file_path.name},
-            )
+    chunks: List[Document] = []
+    batches = iter_chunk_batches(CORPUS_DIR, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, files=files)
+    for batch in batches:
+        for doc in batch:
+            doc.metadata["shard"] = shard
+        if dedup is None:
+            chunks.extend(batch)
+        else:
+            chunks.extend(doc for doc in batch if dedup.add(doc) is not None)
+
+    if dedup is not None:
+        report = DEDUP_STATS[shard] = dedup.report()
+        print(
+            f"🧹 Dedup [{shard}]: {report['chunks_in']} → {report['chunks_out']} chunks "
+            f"({report['chunks_removed']} removed), "
+            f"{report['chars_saved']} chars saved ({report['saved_pct']}%)"
         )
 
-    return docs
+    return chunks
+
+
+def _fit_index(chunks: List[Document]):
+    """
+    Two passes over the chunks in batches: document frequencies first,
+    then TF-IDF vectors added to faiss batch by batch. Same vocabulary
+    and weights as TfidfVectorizer.fit_transform, without ever holding
+    the whole dense matrix twice.
+    """
+    import faiss
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    analyzer = TfidfVectorizer(stop_words="english").build_analyzer()
+    doc_freq: Dict[str, int] = {}
+    for doc in chunks:
+        for term in set(analyzer(doc.page_content)):
+            doc_freq[term] = doc_freq.get(term, 0) + 1
+
+    terms = sorted(doc_freq)
+    df = np.array([doc_freq[t] for t in terms], dtype="float64")
+
+    vectorizer = TfidfVectorizer(
+        stop_words="english",
+        vocabulary={term: i for i, term in enumerate(terms)},
+    )
+    vectorizer.idf_ = np.log((1 + len(chunks)) / (1 + df)) + 1   # smooth_idf
+
+    index = faiss.IndexFlatL2(len(terms))
+    for start in range(0, len(chunks), VECTORIZE_BATCH):
+        texts = [doc.page_content for doc in chunks[start:start + VECTORIZE_BATCH]]
+        index.add(vectorizer.transform(texts).toarray().astype("float32"))
+
+    return vectorizer, index
+
+
+def _search_ids(vectorizer, index, question: str, k: int) -> List[int]:
+    query_vec = vectorizer.transform([question]).toarray().astype("float32")
+
+    _, I = index.search(query_vec, k)
+
+    return [int(i) for i in I[0] if i >= 0]
+
+
+def _search_scored(vectorizer, index, chunks, question: str, k: int) -> List[Tuple[float, Document]]:
+    query_vec = vectorizer.transform([question]).toarray().astype("float32")
+
+    D, I = index.search(query_vec, k)
+
+    return [(float(d), chunks[i]) for d, i in zip(D[0], I[0]) if 0 <= i < len(chunks)]
+
+
+def _search(vectorizer, index, chunks: List[Document], question: str, k: int) -> List[Document]:
+    return [doc for _, doc in _search_scored(vectorizer, index, chunks, question, k)]
+
+
+# =========================
+# ✅ IMMUTABLE INDEX SNAPSHOT (RCU)
+# =========================
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """
+    Vectorizer, index and chunks of one shard that were built together.
+    A snapshot is never mutated: readers take one reference and use it
+    for the whole request, and a rebuild publishes a new snapshot by
+    swapping the module reference, so a search can never mix two
+    generations.
+    """
+    vectorizer: Any
+    index: Any
+    chunks: Tuple[Document, ...]
+    version: str
+    shard: str = ""
+
+    def search(self, question: str, k: int) -> List[Document]:
+        return _search(self.vectorizer, self.index, self.chunks, question, k)
+
+    def search_scored(self, question: str, k: int) -> List[Tuple[float, Document]]:
+        return _search_scored(self.vectorizer, self.index, self.chunks, question, k)
+
+    def search_ids(self, question: str, k: int) -> List[int]:
+        return _search_ids(self.vectorizer, self.index, question, k)
+
+
+def _global_vectorizer(snapshots: List[IndexSnapshot]):
+    """
+    One TF-IDF space over every shard: the union of the vocabularies,
+    with document frequencies recovered from each shard's smoothed IDF
+    (idf = ln((1 + n) / (1 + df)) + 1) and summed. Same weights as a
+    single vectorizer fitted on the whole corpus.
+    """
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    doc_freq: Dict[str, float] = {}
+    total = 0
+    for snapshot in snapshots:
+        n = len(snapshot.chunks)
+        total += n
+        idf = snapshot.vectorizer.idf_
+        for term, i in snapshot.vectorizer.vocabulary_.items():
+            df = (1 + n) / np.exp(idf[i] - 1) - 1
+            doc_freq[term] = doc_freq.get(term, 0.0) + round(df)
+
+    terms = sorted(doc_freq)
+    df = np.array([doc_freq[t] for t in terms], dtype="float64")
+
+    vectorizer = TfidfVectorizer(stop_words="english", vocabulary={term: i for i, term in enumerate(terms)})
+    vectorizer.idf_ = np.log((1 + total) / (1 + df)) + 1
+    return vectorizer
+
+
+@dataclass(frozen=True)
+class ShardSet:
+    """
+    The published generation of every shard. Replacing one shard builds
+    a new ShardSet; the others are shared, untouched, between the two.
+
+    Each shard ranks with its own vocabulary and IDF, so shard distances
+    are not comparable. Candidates are re-scored in one global TF-IDF
+    space (`vectorizer`, also used by the intent classifier) before the
+    merge, which ranks them as a single index over the whole corpus
+    would.
+    """
+    shards: Dict[str, IndexSnapshot]
+    vectorizer: Any = field(init=False)
+    version: str = field(init=False)
+    _rows: Dict[str, Any] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        names = sorted(self.shards)
+        vectorizer = _global_vectorizer([self.shards[name] for name in names])
+        object.__setattr__(self, "vectorizer", vectorizer)
+
+        # Unit-length global TF-IDF row per chunk, for the re-scoring dot products
+        object.__setattr__(self, "_rows", {
+            name: vectorizer.transform([doc.page_content for doc in self.shards[name].chunks]).tocsr()
+            for name in names
+        })
+
+        combined = ":".join(f"{name}={self.shards[name].version}" for name in names)
+        object.__setattr__(self, "version", hashlib.sha1(combined.encode()).hexdigest()[:12])
+
+    @property
+    def chunks(self) -> Tuple[Document, ...]:
+        return tuple(doc for name in sorted(self.shards) for doc in self.shards[name].chunks)
+
+    def replace(self, snapshot: IndexSnapshot) -> "ShardSet":
+        return ShardSet({**self.shards, snapshot.shard: snapshot})
+
+    def search(self, question: str, k: int, shards: Optional[Iterable[str]] = None) -> List[Document]:
+        """
+        Search only the shards the router picks for this question, in
+        parallel when there are several. Each shard proposes
+        SHARD_CANDIDATES x k chunks; all of them are re-scored against
+        the global query vector and the best k returned.
+        """
+        names = [name for name in (shards or route_shards(question)) if name in self.shards]
+        if not names:
+            names = sorted(self.shards)
+
+        for name in names:
+            registry.inc("travel_rag_shard_searches_total", shard=name)
+
+        candidates = k * SHARD_CANDIDATES
+        if len(names) == 1:
+            found = [self.shards[names[0]].search_ids(question, candidates)]
+        else:
+            found = list(_get_fanout_pool().map(
+                lambda name: self.shards[name].search_ids(question, candidates), names
+            ))
+
+        query = self.vectorizer.transform([question]).T
+        scored = []
+        for name, ids in zip(names, found):
+            if not ids:
+                continue
+            similarity = (self._rows[name][ids] @ query).toarray().ravel()
+            chunks = self.shards[name].chunks
+            scored.extend((-float(sim), n, chunks[i]) for n, (sim, i) in enumerate(zip(similarity, ids)))
+
+        # Ties keep the shard's own order (n) instead of comparing Documents
+        return [doc for _, _, doc in heapq.nsmallest(k, scored, key=lambda hit: hit[:2])]
+
+
+_snapshot: Optional[ShardSet] = None
+_load_lock = threading.Lock()
+_publish_lock = threading.Lock()
+_last_check = 0.0
+_reloading = False
+
+_fanout_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# ✅ Background rebuild state, shown by /admin/reindex
+_rebuild_lock = threading.Lock()
+REINDEX_STATUS: Dict[str, Any] = {"state": "idle"}
+
+
+def _get_fanout_pool() -> ThreadPoolExecutor:
+    global _fanout_pool
+    if _fanout_pool is None:
+        with _pool_lock:
+            if _fanout_pool is None:
+                # faiss and numpy release the GIL while scanning
+                _fanout_pool = ThreadPoolExecutor(max_workers=len(SHARDS), thread_name_prefix="rag-shard")
+    return _fanout_pool
+
+
+def _disk_version(shard: str) -> str:
+    """
+    Short fingerprint of one shard's on-disk TF-IDF index.
+    Changes whenever the shard is rebuilt.
+    """
+    h = hashlib.sha1()
+
+    for path in _shard_files(shard).built:
+        if path.exists():
+            st = path.stat()
+            h.update(f"{path.name}:{st.st_size}:{st.st_mtime_ns}".encode())
+        else:
+            h.update(f"{path.name}:missing".encode())
+
+    return h.hexdigest()[:12]
+
+
+def _shard_exists(shard: str) -> bool:
+    return all(path.exists() for path in _shard_files(shard).built)
+
+
+def _load_snapshot(shard: str) -> IndexSnapshot:
+    import faiss
+
+    files = _shard_files(shard)
+    version = _disk_version(shard)
+
+    with open(files.vectorizer, "rb") as f:
+        vectorizer = pickle.load(f)
+
+    with open(files.chunks, "rb") as f:
+        chunks = tuple(pickle.load(f))
+
+    if RAG_MMAP:
+        index = _load_mmap_index(files)
+    else:
+        index = faiss.read_index(str(files.index))
+
+    # Files are replaced one by one; refuse a set caught mid-rebuild
+    if index.d != len(vectorizer.vocabulary_) or index.ntotal != len(chunks):
+        raise RuntimeError(f"TF-IDF index files of shard {shard} are from different builds")
+
+    return IndexSnapshot(vectorizer, index, chunks, version, shard)
+
+
+def _write_atomic(path: Path, write):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _build_snapshot(shard: str) -> Optional[IndexSnapshot]:
+    """
+    Build one shard from its corpus files. Returns None when the corpus
+    has no files for this category.
+    """
+    import faiss
+
+    corpus = _corpus_files_for(shard)
+    if not corpus:
+        return None
+
+    chunks = _load_chunks(shard, corpus)
+    vectorizer, index = _fit_index(chunks)
+    files = _shard_files(shard)
+    files.index.parent.mkdir(parents=True, exist_ok=True)
+
+    def dump(obj):
+        def write(path):
+            with open(path, "wb") as f:
+                pickle.dump(obj, f)
+        return write
+
+    _write_atomic(files.index, lambda path: faiss.write_index(index, str(path)))
+    _write_atomic(files.vectorizer, dump(vectorizer))
+    _write_atomic(files.chunks, dump(chunks))
+    _export_vectors(index, files)
+
+    if RAG_MMAP:
+        index = _load_mmap_index(files)
+
+    return IndexSnapshot(vectorizer, index, tuple(chunks), _disk_version(shard), shard)
+
+
+def _publish(snapshot: IndexSnapshot):
+    global _snapshot, _last_check
+
+    with _publish_lock:
+        current = _snapshot
+        # single reference assignment: atomic for readers
+        _snapshot = current.replace(snapshot) if current else ShardSet({snapshot.shard: snapshot})
+        _last_check = time.monotonic()
+
+
+def _publish_all(shard_set: ShardSet):
+    global _snapshot, _last_check
+
+    with _publish_lock:
+        _snapshot = shard_set
+        _last_check = time.monotonic()
+
+
+def _load_or_build(shard: str) -> Optional[IndexSnapshot]:
+    if _shard_exists(shard):
+        snapshot = _load_snapshot(shard)
+        print(f"✅ TF-IDF RAG shard {shard} loaded from disk")
+        return snapshot
+
+    print(f"⚠️ Building TF-IDF RAG shard {shard} (first time only)...")
+    snapshot = _build_snapshot(shard)
+    if snapshot:
+        print(f"✅ TF-IDF RAG shard {shard} built & saved ({len(snapshot.chunks)} chunks)")
+    return snapshot
+
+
+def get_snapshot() -> ShardSet:
+    snapshot = _snapshot
+
+    if snapshot is None:
+        with _load_lock:
+            if _snapshot is None:
+                loaded = {}
+                for shard in SHARDS:
+                    shard_snapshot = _load_or_build(shard)
+                    if shard_snapshot:
+                        loaded[shard] = shard_snapshot
+                if not loaded:
+                    raise RuntimeError("No corpus files for any RAG shard")
+                # Publish every shard at once: readers never see a partial set
+                _publish_all(ShardSet(loaded))
+            snapshot = _snapshot
+    else:
+        _maybe_reload_from_disk(snapshot)
+
+    return snapshot
 
 
 def _build_vectorstore():
-    global _vectorizer, _faiss_index, _chunks
+    get_snapshot()
 
-    if (
-        FAISS_PATH.exists()
-        and VECTORIZER_PATH.exists()
-        and CHUNKS_PATH.exists()
-    ):
-        with open(VECTORIZER_PATH, "rb") as f:
-            _vectorizer = pickle.load(f)
 
-        with open(CHUNKS_PATH, "rb") as f:
-            _chunks = pickle.load(f)
+# =========================
+# ✅ PICK UP REBUILDS FROM OTHER WORKERS
+# =========================
+def _maybe_reload_from_disk(current: ShardSet):
+    global _last_check, _reloading
 
-        _faiss_index = faiss.read_index(str(FAISS_PATH))
+    now = time.monotonic()
+    if now - _last_check <= RELOAD_CHECK_SECONDS or _reloading:
+        return
 
-        print("✅ TF-IDF RAG index loaded from disk")
+    _last_check = now
+    stale = [
+        shard for shard, snapshot in current.shards.items()
+        if _disk_version(shard) != snapshot.version
+    ]
+    if not stale:
         return
 
-    print("⚠️ Building TF-IDF RAG index (first time only)...")
+    with _load_lock:
+        if _reloading:
+            return
+        _reloading = True
 
-    documents = _load_documents()
+    def _reload():
+        global _reloading
+        try:
+            for shard in stale:
+                _publish(_load_snapshot(shard))
+                print(f"🔄 TF-IDF RAG shard {shard} reloaded from disk")
+        except Exception as e:
+            print(f"⚠️ TF-IDF RAG reload skipped: {e}")
+        finally:
+            _reloading = False
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=700,
-        chunk_overlap=100,
-    )
+    threading.Thread(target=_reload, daemon=True).start()
 
-    _chunks = splitter.split_documents(documents)
-    texts = [doc.page_content for doc in _chunks]
 
-    _vectorizer = TfidfVectorizer(stop_words="english")
-    vectors = _vectorizer.fit_transform(texts).toarray().astype("float32")
+# =========================
+# ✅ BACKGROUND REBUILD (/admin/reindex)
+# =========================
+def start_reindex(shards: Optional[List[str]] = None) -> bool:
+    """
+    Rebuild the given shards (all by default) from the corpus on a
+    background thread, swapping each in as soon as it is done. Requests
+    keep using the current snapshots meanwhile, and untouched shards are
+    never reloaded. Returns False if a rebuild is already running.
+    """
+    shards = list(shards or SHARDS)
+    unknown = [shard for shard in shards if shard not in SHARD_PATTERNS]
+    if unknown:
+        raise ValueError(f"Unknown shard(s) {unknown}, expected some of {list(SHARDS)}")
 
-    dim = vectors.shape[1]
-    _faiss_index = faiss.IndexFlatL2(dim)
-    _faiss_index.add(vectors)
+    if not _rebuild_lock.acquire(blocking=False):
+        return False
 
-    faiss.write_index(_faiss_index, str(FAISS_PATH))
+    REINDEX_STATUS.clear()
+    REINDEX_STATUS.update({"state": "running", "started_at": time.time(), "shards": {}})
 
-    with open(VECTORIZER_PATH, "wb") as f:
-        pickle.dump(_vectorizer, f)
+    def _rebuild():
+        try:
+            for shard in shards:
+                start = time.perf_counter()
+                snapshot = _build_snapshot(shard)
+                if snapshot is None:
+                    REINDEX_STATUS["shards"][shard] = {"state": "empty"}
+                    continue
 
-    with open(CHUNKS_PATH, "wb") as f:
-        pickle.dump(_chunks, f)
+                _publish(snapshot)
+                REINDEX_STATUS["shards"][shard] = {
+                    "state": "done",
+                    "version": snapshot.version,
+                    "chunks": len(snapshot.chunks),
+                    "seconds": round(time.perf_counter() - start, 3),
+                    "dedup": dict(DEDUP_STATS.get(shard, {})),
+                }
+                print(f"✅ TF-IDF RAG shard {shard} rebuilt ({snapshot.version})")
 
-    print("✅ TF-IDF RAG index built & saved")
+            REINDEX_STATUS.update({"state": "done", "version": get_index_version()})
+        except Exception as e:
+            REINDEX_STATUS.update({"state": "failed", "error": str(e)})
+            print(f"⚠️ TF-IDF RAG rebuild failed: {e}")
+        finally:
+            _rebuild_lock.release()
 
+    threading.Thread(target=_rebuild, daemon=True).start()
+    return True
 
-def retrieve_context(question: str, k: int = 4) -> Tuple[str, List[Document]]:
-    _build_vectorstore()
 
-    query_vec = _vectorizer.transform([question]).toarray().astype("float32")
+def _export_vectors(index, files: ShardFiles):
+    from .vector_index import save_vectors
+    save_vectors(files.vectors, index.reconstruct_n(0, index.ntotal))
+
+
+def _load_mmap_index(files: ShardFiles):
+    import faiss
+    from .vector_index import MmapFlatIndex
+
+    # Indexes built before mmap support have no .npy yet
+    if not files.vectors.exists() or files.vectors.stat().st_mtime < files.index.stat().st_mtime:
+        _export_vectors(faiss.read_index(str(files.index)), files)
 
-    D, I = _faiss_index.search(query_vec, k)
+    return MmapFlatIndex(files.vectors)
 
-    docs = [_chunks[i] for i in I[0] if i < len(_chunks)]
+
+def get_index_version() -> str:
+    return get_snapshot().version
+
+
+def get_vectorizer():
+    return get_snapshot().vectorizer
+
+
+def retrieve_context(question: str, k: int = 4) -> Tuple[str, List[Document]]:
+    with span("index_load"):
+        snapshot = get_snapshot()
+
+    with span("retrieval"):
+        docs = snapshot.search(question, k)
 
     combined_text = "\n\n".join(doc.page_content for doc in docs)
 
     return combined_text, docs
+
+
+registry.describe("travel_rag_shard_searches_total", "TF-IDF shard searches (one per shard a query fans out to)")
@@ -0,0 +1,247 @@
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from .metrics import registry, span
+
+
+def _parse_map(raw: str) -> Dict[str, str]:
+    # "chat=tfidf,itinerary=embedding" → {"chat": "tfidf", "itinerary": "embedding"}
+    pairs = (item.split("=", 1) for item in raw.split(",") if "=" in item)
+    return {k.strip(): v.strip() for k, v in pairs}
+
+
+# ✅ Backend per endpoint ("chat", "itinerary", "agent"); unlisted endpoints use the default
+RETRIEVER_DEFAULT = os.getenv("RETRIEVER_DEFAULT", "tfidf")
+RETRIEVER_BACKENDS = _parse_map(os.getenv("RETRIEVER_BACKENDS", ""))
+
+# ✅ Shadow mode: also run the other backend off the request path and compare
+RETRIEVER_SHADOW_RATE = float(os.getenv("RETRIEVER_SHADOW_RATE", "0"))
+SHADOW_WORKERS = 2
+SHADOW_MAX_PENDING = 32    # ✅ beyond this, shadow runs are skipped rather than queued
+SHADOW_WINDOW = 1000       # ✅ recent comparisons kept per endpoint for /admin/retrievers
+
+
+# =========================
+# ✅ BACKENDS
+# =========================
+class Retriever:
+    name = "base"
+
+    def retrieve(self, question: str, k: int) -> List[Document]:
+        raise NotImplementedError
+
+    def warm(self):
+        pass
+
+
+class TfidfRetriever(Retriever):
+    """
+    TF-IDF + faiss over backend/data (rag_pipeline snapshots).
+    """
+    name = "tfidf"
+
+    def retrieve(self, question: str, k: int) -> List[Document]:
+        from .rag_pipeline import get_snapshot
+        return get_snapshot().search(question, k)
+
+    def warm(self):
+        from .rag_pipeline import get_snapshot
+        get_snapshot()
+
+
+class EmbeddingRetriever(Retriever):
+    """
+    Ollama embeddings + faiss over backend/vector_store (build_vector_store),
+    including its quantized storage with exact re-rank.
+    """
+    name = "embedding"
+
+    def __init__(self):
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _store(self):
+        if self._db is None:
+            with self._lock:
+                if self._db is None:
+                    from .build_vector_store import load_vector_store
+                    self._db = load_vector_store()
+        return self._db
+
+    def retrieve(self, question: str, k: int) -> List[Document]:
+        return self._store().similarity_search(question, k=k)
+
+    def warm(self):
+        self._store()
+
+
+RETRIEVERS: Dict[str, Retriever] = {
+    "tfidf": TfidfRetriever(),
+    "embedding": EmbeddingRetriever(),
+}
+
+
+def backend_for(endpoint: str) -> str:
+    name = RETRIEVER_BACKENDS.get(endpoint, RETRIEVER_DEFAULT)
+    if name not in RETRIEVERS:
+        raise ValueError(f"Unknown retriever {name!r} for {endpoint}, expected one of {sorted(RETRIEVERS)}")
+    return name
+
+
+def warm_retrievers():
+    for name in sorted({backend_for(endpoint) for endpoint in RETRIEVER_BACKENDS} | {RETRIEVER_DEFAULT}):
+        RETRIEVERS[name].warm()
+
+
+# =========================
+# ✅ SHADOW COMPARISON (A/B)
+# =========================
+def _doc_key(doc: Document) -> str:
+    # The two stores split the corpus differently; compare normalized text
+    text = " ".join(doc.page_content.lower().split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _overlap(a: List[Document], b: List[Document]) -> float:
+    keys_a, keys_b = {_doc_key(d) for d in a}, {_doc_key(d) for d in b}
+    if not keys_a and not keys_b:
+        return 1.0
+    return len(keys_a & keys_b) / max(len(keys_a), len(keys_b))
+
+
+def _same_source(a: List[Document], b: List[Document]) -> float:
+    # Chunk boundaries differ between stores, so also compare which files were hit
+    sources_a = {d.metadata.get("source_file") or d.metadata.get("source") for d in a}
+    sources_b = {d.metadata.get("source_file") or d.metadata.get("source") for d in b}
+    if not sources_a and not sources_b:
+        return 1.0
+    return len(sources_a & sources_b) / len(sources_a | sources_b)
+
+
+class ShadowStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str, str], Deque[Tuple[float, float, float, float]]] = {}
+        self.errors = 0
+
+    def add(self, endpoint: str, primary: str, shadow: str, primary_s: float, shadow_s: float,
+            overlap: float, source_overlap: float):
+        key = (endpoint, primary, shadow)
+        with self._lock:
+            window = self._samples.setdefault(key, deque(maxlen=SHADOW_WINDOW))
+            window.append((primary_s, shadow_s, overlap, source_overlap))
+
+    def error(self):
+        with self._lock:
+            self.errors += 1
+
+    def summary(self) -> List[Dict[str, float]]:
+        def pct(values, q):
+            values = sorted(values)
+            return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 2)
+
+        rows = []
+        with self._lock:
+            items = [(key, list(window)) for key, window in self._samples.items()]
+
+        for (endpoint, primary, shadow), samples in items:
+            primary_s = [s[0] for s in samples]
+            shadow_s = [s[1] for s in samples]
+            rows.append({
+                "endpoint": endpoint,
+                "primary": primary,
+                "shadow": shadow,
+                "samples": len(samples),
+                "primary_p50_ms": pct(primary_s, 0.5),
+                "primary_p95_ms": pct(primary_s, 0.95),
+                "shadow_p50_ms": pct(shadow_s, 0.5),
+                "shadow_p95_ms": pct(shadow_s, 0.95),
+                "mean_overlap": round(sum(s[2] for s in samples) / len(samples), 3),
+                "mean_source_overlap": round(sum(s[3] for s in samples) / len(samples), 3),
+            })
+        return rows
+
+    def collect(self):
+        for row in self.summary():
+            labels = {"endpoint": row["endpoint"], "primary": row["primary"], "shadow": row["shadow"]}
+            yield "travel_retriever_shadow_overlap", "gauge", labels, row["mean_overlap"]
+        yield "travel_retriever_shadow_errors_total", "counter", {}, self.errors
+
+
+shadow_stats = ShadowStats()
+_shadow_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_shadow_slots = threading.BoundedSemaphore(SHADOW_MAX_PENDING)
+
+
+def _get_shadow_pool() -> ThreadPoolExecutor:
+    global _shadow_pool
+    if _shadow_pool is None:
+        with _pool_lock:
+            if _shadow_pool is None:
+                _shadow_pool = ThreadPoolExecutor(max_workers=SHADOW_WORKERS, thread_name_prefix="retriever-shadow")
+    return _shadow_pool
+
+
+def _run_shadow(endpoint: str, primary: str, shadow: str, question: str, k: int,
+                primary_docs: List[Document], primary_s: float):
+    start = time.perf_counter()
+    try:
+        docs = RETRIEVERS[shadow].retrieve(question, k)
+    except Exception as e:
+        shadow_stats.error()
+        print(f"⚠️ Shadow retriever {shadow} failed: {e}")
+        return
+    finally:
+        _shadow_slots.release()
+    shadow_s = time.perf_counter() - start
+
+    registry.observe("travel_retriever_seconds", shadow_s, backend=shadow, endpoint=endpoint, mode="shadow")
+    shadow_stats.add(
+        endpoint, primary, shadow, primary_s, shadow_s,
+        _overlap(primary_docs, docs), _same_source(primary_docs, docs),
+    )
+
+
+# =========================
+# ✅ ENTRY POINT
+# =========================
+def retrieve_context(question: str, k: int = 4, endpoint: str = "chat") -> Tuple[str, List[Document]]:
+    """
+    Retrieve with the backend configured for this endpoint. With shadow
+    mode on, a sampled share of requests is also sent to the other
+    backend on a background thread; the caller never waits for it.
+    """
+    primary = backend_for(endpoint)
+
+    with span("retrieval"):
+        start = time.perf_counter()
+        docs = RETRIEVERS[primary].retrieve(question, k)
+        primary_s = time.perf_counter() - start
+
+    registry.observe("travel_retriever_seconds", primary_s, backend=primary, endpoint=endpoint, mode="primary")
+
+    if RETRIEVER_SHADOW_RATE > 0 and random.random() < RETRIEVER_SHADOW_RATE:
+        for shadow in RETRIEVERS:
+            if shadow != primary and _shadow_slots.acquire(blocking=False):
+                _get_shadow_pool().submit(
+                    _run_shadow, endpoint, primary, shadow, question, k, list(docs), primary_s
+                )
+
+    combined_text = "\n\n".join(doc.page_content for doc in docs)
+
+    return combined_text, docs
+
+
+registry.describe("travel_retriever_seconds", "Retrieval latency by backend, endpoint and mode")
+registry.describe("travel_retriever_shadow_overlap", "Mean top-k overlap between primary and shadow retrievers")
+registry.describe("travel_retriever_shadow_errors_total", "Shadow retrievals that raised")
+registry.register_collector(shadow_stats.collect)
@@ -0,0 +1,50 @@
+import os
+import re
+from typing import Tuple
+
+from .places import extract_places
+
+# ✅ RAG_SHARD_ROUTING=0 searches every shard for every query
+RAG_SHARD_ROUTING = os.getenv("RAG_SHARD_ROUTING", "1") != "0"
+
+ALL_SHARDS = ("policy", "company", "destinations")
+
+_POLICY_TERMS = re.compile(
+    r"\b(refunds?|cancel\w*|polic(?:y|ies)|terms|conditions|charges?|fees?|"
+    r"payments?|bookings?|reschedul\w*|deposit|penalt(?:y|ies))\b",
+    re.IGNORECASE,
+)
+_COMPANY_TERMS = re.compile(
+    r"\b(helpline|support|contact|phone|email|call|timings?|office|hours|"
+    r"airport transfers?|pick ?ups?|drop|company|agency|about you|who are you)\b",
+    re.IGNORECASE,
+)
+_DESTINATION_TERMS = re.compile(
+    r"\b(visit|trip|travel|tour|places?|beach(?:es)?|temples?|forts?|packages?|itinerar(?:y|ies)|"
+    r"attractions?|sightseeing|food|cuisine|best time|hotels?|stay|days?|nights?|"
+    r"honeymoon|trek\w*|hill stations?|wildlife|festivals?|state|city|destination)\b",
+    re.IGNORECASE,
+)
+
+
+# =========================
+# ✅ QUERY → SHARDS
+# =========================
+def route_shards(question: str) -> Tuple[str, ...]:
+    """
+    Cheap keyword / gazetteer routing to the shards a question can be
+    answered from. A question matching nothing searches every shard, so
+    routing can narrow a search but never leave it empty.
+    """
+    if not RAG_SHARD_ROUTING:
+        return ALL_SHARDS
+
+    shards = []
+    if _POLICY_TERMS.search(question):
+        shards.append("policy")
+    if _COMPANY_TERMS.search(question):
+        shards.append("company")
+    if _DESTINATION_TERMS.search(question) or extract_places(question):
+        shards.append("destinations")
+
+    return tuple(shards) or ALL_SHARDS
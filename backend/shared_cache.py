@@ -0,0 +1,148 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .metrics import record_cache
+from .sqlite_writer import connect, enable_wal, get_writer
+
+# ✅ tmpfs when available: the cache lives in shared memory, visible to every worker
+_SHM = Path("/dev/shm")
+_DEFAULT_DIR = _SHM if _SHM.is_dir() else Path(tempfile.gettempdir())
+
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH") or str(_DEFAULT_DIR / "travel_shared_cache.db")
+SHARED_CACHE_ENABLED = os.getenv("SHARED_CACHE", "1") != "0"
+PURGE_EVERY_SECONDS = 300
+
+_MISSING = object()
+
+
+# =========================
+# ✅ CROSS-WORKER RESULT CACHE (WEATHER / GEOCODE / ROUTES / LLM)
+# =========================
+class SharedCache:
+    """
+    Small key → JSON value store with per-entry TTL, shared by all
+    uvicorn/gunicorn workers on the host through one SQLite file in WAL
+    mode. Reads are direct; writes are queued to the single writer so a
+    cache fill never blocks the request that produced the value.
+    """
+
+    def __init__(self, db_path: str = SHARED_CACHE_PATH, enabled: bool = SHARED_CACHE_ENABLED):
+        self.db_path = db_path
+        self.enabled = enabled
+        self._opened = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_purge = 0.0
+
+    def open(self):
+        if self._opened or not self.enabled:
+            return
+
+        with self._lock:
+            if not self._opened:
+                conn = connect(self.db_path)
+                enable_wal(conn)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS shared_cache (
+                        namespace TEXT,
+                        cache_key TEXT,
+                        value TEXT,
+                        expires_at REAL,
+                        PRIMARY KEY (namespace, cache_key)
+                    )
+                """)
+                conn.commit()
+                conn.close()
+                self._opened = True
+
+    # One read connection per thread, kept open between lookups
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.open()
+            conn = self._local.conn = connect(self.db_path)
+        return conn
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        if not self.enabled:
+            return default
+
+        row = self._reader().execute(
+            "SELECT value, expires_at FROM shared_cache WHERE namespace = ? AND cache_key = ?",
+            (namespace, key),
+        ).fetchone()
+
+        if not row or row[1] < time.time():
+            return default
+
+        return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float):
+        if not self.enabled:
+            return
+
+        self.open()
+        now = time.time()
+        writer = get_writer(self.db_path)
+
+        writer.submit((
+            """
+            INSERT INTO shared_cache (namespace, cache_key, value, expires_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(namespace, cache_key) DO UPDATE SET
+                value = excluded.value,
+                expires_at = excluded.expires_at
+            """,
+            (namespace, key, json.dumps(value), now + ttl),
+        ))
+
+        if now - self._last_purge > PURGE_EVERY_SECONDS:
+            self._last_purge = now
+            writer.submit(("DELETE FROM shared_cache WHERE expires_at < ?", (now,)))
+
+    def cached(
+        self,
+        namespace: str,
+        ttl: float,
+        should_cache: Callable[[Any], bool] = lambda value: value is not None,
+        scope: str = "",
+    ):
+        """
+        Decorator: memoize a function's JSON-serializable result across
+        workers, keyed by its arguments. Results rejected by
+        should_cache (errors, empty lookups) are never stored. `scope`
+        is mixed into every key, e.g. the upstream base URL, so answers
+        from a stub or another endpoint are never served for the real one.
+        """
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+
+                raw = json.dumps([scope, args, kwargs], sort_keys=True, default=str)
+                key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+                value = self.get(namespace, key, _MISSING)
+                if value is not _MISSING:
+                    record_cache(namespace, "hit")
+                    return value
+
+                record_cache(namespace, "miss")
+                value = fn(*args, **kwargs)
+                if should_cache(value):
+                    self.set(namespace, key, value, ttl)
+                return value
+
+            return wrapper
+        return decorate
+
+
+shared_cache = SharedCache()
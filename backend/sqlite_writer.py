@@ -0,0 +1,114 @@
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Tuple
+
+BUSY_TIMEOUT_MS = 5000    # ✅ wait this long for another worker's write lock
+MAX_BATCH = 64            # ✅ queued writes committed in one transaction
+
+Statement = Tuple[str, Sequence]
+
+
+# =========================
+# ✅ CONNECTIONS (WAL: readers never block the writer)
+# =========================
+def connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000)
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def enable_wal(conn: sqlite3.Connection):
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+
+
+# =========================
+# ✅ SINGLE WRITER PER DATABASE FILE
+# =========================
+class SQLiteWriter:
+    """
+    Owns the only write connection to one database in this process.
+    Callers queue statements; a background thread commits whatever is
+    queued in a single transaction, each caller's statements inside
+    their own savepoint so one failure does not undo the others.
+    Across worker processes, writers are serialized by SQLite's WAL
+    write lock (busy_timeout) instead of failing with "database is locked".
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._queue: "queue.Queue[Tuple[List[Statement], Future]]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name=f"sqlite-writer:{db_path}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, *statements: Statement) -> Future:
+        future: Future = Future()
+        self._queue.put((list(statements), future))
+        return future
+
+    def write(self, *statements: Statement, timeout: Optional[float] = None) -> int:
+        """
+        Queue statements and wait until they are committed.
+        Returns the total number of rows changed.
+        """
+        return self.submit(*statements).result(timeout=timeout)
+
+    def _next_batch(self) -> List[Tuple[List[Statement], Future]]:
+        batch = [self._queue.get()]
+        while len(batch) < MAX_BATCH:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        conn = connect(self.db_path)
+        conn.isolation_level = None    # explicit BEGIN / COMMIT below
+        enable_wal(conn)
+
+        while True:
+            batch = self._next_batch()
+            results = []
+
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for statements, future in batch:
+                    conn.execute("SAVEPOINT job")
+                    try:
+                        changed = 0
+                        for sql, params in statements:
+                            changed += conn.execute(sql, params).rowcount
+                        conn.execute("RELEASE job")
+                        results.append((future, changed, None))
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO job")
+                        conn.execute("RELEASE job")
+                        results.append((future, None, e))
+                conn.execute("COMMIT")
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                results = [(future, None, e) for _, future in batch]
+
+            for future, changed, error in results:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(changed)
+
+
+_writers: Dict[str, SQLiteWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path: str) -> SQLiteWriter:
+    with _writers_lock:
+        writer = _writers.get(db_path)
+        if writer is None:
+            writer = _writers[db_path] = SQLiteWriter(db_path)
+        return writer
@@ -0,0 +1,132 @@
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from .guardrails import reload_terms
+from .itinerary_cache import itinerary_cache
+from .llm_router import llm_router
+from .memory import memory
+from .metrics import registry
+from .places import get_recognizer
+from .retrievers import warm_retrievers
+from .shared_cache import shared_cache
+from .tools.http_client import get_session
+from .tools.road_graph import get_road_graph
+from .tools.transit import get_timetable
+
+# ✅ Seconds per warm-up step, in run order (shown by /ready)
+STARTUP_TIMINGS: Dict[str, float] = {}
+STARTUP_ERRORS: Dict[str, str] = {}
+
+RETRY_BASE_SECONDS = 1.0       # ✅ first retry of a failed step, doubled each attempt
+RETRY_MAX_SECONDS = 60.0
+BEST_EFFORT_ATTEMPTS = 6       # ✅ best-effort steps give up after this many tries
+
+_ready = threading.Event()
+
+
+def _warm_steps() -> List[Tuple[str, Callable[[], object], bool]]:
+    # (name, step, required): only required steps gate /ready
+    return [
+        ("memory_db", memory.open, True),
+        ("itinerary_cache", itinerary_cache.open, True),
+        ("shared_cache", shared_cache.open, False),
+        ("rag_index", warm_retrievers, True),
+        ("guardrail_terms", reload_terms, True),
+        ("gazetteer", get_recognizer, True),
+        ("road_graph", get_road_graph, False),
+        ("transit", get_timetable, False),
+        ("llm_connections", llm_router.warm, False),
+        ("http_pool", get_session, False),
+    ]
+
+
+def _run_step(name: str, step: Callable[[], object]) -> bool:
+    start = time.perf_counter()
+    try:
+        step()
+    except Exception as e:
+        STARTUP_ERRORS[name] = str(e)
+        print(f"⚠️ Warm-up step {name} failed: {e}")
+        return False
+    finally:
+        STARTUP_TIMINGS[name] = round(time.perf_counter() - start, 4)
+
+    STARTUP_ERRORS.pop(name, None)
+    return True
+
+
+# =========================
+# ✅ LIFESPAN WARM-UP
+# =========================
+def warm_up() -> Dict[str, float]:
+    """
+    Load indexes, open databases and create upstream clients before the
+    app reports ready. The app is ready once every required step
+    succeeded; best-effort steps (network pre-connects, optional data)
+    never block it. Failed steps are retried in the background with
+    exponential backoff, so a transient failure at boot heals itself.
+    """
+    total_start = time.perf_counter()
+
+    failed = []
+    for name, step, required in _warm_steps():
+        if not _run_step(name, step):
+            failed.append((name, step, required))
+
+    STARTUP_TIMINGS["total"] = round(time.perf_counter() - total_start, 4)
+
+    print("🚀 Startup breakdown:")
+    for name, seconds in STARTUP_TIMINGS.items():
+        print(f"   {name:16s} {seconds * 1000:>9.1f} ms")
+
+    if not any(required for _, _, required in failed):
+        _ready.set()
+
+    if failed:
+        threading.Thread(target=_retry_failed, args=(failed,), name="warm-up-retry", daemon=True).start()
+
+    return STARTUP_TIMINGS
+
+
+def _retry_failed(failed: List[Tuple[str, Callable[[], object], bool]]):
+    """
+    Required steps are retried until they succeed; best-effort ones up to
+    BEST_EFFORT_ATTEMPTS times. Readiness flips on when the last
+    required step recovers.
+    """
+    delay = RETRY_BASE_SECONDS
+    attempt = 1
+
+    while failed:
+        time.sleep(delay)
+        attempt += 1
+
+        still_failing = []
+        for name, step, required in failed:
+            ok = _run_step(name, step)
+            registry.inc("travel_startup_retries_total", step=name, result="ok" if ok else "failed")
+            if ok:
+                print(f"✅ Warm-up step {name} recovered (attempt {attempt})")
+            elif required or attempt < BEST_EFFORT_ATTEMPTS:
+                still_failing.append((name, step, required))
+
+        failed = still_failing
+        if not any(required for _, _, required in failed):
+            _ready.set()
+
+        delay = min(delay * 2, RETRY_MAX_SECONDS)
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def _startup_samples():
+    for name, seconds in list(STARTUP_TIMINGS.items()):
+        yield "travel_startup_seconds", "gauge", {"step": name}, seconds
+
+
+registry.describe("travel_startup_seconds", "Duration of one lifespan warm-up step")
+registry.describe("travel_startup_retries_total", "Background retries of failed warm-up steps")
+registry.register_collector(_startup_samples)
@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..metrics import registry
+
+CIRCUIT_BREAKER_ENABLED = os.getenv("CIRCUIT_BREAKER", "1") != "0"
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "30"))   # ✅ rolling outcome window
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))                # ✅ no verdict on fewer calls
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))      # ✅ errors + slow calls
+CIRCUIT_SLOW_SECONDS = float(os.getenv("CIRCUIT_SLOW_SECONDS", "5"))        # ✅ slower than this counts as failed
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))       # ✅ fast-fail before a probe
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+# =========================
+# ✅ PER-HOST CIRCUIT BREAKER
+# =========================
+class CircuitBreaker:
+    """
+    Closed: calls go through and their outcomes are kept for
+    CIRCUIT_WINDOW_SECONDS. Once the window holds CIRCUIT_MIN_CALLS and
+    the share of errors (exceptions, 5xx, 429) plus slow calls reaches
+    CIRCUIT_FAILURE_RATE, the circuit opens and calls fail at once.
+    After CIRCUIT_OPEN_SECONDS one probe call is let through
+    (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._outcomes = deque()      # (finished_at, failed)
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.monotonic() - self.opened_at >= CIRCUIT_OPEN_SECONDS:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self.rejected += 1
+
+        registry.inc("travel_circuit_rejected_total", host=self.host)
+        raise CircuitOpenError(f"Circuit open for {self.host}")
+
+    def record(self, failed: bool):
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                self._outcomes.clear()
+                self._transition(OPEN if failed else CLOSED)
+                return
+            if self.state == OPEN:
+                return
+
+            self._outcomes.append((now, failed))
+            while self._outcomes and now - self._outcomes[0][0] > CIRCUIT_WINDOW_SECONDS:
+                self._outcomes.popleft()
+
+            calls = len(self._outcomes)
+            failures = sum(1 for _, f in self._outcomes if f)
+            if calls >= CIRCUIT_MIN_CALLS and failures / calls >= CIRCUIT_FAILURE_RATE:
+                self._outcomes.clear()
+                self._transition(OPEN)
+
+    def _transition(self, state: str):
+        # Called with the lock held
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+        registry.inc("travel_circuit_transitions_total", host=self.host, state=state)
+        print(f"⚡ Circuit {self.host}: {state}")
+
+    def summary(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "window_calls": len(self._outcomes),
+                "window_failures": sum(1 for _, f in self._outcomes if f),
+                "open_for_s": round(time.monotonic() - self.opened_at, 1) if self.state == OPEN else 0.0,
+                "rejected": self.rejected,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    breaker = _breakers.get(host)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(host, CircuitBreaker(host))
+    return breaker
+
+
+def open_circuits() -> List[str]:
+    return sorted(host for host, b in list(_breakers.items()) if b.state != CLOSED)
+
+
+def circuit_summary() -> Dict[str, Dict[str, object]]:
+    return {host: b.summary() for host, b in sorted(_breakers.items())}
+
+
+# =========================
+# ✅ TRANSPORT ADAPTER (EVERY get_session() CALL GOES THROUGH IT)
+# =========================
+class CircuitBreakerAdapter(HTTPAdapter):
+    def send(self, request, *args, **kwargs):
+        if not CIRCUIT_BREAKER_ENABLED:
+            return super().send(request, *args, **kwargs)
+
+        breaker = get_breaker(urlsplit(request.url).netloc)
+        breaker.before_call()
+
+        start = time.perf_counter()
+        try:
+            response = super().send(request, *args, **kwargs)
+        except Exception:
+            breaker.record(failed=True)
+            raise
+
+        slow = time.perf_counter() - start > CIRCUIT_SLOW_SECONDS
+        breaker.record(failed=slow or response.status_code >= 500 or response.status_code == 429)
+        return response
+
+
+def _circuit_samples():
+    for host, breaker in list(_breakers.items()):
+        yield "travel_circuit_state", "gauge", {"host": host}, _STATE_VALUE[breaker.state]
+
+
+registry.register_collector(_circuit_samples)
+registry.describe("travel_circuit_state", "Upstream circuit state (0 closed, 1 half-open, 2 open)")
+registry.describe("travel_circuit_transitions_total", "Upstream circuit state changes")
+registry.describe("travel_circuit_rejected_total", "Upstream calls failed fast by an open circuit")
@@ -0,0 +1,229 @@
+import re
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from ..config import OPENWEATHER_API_KEY
+from ..degradation import mark_degraded
+from ..metrics import span, record_cache, record_upstream_error
+from ..shared_cache import shared_cache
+from .circuit_breaker import CircuitOpenError
+from .http_client import get_session
+from .weather_tool import OPENWEATHER_BASE_URL
+
+FORECAST_CACHE_TTL = 3 * 3600   # ✅ OpenWeather refreshes the 5-day/3-hour forecast every few hours
+FORECAST_DAYS = 5               # ✅ days covered by one /forecast call (today included)
+FORECAST_STALE_TTL = 24 * 3600  # ✅ last good forecast served while OpenWeather is down
+
+# "tomorrow", "day after tomorrow", "on day 2", "in 3 days", "on saturday", ...
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+DAY_PHRASE = re.compile(
+    r"\b(?:(?:on\s+)?(?:the\s+)?day\s+after\s+tomorrow|(?:on\s+)?day\s+\d+|in\s+\d+\s+days?|"
+    r"tomorrow|tonight|today|this\s+weekend|(?:on\s+|this\s+|next\s+)?(?:"
+    + "|".join(_WEEKDAYS)
+    + r"))\b",
+    re.IGNORECASE,
+)
+
+
+def _city_key(city: str) -> str:
+    return " ".join(city.lower().split())
+
+
+# =========================
+# ✅ 3-HOUR SLOTS → PER-DAY SUMMARIES
+# =========================
+def summarize_days(slots: List[Dict[str, Any]], tz_offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Group the 3-hourly entries by local calendar day (the response's
+    city.timezone offset) and reduce each day to what a planner needs:
+    temperature range, dominant conditions, worst rain chance.
+    """
+    by_day = defaultdict(list)
+    for slot in slots:
+        local = datetime.fromtimestamp(slot["dt"] + tz_offset, timezone.utc)
+        by_day[local.date().isoformat()].append(slot)
+
+    days = []
+    for day, entries in sorted(by_day.items()):
+        temps = [e["main"]["temp"] for e in entries]
+        lows = [e["main"].get("temp_min", e["main"]["temp"]) for e in entries]
+        highs = [e["main"].get("temp_max", e["main"]["temp"]) for e in entries]
+        descriptions = Counter(e["weather"][0]["description"] for e in entries if e.get("weather"))
+
+        days.append({
+            "date": day,
+            "temp_min": round(min(lows + temps), 1),
+            "temp_max": round(max(highs + temps), 1),
+            "humidity": round(sum(e["main"].get("humidity", 0) for e in entries) / len(entries)),
+            "description": descriptions.most_common(1)[0][0].title() if descriptions else "Unknown",
+            "rain_chance": round(max(e.get("pop", 0) for e in entries) * 100),
+            "rain_mm": round(sum(e.get("rain", {}).get("3h", 0) for e in entries), 1),
+            "wind_max": round(max(e.get("wind", {}).get("speed", 0) for e in entries), 1),
+            "slots": len(entries),
+        })
+    return days
+
+
+def format_day(summary: Dict[str, Any]) -> str:
+    day = date.fromisoformat(summary["date"])
+    text = (
+        f"{day:%a %d %b}: {summary['temp_min']}–{summary['temp_max']}°C, "
+        f"{summary['description']}, rain chance {summary['rain_chance']}%"
+    )
+    if summary["rain_mm"]:
+        text += f" ({summary['rain_mm']} mm)"
+    return text + f", humidity {summary['humidity']}%, wind up to {summary['wind_max']} m/s"
+
+
+def _stale_or(error: str, city: str, lat, lon) -> Dict[str, Any]:
+    stale = shared_cache.get("forecast_stale", f"{_city_key(city)}|{lat}|{lon}")
+    if stale is None:
+        return {"error": error}
+    record_cache("forecast_stale", "hit")
+    mark_degraded("openweather")
+    return {**stale, "stale": True}
+
+
+# =========================
+# ✅ ONE FETCH PER DESTINATION, CACHED PER CITY AND DAY
+# =========================
+@shared_cache.cached(
+    "forecast",
+    ttl=FORECAST_CACHE_TTL,
+    should_cache=lambda r: "error" not in r and not r.get("stale"),
+    scope=OPENWEATHER_BASE_URL,
+)
+def fetch_forecast(
+    city: str, lat: float | None = None, lon: float | None = None
+) -> Dict[str, Any]:
+    if not OPENWEATHER_API_KEY or OPENWEATHER_API_KEY == "YOUR_OPENWEATHER_API_KEY_HERE":
+        return {"error": "Weather API key is missing."}
+
+    try:
+        city = city.strip()
+        params = {"q": city, "appid": OPENWEATHER_API_KEY, "units": "metric"}
+        if lat is not None and lon is not None:
+            params.pop("q")
+            params.update({"lat": lat, "lon": lon})
+
+        with span("forecast"):
+            res = get_session().get(f"{OPENWEATHER_BASE_URL}/data/2.5/forecast", params=params, timeout=10)
+
+        if res.status_code != 200:
+            record_upstream_error("openweather", f"http_{res.status_code}")
+            return _stale_or(f"Forecast API failed | City: {city} | Status: {res.status_code}", city, lat, lon)
+
+        data = res.json()
+        days = summarize_days(data.get("list", []), int(data.get("city", {}).get("timezone", 0)))
+
+    except CircuitOpenError as e:
+        record_upstream_error("openweather", "circuit_open")
+        return _stale_or(f"Forecast API unavailable: {e}", city, lat, lon)
+    except Exception as e:
+        record_upstream_error("openweather")
+        return _stale_or(f"Forecast API crashed: {e}", city, lat, lon)
+
+    # Day entries let follow-ups ("tomorrow in goa?") skip the full payload
+    for summary in days:
+        shared_cache.set("forecast_day", f"{_city_key(city)}|{summary['date']}", summary, FORECAST_CACHE_TTL)
+
+    forecast = {"city": city.title(), "days": days}
+    shared_cache.set("forecast_stale", f"{_city_key(city)}|{lat}|{lon}", forecast, FORECAST_STALE_TTL)
+    return forecast
+
+
+def get_day_forecast(
+    city: str, day: date, lat: float | None = None, lon: float | None = None
+) -> Optional[Dict[str, Any]]:
+    """Summary for one city and day; None outside the forecast window or on errors."""
+    summary = shared_cache.get("forecast_day", f"{_city_key(city)}|{day.isoformat()}")
+    if summary is not None:
+        return summary
+
+    for summary in fetch_forecast(city, lat, lon).get("days", []):
+        if summary["date"] == day.isoformat():
+            return summary
+    return None
+
+
+def starts_in_window(start: date) -> bool:
+    """True when the trip starts today or within the forecast window."""
+    return 0 <= (start - date.today()).days < FORECAST_DAYS
+
+
+def trip_forecast(
+    city: str, start: date, days: int, lat: float | None = None, lon: float | None = None
+) -> str:
+    """
+    "Day N (date): ..." lines for the trip days the forecast covers, or
+    "" when the trip starts in the past or beyond the window, or the API
+    is unavailable.
+    """
+    if not starts_in_window(start):
+        return ""
+
+    by_date = {s["date"]: s for s in fetch_forecast(city, lat, lon).get("days", [])}
+    lines = []
+    for n in range(days):
+        summary = by_date.get((start + timedelta(days=n)).isoformat())
+        if summary:
+            lines.append(f"Day {n + 1} ({format_day(summary)})")
+    return "\n".join(lines)
+
+
+# =========================
+# ✅ CHAT FOLLOW-UPS ("tomorrow", "day 2", "on saturday")
+# =========================
+def parse_day_offset(when: str, start: date | None = None) -> Optional[int]:
+    """
+    Days from today for a day phrase. "day N" counts from the trip
+    start date when one is known, otherwise from today.
+    """
+    text = " ".join(when.lower().split())
+    today = date.today()
+
+    if "day after tomorrow" in text:
+        return 2
+    if "tomorrow" in text:
+        return 1
+    if "today" in text or "tonight" in text:
+        return 0
+
+    m = re.search(r"day\s+(\d+)", text)
+    if m:
+        base = (start - today).days if start else 0
+        return base + int(m.group(1)) - 1
+
+    m = re.search(r"in\s+(\d+)\s+day", text)
+    if m:
+        return int(m.group(1))
+
+    if "weekend" in text:
+        return (5 - today.weekday()) % 7
+
+    for index, name in enumerate(_WEEKDAYS):
+        if name in text:
+            ahead = (index - today.weekday()) % 7
+            return ahead + 7 if ahead == 0 and text.startswith("next") else ahead
+    return None
+
+
+def forecast_answer(
+    city: str,
+    when: str,
+    start: date | None = None,
+    lat: float | None = None,
+    lon: float | None = None,
+) -> str:
+    offset = parse_day_offset(when, start)
+    if offset is None or offset < 0:
+        return f"ERROR: Could not tell which day '{when}' means."
+    if offset >= FORECAST_DAYS:
+        return f"ERROR: The forecast only covers the next {FORECAST_DAYS} days."
+
+    summary = get_day_forecast(city, date.today() + timedelta(days=offset), lat, lon)
+    if summary is None:
+        return f"ERROR: No forecast available for {city.title()}."
+
+    return f"{city.title()} Forecast — {format_day(summary)}."
@@ -1,44 +1,95 @@
 import math
+import os
 from functools import lru_cache
-import requests
+
+from ..places import lookup_place
+from ..degradation import mark_degraded
+from ..metrics import registry, span, record_cache, record_upstream_error
+from ..shared_cache import shared_cache
+from .circuit_breaker import CircuitOpenError
+from .http_client import get_session
+from .road_graph import local_route
+from .transit import transit_options
+
+NOMINATIM_BASE_URL = os.getenv("NOMINATIM_BASE_URL", "https://nominatim.openstreetmap.org")
+OSRM_BASE_URL = os.getenv("OSRM_BASE_URL", "https://router.project-osrm.org")
+GEOCODE_CACHE_TTL = 7 * 24 * 3600
+ROUTE_CACHE_TTL = 24 * 3600
 
 
 # =========================
-# ✅ FREE GEOCODING (NOMINATIM)
+# ✅ FREE GEOCODING (GAZETTEER → SHARED CACHE → NOMINATIM)
 # =========================
 @lru_cache(maxsize=100)
 def geocode(city: str):
+    place = lookup_place(city)
+    if place and place.lat is not None:
+        record_cache("geocode", "gazetteer")
+        return place.lat, place.lon
+
+    coords = _nominatim_geocode(city)
+    return tuple(coords) if coords else None
+
+
+@shared_cache.cached("nominatim", ttl=GEOCODE_CACHE_TTL, scope=NOMINATIM_BASE_URL)
+def _nominatim_geocode(city: str):
     try:
-        url = "https://nominatim.openstreetmap.org/search"
+        url = f"{NOMINATIM_BASE_URL}/search"
         params = {"q": city, "format": "json", "limit": 1}
         headers = {"User-Agent": "travel-planner-capstone"}
 
-        r = requests.get(url, params=params, headers=headers, timeout=8)
+        with span("geocode"):
+            r = get_session().get(url, params=params, headers=headers, timeout=8)
         data = r.json()
 
         if not data:
             return None
 
         return float(data[0]["lat"]), float(data[0]["lon"])
+    except CircuitOpenError:
+        # Raised through both caches, so the city is looked up again once Nominatim is back
+        record_upstream_error("nominatim", "circuit_open")
+        raise
     except Exception:
+        record_upstream_error("nominatim")
+        return None
+
+
+def _geocode_or_none(city: str):
+    try:
+        return geocode(city)
+    except CircuitOpenError:
         return None
 
 
+def _geocode_cache_samples():
+    info = geocode.cache_info()
+    yield "travel_geocode_lru_total", "counter", {"result": "hit"}, info.hits
+    yield "travel_geocode_lru_total", "counter", {"result": "miss"}, info.misses
+
+
+registry.register_collector(_geocode_cache_samples)
+registry.describe("travel_route_engine_total", "Routes answered by the local road graph, OSRM or haversine")
+
+
 # =========================
 # ✅ OSRM REAL ROAD ROUTING (CAR)
 # =========================
+@shared_cache.cached("osrm", ttl=ROUTE_CACHE_TTL, scope=OSRM_BASE_URL)
 def osrm_route(lat1, lon1, lat2, lon2):
     try:
         url = (
-            f"https://router.project-osrm.org/route/v1/driving/"
+            f"{OSRM_BASE_URL}/route/v1/driving/"
             f"{lon1},{lat1};{lon2},{lat2}"
         )
         params = {"overview": "full", "geometries": "geojson"}
 
-        r = requests.get(url, params=params, timeout=10)
+        with span("osrm"):
+            r = get_session().get(url, params=params, timeout=10)
         data = r.json()
 
         if "routes" not in data or not data["routes"]:
+            record_upstream_error("osrm", "no_route")
             return None
 
         route = data["routes"][0]
@@ -49,7 +100,11 @@ def osrm_route(lat1, lon1, lat2, lon2):
             "geometry": route["geometry"]["coordinates"],  # [[lon,lat], ...]
         }
 
+    except CircuitOpenError:
+        record_upstream_error("osrm", "circuit_open")
+        return None
     except Exception:
+        record_upstream_error("osrm")
         return None
 
 
@@ -83,26 +138,43 @@ def _time_minutes(distance_km: float, speed_kmph: float) -> int:
 # =========================
 def get_multiple_routes(origin: str, destination: str):
 
-    src = geocode(origin)
-    dst = geocode(destination)
+    src = _geocode_or_none(origin)
+    dst = _geocode_or_none(destination)
 
+    # engine tells the client how real the distance is (haversine / estimate = degraded)
     if not src or not dst:
         base_km = 500.0
         route_geometry = []
+        engine = "estimate"
+        mark_degraded("nominatim")
         origin_city = origin.title()
         dest_city = destination.title()
     else:
         lat1, lon1 = src
         lat2, lon2 = dst
 
-        osrm = osrm_route(lat1, lon1, lat2, lon2)
-
-        if osrm:
-            base_km = osrm["distance_km"]
-            route_geometry = osrm["geometry"]
+        # ✅ Real timetables (RAPTOR over GTFS) when both cities have stations
+        transit = transit_options(origin.title(), destination.title(), src, dst)
+        if transit:
+            return transit
+
+        # ✅ Local road graph first (no network), then OSRM, then straight line
+        road = local_route(lat1, lon1, lat2, lon2)
+        engine = "road_graph"
+        if not road:
+            road = osrm_route(lat1, lon1, lat2, lon2)
+            engine = "osrm"
+
+        if road:
+            base_km = road["distance_km"]
+            route_geometry = road["geometry"]
         else:
             base_km = haversine_km(lat1, lon1, lat2, lon2)
             route_geometry = []
+            engine = "haversine"
+            mark_degraded("osrm")
+
+        registry.inc("travel_route_engine_total", engine=engine)
 
         origin_city = origin.title()
         dest_city = destination.title()
@@ -127,6 +199,7 @@ def get_multiple_routes(origin: str, destination: str):
             + _time_minutes(bus1, SPEED_BUS)
         ),
         "geometry": route_geometry,
+        "engine": engine,
         "segments": [
             {"mode": "car", "from": f"{origin_city} Home", "to": f"{origin_city} Station", "distance_km": car1, "time_min": _time_minutes(car1, SPEED_CAR)},
             {"mode": "train", "from": f"{origin_city} Station", "to": f"{dest_city} Station", "distance_km": train1, "time_min": _time_minutes(train1, SPEED_TRAIN)},
@@ -139,6 +212,7 @@ def get_multiple_routes(origin: str, destination: str):
         "total_distance_km": round(base_km * 0.95, 2),
         "total_time_min": _time_minutes(base_km, SPEED_TRAIN),
         "geometry": route_geometry,
+        "engine": engine,
         "segments": [
             {"mode": "train", "from": origin_city, "to": dest_city, "distance_km": round(base_km * 0.95, 2), "time_min": _time_minutes(base_km, SPEED_TRAIN)},
         ],
@@ -149,6 +223,7 @@ def get_multiple_routes(origin: str, destination: str):
         "total_distance_km": round(base_km, 2),
         "total_time_min": _time_minutes(base_km, SPEED_BUS),
         "geometry": route_geometry,
+        "engine": engine,
         "segments": [
             {"mode": "bus", "from": origin_city, "to": dest_city, "distance_km": round(base_km, 2), "time_min": _time_minutes(base_km, SPEED_BUS)},
         ],
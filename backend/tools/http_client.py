@@ -0,0 +1,30 @@
+import threading
+
+import requests
+
+from .circuit_breaker import CircuitBreakerAdapter
+
+POOL_CONNECTIONS = 8      # ✅ distinct upstream hosts kept warm
+POOL_MAXSIZE = 16         # ✅ keep-alive connections per host
+
+_session = None
+_session_lock = threading.Lock()
+
+
+# =========================
+# ✅ SHARED KEEP-ALIVE SESSION FOR UPSTREAM APIS
+# =========================
+def get_session() -> requests.Session:
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # Per-host circuit breakers: a down upstream fails fast instead of timing out
+                adapter = CircuitBreakerAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+
+    return _session
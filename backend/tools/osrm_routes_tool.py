@@ -1,14 +1,16 @@
-import requests
 import polyline
 
+from .http_client import get_session
+from .free_routes_tool import OSRM_BASE_URL
+
 def get_osrm_route(lat1, lon1, lat2, lon2):
     url = (
-        f"https://router.project-osrm.org/route/v1/driving/"
+        f"{OSRM_BASE_URL}/route/v1/driving/"
         f"{lon1},{lat1};{lon2},{lat2}"
         f"?overview=full&geometries=polyline"
     )
 
-    r = requests.get(url, timeout=15)
+    r = get_session().get(url, timeout=15)
     data = r.json()
 
     if "routes" not in data:
@@ -0,0 +1,373 @@
+import heapq
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..metrics import registry, span
+
+ROAD_GRAPH_DIR = Path(
+    os.getenv("ROAD_GRAPH_DIR") or Path(__file__).resolve().parents[1] / "data" / "road_graph"
+)
+ROAD_GRAPH_ENABLED = os.getenv("ROAD_GRAPH", "1") != "0"
+
+MAX_SNAP_KM = 25.0         # ✅ farther than this from any road node → no local route
+MAX_SNAP_RINGS = 3         # ✅ grid rings searched around the query cell
+# ✅ Nodes settled (both directions) before a query gives up and /routes asks OSRM;
+# hierarchy queries settle a few hundred, so only graphs built without one hit it
+MAX_SETTLED = int(os.getenv("ROAD_GRAPH_MAX_SETTLED", "10000"))
+EARTH_RADIUS_M = 6_371_000.0
+
+_INF = float("inf")
+
+
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class _CSR:
+    __slots__ = ("offsets", "targets", "time_s", "length_m", "mid")
+
+    def __init__(self, offsets, targets, time_s, length_m, mid=None):
+        self.offsets = offsets
+        self.targets = targets
+        self.time_s = time_s
+        self.length_m = length_m
+        self.mid = mid
+
+    def edges(self, u: int):
+        a, b = int(self.offsets[u]), int(self.offsets[u + 1])
+        return zip(self.targets[a:b].tolist(), self.time_s[a:b].tolist())
+
+    def ch_edges(self, u: int):
+        a, b = int(self.offsets[u]), int(self.offsets[u + 1])
+        return zip(
+            self.targets[a:b].tolist(), self.time_s[a:b].tolist(),
+            self.length_m[a:b].tolist(), self.mid[a:b].tolist(),
+        )
+
+    def ch_mid(self, u: int, v: int) -> int:
+        a, b = int(self.offsets[u]), int(self.offsets[u + 1])
+        for target, mid in zip(self.targets[a:b].tolist(), self.mid[a:b].tolist()):
+            if target == v:
+                return mid
+        return -1
+
+    def edge_length(self, u: int, v: int) -> float:
+        a, b = int(self.offsets[u]), int(self.offsets[u + 1])
+        best_time, best_len = _INF, 0.0
+        for target, t, length in zip(
+            self.targets[a:b].tolist(), self.time_s[a:b].tolist(), self.length_m[a:b].tolist()
+        ):
+            if target == v and t < best_time:
+                best_time, best_len = t, length
+        return best_len
+
+
+# =========================
+# ✅ MEMORY-MAPPED CSR ROAD GRAPH
+# =========================
+class RoadGraph:
+    """
+    Directed road graph in compressed-sparse-row arrays (one .npy per
+    array, see build_road_graph.py), opened with mmap so every worker
+    shares one copy in the page cache. Forward and reverse adjacency are
+    both stored for bidirectional search; a uniform lat/lon grid maps a
+    coordinate to its nearest node. Graphs built with a contraction
+    hierarchy also carry its upward / downward edges (`up_*`, `down_*`).
+    """
+
+    def __init__(self, directory: Path):
+        import numpy as np
+
+        def load(name):
+            # Plain ndarray views of the mapping: memmap slicing is slow in searches
+            return np.asarray(np.load(directory / f"{name}.npy", mmap_mode="r"))
+
+        meta = json.loads((directory / "meta.json").read_text())
+        self.cell_deg = float(meta["cell_deg"])
+        self.cols = int(round(360 / self.cell_deg))
+        self.max_speed_ms = float(meta["max_speed_kmph"]) / 3.6
+
+        self.lat = load("node_lat")
+        self.lon = load("node_lon")
+        self.fwd = _CSR(load("offsets"), load("targets"), load("time_s"), load("length_m"))
+        self.rev = _CSR(load("rev_offsets"), load("rev_targets"), load("rev_time_s"), load("rev_length_m"))
+
+        self.cell_keys = load("cell_keys")
+        self.cell_start = load("cell_start")
+        self.cell_nodes = load("cell_nodes")
+        self.nodes = len(self.lat)
+
+        self.up = self.down = None
+        if meta.get("hierarchy"):
+            self.up = _CSR(*(load(f"up_{name}") for name in ("offsets", "targets", "time_s", "length_m", "mid")))
+            self.down = _CSR(*(load(f"down_{name}") for name in ("offsets", "targets", "time_s", "length_m", "mid")))
+
+    # ---------- snapping ----------
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int((lat + 90) // self.cell_deg), int((lon + 180) // self.cell_deg)
+
+    def _cell_members(self, row: int, col: int):
+        import numpy as np
+
+        key = row * self.cols + col % self.cols
+        pos = int(np.searchsorted(self.cell_keys, key))
+        if pos >= len(self.cell_keys) or int(self.cell_keys[pos]) != key:
+            return []
+        return self.cell_nodes[int(self.cell_start[pos]):int(self.cell_start[pos + 1])].tolist()
+
+    def nearest_node(self, lat: float, lon: float) -> Optional[Tuple[int, float]]:
+        """
+        Nearest node and its distance in metres. Rings of grid cells are
+        searched outwards; once a node is found, one more ring is checked
+        because a closer node can sit just across a cell border.
+        """
+        row, col = self._cell(lat, lon)
+        best, best_d = -1, _INF
+        found_at = None
+
+        for ring in range(MAX_SNAP_RINGS + 1):
+            for dr in range(-ring, ring + 1):
+                for dc in range(-ring, ring + 1):
+                    if max(abs(dr), abs(dc)) != ring:
+                        continue
+                    for node in self._cell_members(row + dr, col + dc):
+                        d = _haversine_m(lat, lon, float(self.lat[node]), float(self.lon[node]))
+                        if d < best_d:
+                            best, best_d = node, d
+
+            if best >= 0 and found_at is None:
+                found_at = ring
+            if found_at is not None and ring > found_at:
+                break
+
+        return (best, best_d) if best >= 0 else None
+
+    # ---------- bidirectional A* ----------
+    def _lower_bound(self, u: int, v: int) -> float:
+        # Seconds at the top speed in the graph over the great-circle distance
+        return _haversine_m(
+            float(self.lat[u]), float(self.lon[u]), float(self.lat[v]), float(self.lon[v])
+        ) / self.max_speed_ms
+
+    def shortest_path(self, s: int, t: int) -> Optional[Tuple[List[int], float]]:
+        """
+        Fastest path by travel time with bidirectional A*. Both searches
+        use the average potential p(v) = (h_t(v) - h_s(v)) / 2, which is
+        consistent for both directions, so the bidirectional Dijkstra
+        stopping rule (top_f + top_b >= best meeting cost) stays exact.
+        None when the nodes are not connected, or when the search settles
+        more than MAX_SETTLED nodes (long routes are left to OSRM).
+        """
+        if s == t:
+            return [s], 0.0
+
+        potentials: Dict[int, float] = {}
+
+        def potential(v: int) -> float:
+            p = potentials.get(v)
+            if p is None:
+                p = potentials[v] = (self._lower_bound(v, t) - self._lower_bound(v, s)) / 2
+            return p
+
+        graphs = (self.fwd, self.rev)
+        signs = (1.0, -1.0)
+        dist: Tuple[Dict[int, float], Dict[int, float]] = ({s: 0.0}, {t: 0.0})
+        parent: Tuple[Dict[int, int], Dict[int, int]] = ({s: -1}, {t: -1})
+        heaps = ([(potential(s), s)], [(-potential(t), t)])
+        settled = (set(), set())
+        best, meet = _INF, -1
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            _, u = heapq.heappop(heaps[side])
+            if u in settled[side]:
+                continue
+            settled[side].add(u)
+            if len(settled[0]) + len(settled[1]) > MAX_SETTLED:
+                registry.inc("travel_road_graph_budget_exhausted_total")
+                return None
+
+            du = dist[side][u]
+            mine, other = dist[side], dist[1 - side]
+            for v, w in graphs[side].edges(u):
+                nd = du + w
+                if nd < mine.get(v, _INF):
+                    mine[v] = nd
+                    parent[side][v] = u
+                    heapq.heappush(heaps[side], (nd + signs[side] * potential(v), v))
+                    if v in other and nd + other[v] < best:
+                        best, meet = nd + other[v], v
+
+        if meet < 0:
+            return None
+
+        path = []
+        node = meet
+        while node != -1:
+            path.append(node)
+            node = parent[0][node]
+        path.reverse()
+
+        node = parent[1][meet]
+        while node != -1:
+            path.append(node)
+            node = parent[1][node]
+
+        return path, best
+
+    # ---------- contraction hierarchy ----------
+    def _unpack(self, u: int, v: int, mid: int, path: List[int]):
+        """Appends the road nodes after u on the (possibly shortcut) edge u → v."""
+        # A shortcut u → v via mid is u → mid (kept at mid, downward) then mid → v (upward)
+        stack = [(u, v, mid)]
+        while stack:
+            a, b, m = stack.pop()
+            if m < 0:
+                path.append(b)
+                continue
+            stack.append((m, b, self.up.ch_mid(m, b)))
+            stack.append((a, m, self.down.ch_mid(m, a)))
+
+    def hierarchy_path(self, s: int, t: int) -> Optional[Tuple[List[int], float, float]]:
+        """
+        Fastest path as (nodes, seconds, metres): bidirectional Dijkstra
+        that only climbs the hierarchy from both ends, stopping once
+        neither frontier can beat the best meeting point.
+        """
+        if s == t:
+            return [s], 0.0, 0.0
+
+        graphs = (self.up, self.down)
+        dist: Tuple[Dict[int, float], Dict[int, float]] = ({s: 0.0}, {t: 0.0})
+        length: Tuple[Dict[int, float], Dict[int, float]] = ({s: 0.0}, {t: 0.0})
+        parent: Tuple[Dict[int, Tuple[int, int]], Dict[int, Tuple[int, int]]] = ({}, {})
+        heaps = ([(0.0, s)], [(0.0, t)])
+        settled = 0
+        best, meet = _INF, -1
+
+        while True:
+            tops = [heap[0][0] if heap else _INF for heap in heaps]
+            if min(tops) >= best:
+                break
+            side = 0 if tops[0] <= tops[1] else 1
+
+            du, u = heapq.heappop(heaps[side])
+            if du > dist[side][u]:
+                continue
+            settled += 1
+            if settled > MAX_SETTLED:
+                registry.inc("travel_road_graph_budget_exhausted_total")
+                return None
+
+            mine, other = dist[side], dist[1 - side]
+            for v, w, meters, mid in graphs[side].ch_edges(u):
+                nd = du + w
+                if nd < mine.get(v, _INF):
+                    mine[v] = nd
+                    length[side][v] = length[side][u] + meters
+                    parent[side][v] = (u, mid)
+                    heapq.heappush(heaps[side], (nd, v))
+            if u in other and du + other[u] < best:
+                best, meet = du + other[u], u
+
+        if meet < 0:
+            return None
+
+        # s → meet over upward edges, then meet → t back down
+        chain = []
+        node = meet
+        while node != s:
+            prev, mid = parent[0][node]
+            chain.append((prev, node, mid))
+            node = prev
+
+        path = [s]
+        for a, b, mid in reversed(chain):
+            self._unpack(a, b, mid, path)
+
+        node = meet
+        while node != t:
+            nxt, mid = parent[1][node]
+            self._unpack(node, nxt, mid, path)
+            node = nxt
+
+        return path, best, length[0][meet] + length[1][meet]
+
+    def route(self, lat1: float, lon1: float, lat2: float, lon2: float) -> Optional[dict]:
+        """
+        Same shape as free_routes_tool.osrm_route: distance, minutes and
+        a [[lon, lat], ...] geometry. None when either end cannot be
+        snapped to the graph, the two nodes are not connected, or the
+        search ran out of budget.
+        """
+        src = self.nearest_node(lat1, lon1)
+        dst = self.nearest_node(lat2, lon2)
+        if not src or not dst or max(src[1], dst[1]) > MAX_SNAP_KM * 1000:
+            return None
+
+        if self.up is not None:
+            found = self.hierarchy_path(src[0], dst[0])
+            if found is None:
+                return None
+            path, seconds, length = found
+        else:
+            found = self.shortest_path(src[0], dst[0])
+            if found is None:
+                return None
+            path, seconds = found
+            length = sum(self.fwd.edge_length(u, v) for u, v in zip(path, path[1:]))
+
+        return {
+            "distance_km": round(length / 1000, 2),
+            "time_min": int(seconds / 60),
+            "geometry": [[round(float(self.lon[n]), 6), round(float(self.lat[n]), 6)] for n in path],
+        }
+
+
+_graph: Optional[RoadGraph] = None
+_graph_lock = threading.Lock()
+_graph_missing = False
+
+
+def get_road_graph() -> Optional[RoadGraph]:
+    """
+    The local graph, or None when no extract is installed (routing then
+    falls back to OSRM / haversine).
+    """
+    global _graph, _graph_missing
+
+    if _graph is None and not _graph_missing:
+        with _graph_lock:
+            if _graph is None and not _graph_missing:
+                if ROAD_GRAPH_ENABLED and (ROAD_GRAPH_DIR / "meta.json").exists():
+                    _graph = RoadGraph(ROAD_GRAPH_DIR)
+                    print(f"✅ Road graph loaded ({_graph.nodes} nodes)")
+                else:
+                    _graph_missing = True
+
+    return _graph
+
+
+def local_route(lat1, lon1, lat2, lon2) -> Optional[dict]:
+    graph = get_road_graph()
+    if graph is None:
+        return None
+
+    with span("road_graph"):
+        return graph.route(lat1, lon1, lat2, lon2)
+
+
+registry.describe("travel_road_graph_budget_exhausted_total", "Road graph searches stopped at MAX_SETTLED")
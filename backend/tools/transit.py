@@ -0,0 +1,574 @@
+import json
+import math
+import os
+import threading
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from ..metrics import registry, span
+
+TRANSIT_DIR = Path(
+    os.getenv("TRANSIT_DIR") or Path(__file__).resolve().parents[1] / "data" / "transit"
+)
+TRANSIT_ENABLED = os.getenv("TRANSIT", "1") != "0"
+TRANSIT_TZ = ZoneInfo(os.getenv("TRANSIT_TZ", "Asia/Kolkata"))   # ✅ GTFS times are local service time
+
+MAX_ROUNDS = 4             # ✅ up to 4 vehicles (3 changes) per journey
+ACCESS_RADIUS_KM = 15.0    # ✅ stations considered around the origin / destination city
+ACCESS_STOPS = 8           # ✅ nearest stations kept on each side
+ACCESS_SPEED_KMPH = 25.0   # ✅ taxi / auto to and from the station
+RECOMMENDED_SLACK = 1.25   # ✅ recommended = fewest changes within 25% of the fastest
+BAG_SIZE = 4               # ✅ (arrival, fare) labels kept per stop
+FARE_SLACK = 1.5           # ✅ cheaper journeys searched up to 50% slower than the fastest
+MAX_SPEED_KMPH = 160.0     # ✅ no service is faster: bounds the time still to go from a stop
+
+# ✅ Fallback fare (INR per km) when a route has no GTFS fare
+FARE_PER_KM = {"train": 0.6, "bus": 1.2}
+MODES = ("bus", "train")   # pattern_mode values 0 / 1
+_RATES = tuple(FARE_PER_KM[mode] for mode in MODES)
+
+DAY = 24 * 3600
+_INF = float("inf")
+
+
+def _km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    )
+    return 2 * 6371.0 * math.asin(min(1.0, math.sqrt(a)))
+
+
+class _Label(NamedTuple):
+    # One journey reaching `stop`; legs are rebuilt by following parents
+    arrival: int
+    fare: float
+    stop: int
+    parent: Optional["_Label"]
+    leg: Optional[tuple]       # ("ride", pattern, trip, board_i, alight_i) / ("walk", from_stop, seconds)
+
+
+def _clock(seconds: int) -> str:
+    days, rest = divmod(int(seconds), DAY)
+    text = f"{rest // 3600:02d}:{rest % 3600 // 60:02d}"
+    return f"{text} (+{days}d)" if days else text
+
+
+# =========================
+# ✅ COMPACT TIMETABLE (ARRAYS FROM build_transit.py)
+# =========================
+class Timetable:
+    """
+    GTFS timetable as flat arrays, memory-mapped. Trips are grouped into
+    patterns (same stop sequence); each pattern's arrival / departure
+    times are a trips x stops block, trips sorted by departure, so the
+    earliest catchable trip is a binary search. Walking transfers
+    between nearby stops are precomputed per stop. Service days (from
+    calendar.txt / calendar_dates.txt) are one bit per trip and day.
+    """
+
+    def __init__(self, directory: Path):
+        import numpy as np
+
+        def load(name):
+            # Plain ndarray views of the mapping: memmap slicing is slow in scans
+            return np.asarray(np.load(directory / f"{name}.npy", mmap_mode="r"))
+
+        meta = json.loads((directory / "meta.json").read_text())
+        self.stop_names: List[str] = meta["stop_names"]
+        self.route_names: List[str] = meta["route_names"]
+
+        self.stop_lat = load("stop_lat")
+        self.stop_lon = load("stop_lon")
+
+        self.pattern_stop_start = load("pattern_stop_start")
+        self.pattern_stops = load("pattern_stops")
+        self.pattern_trips = load("pattern_trips")
+        self.pattern_time_start = load("pattern_time_start")
+        self.arr = load("arr_times")
+        self.dep = load("dep_times")
+        self.pattern_mode = load("pattern_mode")
+        self.pattern_fare = load("pattern_fare")
+        self.pattern_route = load("pattern_route")
+
+        self.stop_pat_start = load("stop_pat_start")
+        self.stop_pat = load("stop_pat")
+        self.stop_pat_pos = load("stop_pat_pos")
+
+        self.xfer_start = load("xfer_start")
+        self.xfer_to = load("xfer_to")
+        self.xfer_s = load("xfer_s")
+
+        # Trip t of pattern p is row pattern_trip_start[p] + t of trip_days
+        self.pattern_trip_start = np.concatenate(([0], np.cumsum(self.pattern_trips, dtype="int64")))
+        self.calendar_start = date.fromisoformat(meta["calendar_start"]) if meta.get("calendar_start") else None
+        self.calendar_days = int(meta.get("calendar_days", 0))
+        self.trip_days = load("trip_days") if self.calendar_start else None
+        self._running: Dict[date, object] = {}
+        self._running_lock = threading.Lock()
+        # Per-pattern and per-stop views, filled as searches touch them
+        self._patterns: Dict[int, tuple] = {}
+        self._stop_serving: Dict[int, List[Tuple[int, int]]] = {}
+        self._stop_transfers: Dict[int, List[Tuple[int, int]]] = {}
+
+    # ---------- lookups ----------
+    def stops_near(self, lat: float, lon: float) -> List[Tuple[int, float]]:
+        import numpy as np
+
+        lat_r = np.radians(self.stop_lat.astype("float64"))
+        dlat = lat_r - math.radians(lat)
+        dlon = np.radians(self.stop_lon.astype("float64") - lon)
+        a = np.sin(dlat / 2) ** 2 + math.cos(math.radians(lat)) * np.cos(lat_r) * np.sin(dlon / 2) ** 2
+        km = 2 * 6371.0 * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+
+        near = np.flatnonzero(km <= ACCESS_RADIUS_KM)
+        near = near[np.argsort(km[near])][:ACCESS_STOPS]
+        return [(int(s), float(km[s])) for s in near]
+
+    def running_on(self, day: date):
+        """
+        Boolean array over all trips: does the trip run on `day`? None
+        when the feeds had no calendar (every trip runs daily).
+        """
+        import numpy as np
+
+        if self.trip_days is None:
+            return None
+
+        running = self._running.get(day)
+        if running is None:
+            offset = (day - self.calendar_start).days
+            if 0 <= offset < self.calendar_days:
+                running = (self.trip_days[:, offset // 8] >> (7 - offset % 8)) & 1 == 1
+            else:
+                running = np.zeros(int(self.pattern_trip_start[-1]), dtype=bool)
+            with self._running_lock:
+                if len(self._running) > 8:
+                    self._running.clear()
+                self._running[day] = running
+        return running
+
+    def _stops_of(self, p: int) -> List[int]:
+        return self.pattern_stops[int(self.pattern_stop_start[p]):int(self.pattern_stop_start[p + 1])].tolist()
+
+    def _pattern(self, p: int) -> tuple:
+        """
+        (stops, trips, arr block, departures by stop, first trip row,
+        fixed fare, fare per km, cumulative km) for pattern p. The arr
+        block is a trips x stops view of the mapped array; departures
+        are copied per stop for bisect. A ride from stop b to i costs
+        fixed + per_km * (cum[i] - cum[b]): the GTFS flat fare, or else
+        FARE_PER_KM. Cached per pattern: scans read these per stop.
+        """
+        cached = self._patterns.get(p)
+        if cached is None:
+            stops = self._stops_of(p)
+            trips = int(self.pattern_trips[p])
+            base = int(self.pattern_time_start[p])
+            shape = (trips, len(stops))
+            flat = float(self.pattern_fare[p])
+            cum = [0.0]
+            for a, b in zip(stops, stops[1:]):
+                cum.append(cum[-1] + _km(
+                    float(self.stop_lat[a]), float(self.stop_lon[a]), float(self.stop_lat[b]), float(self.stop_lon[b])
+                ))
+            cached = (
+                stops, trips,
+                self.arr[base:base + trips * len(stops)].reshape(shape),
+                self.dep[base:base + trips * len(stops)].reshape(shape).T.tolist(),
+                int(self.pattern_trip_start[p]),
+                max(flat, 0.0),
+                0.0 if flat >= 0 else _RATES[int(self.pattern_mode[p])],
+                cum,
+            )
+            self._patterns[p] = cached
+        return cached
+
+    def _serving(self, stop: int) -> List[Tuple[int, int]]:
+        # (pattern, position of the stop in it) for every pattern calling here
+        serving = self._stop_serving.get(stop)
+        if serving is None:
+            a, b = int(self.stop_pat_start[stop]), int(self.stop_pat_start[stop + 1])
+            serving = self._stop_serving[stop] = list(zip(self.stop_pat[a:b].tolist(), self.stop_pat_pos[a:b].tolist()))
+        return serving
+
+    def _transfers(self, stop: int) -> List[Tuple[int, int]]:
+        # (other stop, walking seconds)
+        transfers = self._stop_transfers.get(stop)
+        if transfers is None:
+            a, b = int(self.xfer_start[stop]), int(self.xfer_start[stop + 1])
+            transfers = self._stop_transfers[stop] = list(zip(self.xfer_to[a:b].tolist(), self.xfer_s[a:b].tolist()))
+        return transfers
+
+    def _time(self, times, p: int, trip: int, i: int, n_stops: int) -> int:
+        return int(times[int(self.pattern_time_start[p]) + trip * n_stops + i])
+
+    def reaches(self, sources, targets, rounds: int = MAX_ROUNDS) -> bool:
+        """
+        Can any target be reached with at most `rounds` vehicles, ignoring
+        times? A few ms, and it spares a search that would otherwise
+        explore the whole network before finding no connection.
+        """
+        seen, marked = set(sources), set(sources)
+        for _ in range(rounds):
+            queue: Dict[int, int] = {}
+            for stop in marked:
+                for p, pos in self._serving(stop):
+                    if pos < queue.get(p, 1 << 30):
+                        queue[p] = pos
+
+            marked = set()
+            for p, start in queue.items():
+                marked.update(self._pattern(p)[0][start + 1:])
+            for stop in list(marked):
+                marked.update(other for other, _ in self._transfers(stop))
+
+            marked -= seen
+            if not marked.isdisjoint(targets):
+                return True
+            seen |= marked
+        return False
+
+    # ---------- RAPTOR (FARE-AWARE) ----------
+    def _time_to_go(self, targets: Dict[int, int]) -> List[float]:
+        # Per stop, a lower bound on the seconds still needed: straight
+        # line to a target stop at MAX_SPEED_KMPH, plus its egress
+        import numpy as np
+
+        lat = np.radians(self.stop_lat.astype("float64"))
+        lon = np.radians(self.stop_lon.astype("float64"))
+        bound = np.full(len(lat), _INF)
+        for stop, egress in targets.items():
+            a = (
+                np.sin((lat - lat[stop]) / 2) ** 2
+                + np.cos(lat) * math.cos(lat[stop]) * np.sin((lon - lon[stop]) / 2) ** 2
+            )
+            km = 2 * 6371.0 * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+            np.minimum(bound, km / MAX_SPEED_KMPH * 3600 + egress, out=bound)
+        return bound.tolist()
+
+    def raptor(self, sources: Dict[int, int], targets: Dict[int, int],
+               rounds: int = MAX_ROUNDS, day: Optional[date] = None) -> List[Tuple[int, float, int, _Label]]:
+        """
+        Bounded McRAPTOR, one pass. Round k allows k vehicles; each stop
+        keeps up to BAG_SIZE (arrival, fare) labels that no other label
+        beats on both. A label is dropped when, even at MAX_SPEED_KMPH
+        from there, it would reach the destination no earlier and no
+        cheaper than a journey already found, or later than FARE_SLACK
+        times the fastest one.
+
+        sources / targets map stop → seconds (arrival time at the source
+        stop, egress time from the target stop); only trips running on
+        `day` (any day when None) are ridden. Returns the journeys
+        reaching a target as [(arrival_at_destination, fare, rides, label)];
+        together they hold the time / fare / transfers Pareto set.
+        """
+        running = self.running_on(day) if day is not None else None
+        to_go = self._time_to_go(targets)
+        origin = min(sources.values())
+        limit = _INF
+        best: Dict[int, List[_Label]] = {}
+        found: List[Tuple[int, float, int, _Label]] = []
+        frontier: List[Tuple[int, float]] = []    # (arrival, fare) of found journeys, none beating another
+
+        def beaten(arrival: int, fare: float, stop: int) -> bool:
+            bound = arrival + to_go[stop]
+            if bound > limit:
+                return True
+            for total, total_fare in frontier:
+                if total <= bound and total_fare <= fare:
+                    return True
+            for other in best.get(stop, ()):
+                if other.arrival <= arrival and other.fare <= fare:
+                    return True
+            return False
+
+        def add(label: _Label, k: int, new: Dict[int, List[_Label]]):
+            nonlocal limit
+            arrival, fare, stop = label.arrival, label.fare, label.stop
+            bag = best.get(stop)
+            if bag is None:
+                best[stop] = [label]
+            else:
+                if any(arrival <= o.arrival and fare <= o.fare for o in bag):
+                    bag[:] = [o for o in bag if o.arrival < arrival or o.fare < fare]
+                bag.append(label)
+                if len(bag) > BAG_SIZE:
+                    # Keep the earliest and the cheapest labels
+                    bag.sort(key=lambda o: o.arrival)
+                    del bag[-2]
+            new.setdefault(stop, []).append(label)
+
+            egress = targets.get(stop)
+            if egress is not None and k > 0:
+                total = arrival + egress
+                found.append((total, fare, k, label))
+                frontier[:] = [(t, f) for t, f in frontier if t < total or f < fare]
+                frontier.append((total, fare))
+                limit = min(limit, origin + FARE_SLACK * (total - origin))
+
+        new: Dict[int, List[_Label]] = {}
+        for stop, seconds in sources.items():
+            add(_Label(seconds, 0.0, stop, None, None), 0, new)
+
+        for k in range(1, rounds + 1):
+            # Board only from last round's labels still in their stop's bag
+            previous = {}
+            for stop, labels in new.items():
+                live = [l for l in labels if l.arrival + to_go[stop] <= limit and any(l is b for b in best[stop])]
+                if live:
+                    previous[stop] = live
+            new = {}
+
+            # Patterns to scan, each from the earliest stop labelled last round
+            queue: Dict[int, int] = {}
+            for stop in previous:
+                for p, pos in self._serving(stop):
+                    if pos < queue.get(p, 1 << 30):
+                        queue[p] = pos
+
+            for p, start in queue.items():
+                stops, trips, arr, departures, first, fixed, per_km, cum = self._pattern(p)
+                # Trips boarded so far: (fare base, trip, board_i, parent, arrivals, departures).
+                # A label alighting at i pays base + per_km * cum[i], so bases compare directly
+                route: List[tuple] = []
+
+                for i in range(start, len(stops)):
+                    stop = stops[i]
+
+                    for base, trip, board_i, parent, arrivals in route:
+                        fare = base + per_km * cum[i]
+                        if not beaten(arrivals[i], fare, stop):
+                            add(_Label(arrivals[i], fare, stop, parent, ("ride", p, trip, board_i, i)), k, new)
+
+                    labels = previous.get(stop)
+                    if not labels:
+                        continue
+                    column = departures[i]
+                    for parent in labels:
+                        # Earliest trip from here, skipping trips not running that day
+                        j = bisect_left(column, parent.arrival)
+                        if running is not None and j < trips:
+                            later = running[first + j:first + trips]
+                            nxt = int(later.argmax())
+                            j = j + nxt if later[nxt] else trips
+                        if j >= trips:
+                            continue
+
+                        # Keep boarded trips no other beats on both trip and fare
+                        base = parent.fare + fixed - per_km * cum[i]
+                        if any(r[0] <= base and r[1] <= j for r in route):
+                            continue
+                        route = [r for r in route if r[0] < base or r[1] < j]
+                        route.append((base, j, i, parent, arr[j].tolist()))
+
+            # Precomputed walking transfers, only from stops left by a vehicle
+            for stop, labels in list(new.items()):
+                transfers = self._transfers(stop)
+                if not transfers:
+                    continue
+                for label in [l for l in labels if l.leg[0] == "ride"]:
+                    for other, seconds in transfers:
+                        arrival = label.arrival + seconds
+                        if not beaten(arrival, label.fare, other):
+                            add(_Label(arrival, label.fare, other, label, ("walk", stop, seconds)), k, new)
+
+            if not new:
+                break
+
+        return found
+
+    @staticmethod
+    def legs(label: _Label) -> List[dict]:
+        """Rebuild the vehicle and walking legs of a journey from its label."""
+        legs: List[dict] = []
+        while label.leg is not None:
+            if label.leg[0] == "walk":
+                _, from_stop, seconds = label.leg
+                legs.append({"mode": "walk", "from_stop": from_stop, "to_stop": label.stop, "seconds": seconds})
+            else:
+                _, p, trip, board_i, alight_i = label.leg
+                legs.append({"mode": "ride", "pattern": p, "trip": trip, "board": board_i, "alight": alight_i})
+            label = label.parent
+
+        legs.reverse()
+        return legs
+
+    def describe(self, legs: List[dict], offset: int = 0) -> Tuple[List[dict], List[List[float]], float]:
+        """
+        Legs → (segments in the /routes schema, [[lon, lat], ...] geometry,
+        fare). offset shifts the shown clock times (DAY for tomorrow).
+        """
+        segments, geometry, fare = [], [], 0.0
+
+        for leg in legs:
+            if leg["mode"] == "walk":
+                a, b = leg["from_stop"], leg["to_stop"]
+                segments.append({
+                    "mode": "walk",
+                    "from": self.stop_names[a],
+                    "to": self.stop_names[b],
+                    "distance_km": round(_km(
+                        float(self.stop_lat[a]), float(self.stop_lon[a]),
+                        float(self.stop_lat[b]), float(self.stop_lon[b]),
+                    ), 2),
+                    "time_min": int(round(leg["seconds"] / 60)),
+                })
+                continue
+
+            p, trip = leg["pattern"], leg["trip"]
+            stops = self._stops_of(p)[leg["board"]:leg["alight"] + 1]
+            n_stops = int(self.pattern_stop_start[p + 1] - self.pattern_stop_start[p])
+            depart = self._time(self.dep, p, trip, leg["board"], n_stops)
+            arrive = self._time(self.arr, p, trip, leg["alight"], n_stops)
+            mode = MODES[int(self.pattern_mode[p])]
+
+            km = sum(
+                _km(float(self.stop_lat[a]), float(self.stop_lon[a]), float(self.stop_lat[b]), float(self.stop_lon[b]))
+                for a, b in zip(stops, stops[1:])
+            )
+            flat = float(self.pattern_fare[p])
+            fare += flat if flat >= 0 else km * FARE_PER_KM[mode]
+
+            geometry.extend([round(float(self.stop_lon[s]), 6), round(float(self.stop_lat[s]), 6)] for s in stops)
+            segments.append({
+                "mode": mode,
+                "from": self.stop_names[stops[0]],
+                "to": self.stop_names[stops[-1]],
+                "distance_km": round(km, 2),
+                "time_min": int(round((arrive - depart) / 60)),
+                "service": self.route_names[int(self.pattern_route[p])],
+                "departure": _clock(depart + offset),
+                "arrival": _clock(arrive + offset),
+            })
+
+        return segments, geometry, round(fare, 2)
+
+
+_timetable: Optional[Timetable] = None
+_timetable_lock = threading.Lock()
+_timetable_missing = False
+
+
+def get_timetable() -> Optional[Timetable]:
+    global _timetable, _timetable_missing
+
+    if _timetable is None and not _timetable_missing:
+        with _timetable_lock:
+            if _timetable is None and not _timetable_missing:
+                if TRANSIT_ENABLED and (TRANSIT_DIR / "meta.json").exists():
+                    _timetable = Timetable(TRANSIT_DIR)
+                    print(f"✅ Transit timetable loaded ({len(_timetable.stop_names)} stops)")
+                else:
+                    _timetable_missing = True
+
+    return _timetable
+
+
+# =========================
+# ✅ /routes OPTIONS FROM THE TIMETABLE
+# =========================
+def _access_seconds(km: float) -> int:
+    return int(km / ACCESS_SPEED_KMPH * 3600)
+
+
+def _option(tt: Timetable, legs: List[dict], arrival: int, depart: int, offset: int, origin: str, dest: str,
+            access: Dict[int, Tuple[float, int]], egress: Dict[int, Tuple[float, int]]) -> dict:
+    segments, geometry, fare = tt.describe(legs, offset)
+
+    first_stop = tt._stops_of(legs[0]["pattern"])[legs[0]["board"]]
+    last_stop = legs[-1]["to_stop"] if legs[-1]["mode"] == "walk" else tt._stops_of(legs[-1]["pattern"])[legs[-1]["alight"]]
+    access_km, access_s = access[first_stop]
+    egress_km, egress_s = egress[last_stop]
+
+    segments.insert(0, {
+        "mode": "car", "from": f"{origin} Home", "to": tt.stop_names[first_stop],
+        "distance_km": round(access_km, 2), "time_min": int(round(access_s / 60)),
+    })
+    segments.append({
+        "mode": "car", "from": tt.stop_names[last_stop], "to": f"{dest} Hotel",
+        "distance_km": round(egress_km, 2), "time_min": int(round(egress_s / 60)),
+    })
+
+    return {
+        "total_distance_km": round(sum(s["distance_km"] for s in segments), 2),
+        "total_time_min": int(round((arrival + offset - depart) / 60)),
+        "geometry": geometry,
+        "segments": segments,
+        "fare_inr": fare,
+        "transfers": sum(1 for leg in legs if leg["mode"] == "ride") - 1,
+    }
+
+
+def transit_options(origin: str, dest: str, src: Tuple[float, float], dst: Tuple[float, float],
+                    at: Optional[datetime] = None) -> Optional[dict]:
+    """
+    recommended / fastest / cheapest from the timetable, in the same
+    shape as get_multiple_routes, or None when there is no timetable,
+    no station near either city, or no connection. Departs now (or
+    `at`) in the feed's time zone.
+    """
+    tt = get_timetable()
+    if tt is None:
+        return None
+
+    with span("transit"):
+        near_src = tt.stops_near(*src)
+        near_dst = tt.stops_near(*dst)
+        if not near_src or not near_dst:
+            return None
+
+        access = {s: (km, _access_seconds(km)) for s, km in near_src}
+        egress = {s: (km, _access_seconds(km)) for s, km in near_dst}
+
+        # Service day and clock in the feed's time zone, not the server's
+        now = (at or datetime.now(TRANSIT_TZ)).astimezone(TRANSIT_TZ)
+        today = now.date()
+        depart = now.hour * 3600 + now.minute * 60 + now.second
+        targets = {s: seconds for s, (_, seconds) in egress.items()}
+        if not tt.reaches(access, targets):
+            registry.inc("travel_transit_queries_total", result="no_connection")
+            return None
+
+        # One fare-aware pass: today from now; if nothing runs any more,
+        # tomorrow's first services
+        options = []
+        for start, offset, day in ((depart, 0, today), (0, DAY, today + timedelta(days=1))):
+            sources = {s: start + seconds for s, (_, seconds) in access.items()}
+            journeys = sorted(tt.raptor(sources, targets, day=day), key=lambda j: (j[0], j[1], j[2]))
+
+            # Drop journeys another one beats on arrival, fare and rides
+            kept = []
+            for arrival, fare, rides, label in journeys:
+                if not any(a <= arrival and f <= fare and r <= rides for a, f, r, _ in kept):
+                    kept.append((arrival, fare, rides, label))
+
+            options = [
+                _option(tt, tt.legs(label), arrival, depart, offset, origin, dest, access, egress)
+                for arrival, _, _, label in kept
+            ]
+            if options:
+                break
+
+        if not options:
+            registry.inc("travel_transit_queries_total", result="no_connection")
+            return None
+
+    registry.inc("travel_transit_queries_total", result="ok")
+
+    fastest = min(options, key=lambda o: o["total_time_min"])
+    cheapest = min(options, key=lambda o: (o["fare_inr"], o["total_time_min"]))
+    recommended = min(
+        (o for o in options if o["total_time_min"] <= fastest["total_time_min"] * RECOMMENDED_SLACK),
+        key=lambda o: (o["transfers"], o["total_time_min"]),
+    )
+
+    return {"recommended": recommended, "fastest": fastest, "cheapest": cheapest}
+
+
+registry.describe("travel_transit_queries_total", "Timetable (RAPTOR) route queries by result")
@@ -1,27 +1,72 @@
-import requests
+import os
+import time
+
 from ..config import OPENWEATHER_API_KEY
+from ..degradation import mark_degraded
+from ..metrics import span, record_cache, record_upstream_error
+from ..shared_cache import shared_cache
+from .circuit_breaker import CircuitOpenError
+from .http_client import get_session
+
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org")
+WEATHER_CACHE_TTL = 600   # ✅ live weather reused across workers for 10 minutes
+WEATHER_STALE_TTL = 6 * 3600   # ✅ last good reading served while OpenWeather is down
+STALE_MARKER = "[STALE"
+
+
+def _stale_key(city: str, lat, lon) -> str:
+    return f"{' '.join(city.lower().split())}|{lat}|{lon}"
+
 
+def _stale_or(error: str, city: str, lat, lon) -> str:
+    stale = shared_cache.get("weather_stale", _stale_key(city, lat, lon))
+    if stale is None:
+        return error
 
-def get_live_weather(city: str) -> str:
+    record_cache("weather_stale", "hit")
+    mark_degraded("openweather")
+    minutes = int((time.time() - stale["at"]) / 60)
+    return f"{stale['text']} {STALE_MARKER}: live weather unavailable, observed {minutes} min ago]"
+
+
+@shared_cache.cached(
+    "weather",
+    ttl=WEATHER_CACHE_TTL,
+    should_cache=lambda r: not r.startswith("ERROR") and STALE_MARKER not in r,
+    scope=OPENWEATHER_BASE_URL,
+)
+def get_live_weather(
+    city: str, lat: float | None = None, lon: float | None = None
+) -> str:
     if not OPENWEATHER_API_KEY or OPENWEATHER_API_KEY == "YOUR_OPENWEATHER_API_KEY_HERE":
         return "ERROR: Weather API key is missing."
 
     try:
         city = city.strip()
 
-        url = "https://api.openweathermap.org/data/2.5/weather"
+        url = f"{OPENWEATHER_BASE_URL}/data/2.5/weather"
         params = {
             "q": city,
             "appid": OPENWEATHER_API_KEY,
             "units": "metric",
         }
 
-        res = requests.get(url, params=params, timeout=10)
+        # Known coordinates (gazetteer) are unambiguous, e.g. for states
+        if lat is not None and lon is not None:
+            params.pop("q")
+            params.update({"lat": lat, "lon": lon})
+
+        with span("weather"):
+            res = get_session().get(url, params=params, timeout=10)
 
         print("WEATHER RAW RESPONSE:", res.text)
 
         if res.status_code != 200:
-            return f"ERROR: Weather API failed | City: {city} | Status: {res.status_code} | {res.text}"
+            record_upstream_error("openweather", f"http_{res.status_code}")
+            return _stale_or(
+                f"ERROR: Weather API failed | City: {city} | Status: {res.status_code} | {res.text}",
+                city, lat, lon,
+            )
 
         data = res.json()
 
@@ -31,10 +76,18 @@ def get_live_weather(city: str) -> str:
         desc = data["weather"][0]["description"].title()
         wind = data["wind"]["speed"]
 
-        return (
+        text = (
             f"{city.title()} Live Weather: {temp}°C (Feels like {feels}°C), "
             f"{desc}, Humidity {humidity}%, Wind {wind} m/s."
         )
+        shared_cache.set(
+            "weather_stale", _stale_key(city, lat, lon), {"text": text, "at": time.time()}, WEATHER_STALE_TTL
+        )
+        return text
 
+    except CircuitOpenError as e:
+        record_upstream_error("openweather", "circuit_open")
+        return _stale_or(f"ERROR: Weather API unavailable: {e}", city.strip(), lat, lon)
     except Exception as e:
-        return f"ERROR: Weather API crashed: {e}"
+        record_upstream_error("openweather")
+        return _stale_or(f"ERROR: Weather API crashed: {e}", city.strip(), lat, lon)
@@ -0,0 +1,140 @@
+import os
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+
+# =========================
+# ✅ MEMORY-MAPPED EXACT L2 INDEX
+# =========================
+class MmapFlatIndex:
+    """
+    Read-only stand-in for faiss.IndexFlatL2 over a float32 .npy matrix
+    opened with mmap. Every worker process maps the same file, so the
+    vectors live once in the OS page cache instead of once per worker.
+    search() matches faiss: (distances, ids), both shaped (nq, k), with
+    -1 ids when k exceeds the number of vectors.
+    """
+
+    def __init__(self, path: Path):
+        self.vectors = np.load(path, mmap_mode="r")
+        self.ntotal, self.d = self.vectors.shape
+        self._sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(queries, dtype="float32")
+        nq = queries.shape[0]
+
+        distances = np.full((nq, k), np.inf, dtype="float32")
+        ids = np.full((nq, k), -1, dtype="int64")
+
+        top = min(k, self.ntotal)
+        if top == 0:
+            return distances, ids
+
+        dists = (
+            self._sq_norms[None, :]
+            - 2.0 * (queries @ self.vectors.T)
+            + np.einsum("ij,ij->i", queries, queries)[:, None]
+        )
+
+        part = np.argpartition(dists, top - 1, axis=1)[:, :top]
+        part_d = np.take_along_axis(dists, part, axis=1)
+        order = np.argsort(part_d, axis=1)
+
+        ids[:, :top] = np.take_along_axis(part, order, axis=1)
+        distances[:, :top] = np.take_along_axis(part_d, order, axis=1)
+        return distances, ids
+
+
+def save_vectors(path: Path, vectors: np.ndarray):
+    """
+    Write vectors atomically so workers never map a half-written file.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(vectors, dtype="float32"))
+    os.replace(tmp, path)
+
+
+# =========================
+# ✅ COMPACT (QUANTIZED) STORAGE WITH EXACT RE-RANK
+# =========================
+STORAGE_KINDS = ("flat", "fp16", "int8", "pq")
+RERANK_FACTOR = 10         # ✅ candidates fetched per requested result before re-ranking
+
+
+def quantize_index(vectors: np.ndarray, storage: str, pq_m: int = 64):
+    """
+    Build a faiss index holding the vectors as float32 ("flat"), float16
+    ("fp16"), 8-bit scalar codes ("int8", 4x smaller) or product
+    quantization codes ("pq": pq_m bytes per vector).
+    """
+    import faiss
+
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n, d = vectors.shape
+
+    if storage == "flat":
+        index = faiss.IndexFlatL2(d)
+    elif storage == "fp16":
+        index = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_fp16)
+    elif storage == "int8":
+        index = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_8bit)
+    elif storage == "pq":
+        if d % pq_m:
+            raise ValueError(f"PQ sub-quantizers ({pq_m}) must divide the dimension ({d})")
+        # 256 centroids per sub-quantizer need a few hundred training vectors
+        nbits = max(1, min(8, int(np.log2(max(n, 2)))))
+        index = faiss.IndexPQ(d, pq_m, nbits)
+    else:
+        raise ValueError(f"Unknown storage {storage!r}, expected one of {STORAGE_KINDS}")
+
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+class RerankIndex:
+    """
+    Searches a compact index for k * rerank candidates, then re-ranks
+    them with exact L2 against the float32 vectors memory-mapped from
+    disk. Only the candidate rows are paged in, so resident memory is
+    the compact codes. search() returns (distances, ids) like faiss.
+    """
+
+    def __init__(self, coarse, vectors_path: Path, rerank: int = RERANK_FACTOR):
+        self.coarse = coarse
+        self.vectors = np.load(vectors_path, mmap_mode="r")
+        self.rerank = max(1, rerank)
+        self.ntotal, self.d = self.vectors.shape
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(queries, dtype="float32")
+        nq = queries.shape[0]
+
+        distances = np.full((nq, k), np.inf, dtype="float32")
+        ids = np.full((nq, k), -1, dtype="int64")
+
+        _, candidates = self.coarse.search(queries, min(self.ntotal, k * self.rerank))
+
+        for row, query in enumerate(queries):
+            cand = candidates[row]
+            cand = np.sort(cand[cand >= 0])     # sorted reads are sequential on the mmap
+            if not len(cand):
+                continue
+
+            exact = ((self.vectors[cand] - query) ** 2).sum(axis=1)
+            order = np.argsort(exact)[:k]
+
+            ids[row, :len(order)] = cand[order]
+            distances[row, :len(order)] = exact[order]
+
+        return distances, ids
+
+
+def index_bytes(index) -> int:
+    import faiss
+    return int(faiss.serialize_index(index).size)
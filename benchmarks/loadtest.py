@@ -0,0 +1,256 @@
+"""
+Replay a JSONL request trace against the backend and report throughput
+and latency percentiles.
+
+Each trace line is one request:
+
+    {"request_id": "chat-001", "endpoint": "/chat", "body": {...}}
+
+By default the harness starts the upstream stubs (benchmarks/stubs.py)
+and a uvicorn process for backend.main:app wired to them, so runs are
+reproducible and network-free:
+
+    python -m benchmarks.loadtest --trace benchmarks/traces/sample.jsonl \\
+        --concurrency 8 --repeat 5 --output bench.json \\
+        --plot latency_distribution.png --baseline benchmarks/baseline.json
+
+backend/config.py must exist (any key values work against the stubs).
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+from .stubs import parse_latency, start_stub_server, stub_env
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_TRACE = Path(__file__).resolve().parent / "traces" / "sample.jsonl"
+
+
+def load_trace(path: Path) -> List[Dict]:
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return entries
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def summarize(latencies: List[float], errors: int, wall_seconds: float) -> Dict:
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round((len(latencies) + errors) / wall_seconds, 3) if wall_seconds else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+# =========================
+# ✅ BACKEND PROCESS
+# =========================
+def start_backend(port: int, env: Dict[str, str], workdir: str) -> subprocess.Popen:
+    proc_env = dict(os.environ)
+    proc_env.update(env)
+    proc_env["PYTHONPATH"] = str(PROJECT_ROOT) + os.pathsep + proc_env.get("PYTHONPATH", "")
+
+    # Run in a scratch dir so memory.db / caches start empty (stub_env puts
+    # the shared cache there too)
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "backend.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=workdir,
+        env=proc_env,
+    )
+
+
+def wait_until_up(base_url: str, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/ready", timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Backend did not come up at {base_url}")
+
+
+# =========================
+# ✅ REPLAY
+# =========================
+def replay(base_url: str, trace: List[Dict], concurrency: int, repeat: int, timeout: float) -> Dict:
+    jobs = [entry for _ in range(repeat) for entry in trace]
+    results: Dict[str, Dict[str, list]] = {}
+    lock = threading.Lock()
+    local = threading.local()
+
+    def run(entry: Dict):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+
+        endpoint = entry["endpoint"]
+        method = entry.get("method", "POST").upper()
+        start = time.perf_counter()
+        ok = False
+        try:
+            res = session.request(method, f"{base_url}{endpoint}", json=entry.get("body"), timeout=timeout)
+            ok = res.status_code < 400
+        except requests.RequestException:
+            pass
+        elapsed = time.perf_counter() - start
+
+        with lock:
+            bucket = results.setdefault(endpoint, {"latencies": [], "errors": []})
+            if ok:
+                bucket["latencies"].append(elapsed)
+            else:
+                bucket["errors"].append(entry.get("request_id"))
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run, jobs))
+    wall = time.perf_counter() - wall_start
+
+    all_latencies = [v for b in results.values() for v in b["latencies"]]
+    all_errors = sum(len(b["errors"]) for b in results.values())
+
+    return {
+        "concurrency": concurrency,
+        "repeat": repeat,
+        "wall_seconds": round(wall, 3),
+        "overall": summarize(all_latencies, all_errors, wall),
+        "endpoints": {
+            endpoint: summarize(b["latencies"], len(b["errors"]), wall)
+            for endpoint, b in sorted(results.items())
+        },
+        "_latencies": {endpoint: b["latencies"] for endpoint, b in results.items()},
+    }
+
+
+def compare_to_baseline(report: Dict, baseline: Dict) -> Dict:
+    """
+    Percent change per endpoint and metric (positive = slower / higher).
+    """
+    diff = {}
+    for endpoint, stats in report["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(endpoint)
+        if not base:
+            continue
+        diff[endpoint] = {
+            metric: round((stats[metric] - base[metric]) / base[metric] * 100, 1)
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+            if base.get(metric)
+        }
+    return diff
+
+
+def plot_latencies(latencies: Dict[str, List[float]], path: str):
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠️ matplotlib not installed, skipping latency plot")
+        return
+
+    fig, ax = plt.subplots(figsize=(9, 5))
+    for endpoint, values in sorted(latencies.items()):
+        if values:
+            ax.hist([v * 1000 for v in values], bins=40, alpha=0.55, label=endpoint)
+    ax.set_xlabel("Latency (ms)")
+    ax.set_ylabel("Requests")
+    ax.set_title("Latency distribution per endpoint")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    print(f"📈 Latency plot written to {path}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay a request trace against the backend")
+    parser.add_argument("--trace", type=Path, default=DEFAULT_TRACE)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1, help="times to replay the whole trace")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--base-url", help="target an already running backend (no stubs started)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stub-latency", help="e.g. groq=0.8,osrm=0.2 (seconds)")
+    parser.add_argument("--stub-groq-rpm", type=int, default=0, help="stub Groq answers 429 above this rate")
+    parser.add_argument("--output", help="write JSON report here")
+    parser.add_argument("--plot", help="write latency histogram PNG here")
+    parser.add_argument("--baseline", type=Path, help="JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    trace = load_trace(args.trace)
+    backend = None
+    stubs = None
+    workdir = None
+
+    try:
+        if args.base_url:
+            base_url = args.base_url.rstrip("/")
+        else:
+            stubs = start_stub_server(
+                latency=parse_latency(args.stub_latency), groq_rpm=args.stub_groq_rpm
+            )
+            base_url = f"http://127.0.0.1:{args.port}"
+            workdir = tempfile.mkdtemp(prefix="travel-bench-")
+            backend = start_backend(args.port, stub_env(stubs, workdir), workdir)
+            wait_until_up(base_url)
+
+        report = replay(base_url, trace, args.concurrency, args.repeat, args.timeout)
+    finally:
+        if backend:
+            backend.terminate()
+            backend.wait(timeout=10)
+        if stubs:
+            stubs.shutdown()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    latencies = report.pop("_latencies")
+    report["trace"] = str(args.trace)
+    report["stub_latency"] = None if args.base_url else parse_latency(args.stub_latency)
+
+    if args.baseline and args.baseline.exists():
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["vs_baseline_pct"] = compare_to_baseline(report, json.load(f))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    if args.plot:
+        plot_latencies(latencies, args.plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Micro-benchmarks for the backend hot paths: TF-IDF retrieval, SQLite
+memory, the route engine and the guardrail scanner. Every case records
+wall time over several rounds plus peak Python memory (tracemalloc) of
+one call.
+
+    python -m benchmarks.micro                          # run everything
+    python -m benchmarks.micro --filter retrieve --rounds 50
+    python -m benchmarks.micro --save benchmarks/micro_baseline.json
+    python -m benchmarks.micro --compare benchmarks/micro_baseline.json --threshold 0.25
+
+With --compare the exit code is 1 when any case's median time regresses
+by more than --threshold (fraction) against the saved baseline.
+"""
+import argparse
+import atexit
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .stubs import start_stub_server, stub_env
+
+# Upstream stubs must be configured before backend modules read their env;
+# the shared cache lives in a scratch dir removed on exit
+_stubs = start_stub_server(latency={"groq": 0, "openweather": 0, "nominatim": 0, "osrm": 0})
+_scratch = tempfile.mkdtemp(prefix="bench-micro-")
+atexit.register(shutil.rmtree, _scratch, ignore_errors=True)
+os.environ.update(stub_env(_stubs, _scratch))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from backend import rag_pipeline  # noqa: E402
+from backend.memory import Memory  # noqa: E402
+from backend.guardrails import violates_guardrails  # noqa: E402
+from backend.shared_cache import shared_cache  # noqa: E402
+from backend.tools import free_routes_tool  # noqa: E402
+
+CORPUS_SIZES = (1_000, 10_000, 100_000)
+MEMORY_TABLE_SIZES = (10, 1_000, 100_000)
+GUARDRAIL_LENGTHS = (1_000, 10_000, 100_000)
+SYNTHETIC_VOCAB = 800
+
+# name → (setup returning the callable to time, teardown)
+BENCHMARKS: Dict[str, Callable[[], Tuple[Callable[[], object], Callable[[], None]]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _noop():
+    pass
+
+
+# =========================
+# ✅ RETRIEVAL
+# =========================
+_WORDS = [f"w{i}" for i in range(SYNTHETIC_VOCAB)] + [
+    "goa", "kerala", "beach", "temple", "refund", "fort", "trek", "monsoon",
+]
+
+
+def _synthetic_chunks(n: int) -> List[Document]:
+    rnd = random.Random(n)
+    return [
+        Document(
+            page_content=" ".join(rnd.choice(_WORDS) for _ in range(90)),
+            metadata={"source_file": f"synthetic_{i % 50}.txt"},
+        )
+        for i in range(n)
+    ]
+
+
+_index_cache: Dict[int, tuple] = {}
+
+
+def _synthetic_index(n: int):
+    if n not in _index_cache:
+        chunks = _synthetic_chunks(n)
+        vectorizer, index = rag_pipeline._fit_index(chunks)
+        _index_cache[n] = (vectorizer, index, chunks)
+    return _index_cache[n]
+
+
+for _n in CORPUS_SIZES:
+    for _k in (4, 6):
+        def _setup(n=_n, k=_k):
+            vectorizer, index, chunks = _synthetic_index(n)
+            return (
+                lambda: rag_pipeline._search(vectorizer, index, chunks, "beach temple in goa", k),
+                _noop,
+            )
+        benchmark(f"retrieve_search[n={_n},k={_k}]")(_setup)
+
+
+@benchmark("retrieve_context[corpus,k=4]")
+def _setup_retrieve_context():
+    return lambda: rag_pipeline.retrieve_context("best beaches in goa", k=4), _noop
+
+
+# =========================
+# ✅ MEMORY (SQLITE)
+# =========================
+def _memory_with_rows(rows: int) -> Tuple[Memory, str]:
+    fd, path = tempfile.mkstemp(prefix="bench-memory-", suffix=".db")
+    os.close(fd)
+    mem = Memory(db_path=path)
+    mem.open()
+
+    now = time.time()
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO chat_history VALUES (?, ?, ?, ?)",
+        (
+            (f"session-{i % 500}", "user" if i % 2 else "assistant", f"message {i}", now)
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+    return mem, path
+
+
+def _remove_db(path: str):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+for _rows in MEMORY_TABLE_SIZES:
+    def _setup_add(rows=_rows):
+        mem, path = _memory_with_rows(rows)
+        return lambda: mem.add_turn("session-1", "User: hello there"), lambda: _remove_db(path)
+
+    def _setup_get(rows=_rows):
+        mem, path = _memory_with_rows(rows)
+        return lambda: mem.get_history("session-1"), lambda: _remove_db(path)
+
+    benchmark(f"memory_add_turn[rows={_rows}]")(_setup_add)
+    benchmark(f"memory_get_history[rows={_rows}]")(_setup_get)
+
+
+# =========================
+# ✅ ROUTE ENGINE (STUBBED GEOCODE / OSRM)
+# =========================
+@benchmark("get_multiple_routes[gazetteer]")
+def _setup_routes_known():
+    return lambda: free_routes_tool.get_multiple_routes("Delhi", "Agra"), _noop
+
+
+@benchmark("get_multiple_routes[stub_geocode]")
+def _setup_routes_stubbed():
+    # Every round goes to the stubs: no lru_cache and no shared cache hits
+    enabled, shared_cache.enabled = shared_cache.enabled, False
+
+    def run():
+        free_routes_tool.geocode.cache_clear()
+        return free_routes_tool.get_multiple_routes("Smalltown A", "Smalltown B")
+
+    def teardown():
+        shared_cache.enabled = enabled
+
+    return run, teardown
+
+
+# =========================
+# ✅ GUARDRAILS
+# =========================
+for _length in GUARDRAIL_LENGTHS:
+    def _setup_guard(length=_length):
+        base = "plan a relaxing family trip to goa with beaches and forts "
+        message = (base * (length // len(base) + 1))[:length]
+        return lambda: violates_guardrails(message), _noop
+    benchmark(f"violates_guardrails[chars={_length}]")(_setup_guard)
+
+
+# =========================
+# ✅ RUNNER
+# =========================
+def run_case(name: str, rounds: int) -> Dict:
+    fn, teardown = BENCHMARKS[name]()
+    try:
+        fn()    # warm-up
+
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    finally:
+        teardown()
+
+    return {
+        "rounds": rounds,
+        "min_ms": round(min(timings) * 1000, 4),
+        "median_ms": round(statistics.median(timings) * 1000, 4),
+        "mean_ms": round(statistics.mean(timings) * 1000, 4),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def find_regressions(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("median_ms"):
+            continue
+        ratio = stats["median_ms"] / base["median_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {base['median_ms']}ms → {stats['median_ms']}ms (+{(ratio - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Backend micro-benchmarks")
+    parser.add_argument("--filter", default="", help="substring of benchmark names to run")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--save", type=Path, help="write results JSON (new baseline)")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to check against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed median slowdown")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in BENCHMARKS:
+        if args.filter in name:
+            results[name] = run_case(name, args.rounds)
+            stats = results[name]
+            print(
+                f"{name:45s} median {stats['median_ms']:>10.3f} ms   "
+                f"min {stats['min_ms']:>10.3f} ms   peak {stats['peak_kb']:>10.1f} KB"
+            )
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print("\n❌ Regressions over threshold:")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print("\n✅ No regressions over threshold")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Checks classify_intent on messages whose rule path is easy to get
+wrong: weather questions that must take the weather fast path, and
+sightseeing questions with "hot", "cold" or "rain" in them that must
+not.
+
+    python -m benchmarks.router_cases
+
+Exit code 1 when any message is routed to the wrong intent or city.
+"""
+import sys
+from typing import List, Optional
+
+from backend.intent_router import classify_intent
+
+# message → (intent, city argument or None)
+ROUTER_CASES = (
+    ("What's the weather in Goa?", "weather", "Goa"),
+    ("Is it raining in Munnar?", "weather", "Munnar"),
+    ("how hot is it in Jaipur today", "weather", "Jaipur"),
+    ("Kerala forecast for tomorrow", "weather", "Kerala"),
+    ("will it rain on day 2?", "weather", None),
+    ("Suggest hot springs to visit in Manali", "agent", None),
+    ("Best places to visit in Kerala during rain", "agent", None),
+    ("Which cold desert treks are there in Ladakh?", "agent", None),
+    ("Is Goa humid in June? Plan beaches for me", "agent", None),
+    ("Delhi to Agra", "route", None),
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    failures = 0
+    for message, expected, city in ROUTER_CASES:
+        intent = classify_intent(message)
+        ok = intent.name == expected and (city is None or intent.args.get("city") == city)
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {message!r} → {intent.name} {intent.args}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
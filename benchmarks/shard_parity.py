@@ -0,0 +1,56 @@
+"""
+Checks that the sharded TF-IDF search returns the same top-k as one
+flat index fitted on the whole corpus, for queries whose routed shards
+hold every relevant file (mostly policy / company questions that also
+mention a destination).
+
+    python -m benchmarks.shard_parity
+    python -m benchmarks.shard_parity --k 8 --all-shards
+
+--all-shards skips the router, which isolates the cross-shard merge
+from routing misses. Exit code 1 when any query's top-k differs.
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from backend import rag_pipeline
+
+PARITY_QUERIES = (
+    "what is the refund for a cancelled Goa trip?",
+    "call the helpline about my booking payment",
+    "cancellation charges for my Kerala package",
+    "refund policy",
+    "terms and conditions of payment",
+    "how do I reschedule my Rajasthan booking?",
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sharded vs flat TF-IDF retrieval parity")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--all-shards", action="store_true", help="search every shard instead of the routed ones")
+    args = parser.parse_args(argv)
+
+    shard_set = rag_pipeline.get_snapshot()
+    chunks = list(shard_set.chunks)
+    vectorizer, index = rag_pipeline._fit_index(chunks)
+
+    failures = 0
+    for query in PARITY_QUERIES:
+        flat = rag_pipeline._search(vectorizer, index, chunks, query, args.k)
+        sharded = shard_set.search(query, args.k, rag_pipeline.SHARDS if args.all_shards else None)
+
+        # Compare as sets: equal-distance chunks may come back in either order
+        same = {doc.page_content for doc in flat} == {doc.page_content for doc in sharded}
+        failures += not same
+        print(f"{'✅' if same else '❌'} {query}")
+        if not same:
+            print("   flat:   ", [doc.metadata.get("source_file") for doc in flat])
+            print("   sharded:", [doc.metadata.get("source_file") for doc in sharded])
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Local stand-ins for Groq, OpenWeather, Nominatim and OSRM with
+injectable latency. One HTTP server answers all four (their paths do
+not overlap), so the backend only needs its *_BASE_URL variables
+pointed at it. --groq-rpm makes the Groq stub answer 429 with
+Retry-After once more than that many completions arrive per minute.
+
+    python -m benchmarks.stubs --port 9100 --latency groq=0.8,osrm=0.2 --groq-rpm 30
+"""
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Deque, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# ✅ Default mean latency per upstream (seconds)
+DEFAULT_LATENCY = {
+    "groq": 0.8,
+    "openweather": 0.15,
+    "nominatim": 0.3,
+    "osrm": 0.4,
+}
+JITTER = 0.25   # ✅ +/- fraction of the mean
+
+STUB_REPLY = (
+    "Here is a sample answer from the stub LLM. It is sunny at 31°C with "
+    "Humidity 40%, a good day to go out."
+)
+
+
+def _coords_for(name: str):
+    # Deterministic pseudo-coordinates inside India
+    rnd = random.Random(name.lower())
+    return 8.0 + rnd.random() * 24.0, 70.0 + rnd.random() * 20.0
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server_version = "TravelStub/1.0"
+    latency: Dict[str, float] = DEFAULT_LATENCY
+    fail_rate: Dict[str, float] = {}
+    groq_rpm: int = 0
+    groq_calls: Deque[float]
+    groq_lock: threading.Lock
+
+    def log_message(self, format, *args):
+        pass
+
+    # ---------- helpers ----------
+    def _delay(self, upstream: str):
+        mean = self.latency.get(upstream, 0.0)
+        if mean > 0:
+            time.sleep(max(0.0, mean * (1 + random.uniform(-JITTER, JITTER))))
+
+    def _maybe_fail(self, upstream: str) -> bool:
+        if random.random() < self.fail_rate.get(upstream, 0.0):
+            self._send_json({"error": "stub failure"}, status=503)
+            return True
+        return False
+
+    def _rate_limited(self) -> bool:
+        if not self.groq_rpm:
+            return False
+
+        now = time.monotonic()
+        with self.groq_lock:
+            while self.groq_calls and now - self.groq_calls[0] > 60:
+                self.groq_calls.popleft()
+            if len(self.groq_calls) >= self.groq_rpm:
+                retry_after = 60 - (now - self.groq_calls[0])
+            else:
+                self.groq_calls.append(now)
+                return False
+
+        self._send_json(
+            {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+            status=429,
+            headers={"Retry-After": f"{retry_after:.1f}"},
+        )
+        return True
+
+    def _send_json(self, payload, status: int = 200, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # ---------- routes ----------
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        if path.endswith("/chat/completions"):
+            if self._rate_limited():
+                return
+            # Per-model latency, e.g. --latency "groq:llama-3.1-8b-instant=0.3"
+            model_key = f"groq:{payload.get('model')}"
+            self._delay(model_key if model_key in self.latency else "groq")
+            if self._maybe_fail("groq"):
+                return
+            self._send_json(_chat_completion(payload))
+            return
+
+        self._send_json({"error": "not found"}, status=404)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/data/2.5/weather":
+            self._delay("openweather")
+            if not self._maybe_fail("openweather"):
+                self._send_json(_weather(query))
+        elif url.path == "/data/2.5/forecast":
+            self._delay("openweather")
+            if not self._maybe_fail("openweather"):
+                self._send_json(_forecast(query))
+        elif url.path == "/search":
+            self._delay("nominatim")
+            if not self._maybe_fail("nominatim"):
+                lat, lon = _coords_for(query.get("q", ""))
+                self._send_json([{"lat": str(lat), "lon": str(lon)}])
+        elif url.path.startswith("/route/v1/driving/"):
+            self._delay("osrm")
+            if not self._maybe_fail("osrm"):
+                self._send_json(_osrm(url.path.rsplit("/", 1)[-1]))
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+
+def _chat_completion(payload):
+    prompt = " ".join(str(m.get("content", "")) for m in payload.get("messages", []))
+    completion_tokens = len(STUB_REPLY.split())
+    return {
+        "id": "stub-completion",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": STUB_REPLY},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": completion_tokens,
+            "total_tokens": len(prompt.split()) + completion_tokens,
+        },
+    }
+
+
+def _weather(query):
+    return {
+        "name": query.get("q", "Stub City"),
+        "main": {"temp": 31.0, "feels_like": 33.0, "humidity": 40},
+        "weather": [{"description": "clear sky"}],
+        "wind": {"speed": 3.1},
+    }
+
+
+def _forecast(query):
+    now = int(time.time())
+    start = now - now % 10800
+    items = []
+    for i in range(40):
+        items.append({
+            "dt": start + i * 10800,
+            "main": {"temp": 24.0 + (i % 8), "humidity": 50 + (i % 5) * 5},
+            "weather": [{"description": "scattered clouds" if i % 3 else "light rain"}],
+            "wind": {"speed": 2.0 + (i % 4)},
+            "pop": 0.2 if i % 3 else 0.6,
+        })
+    return {"cod": "200", "list": items, "city": {"name": query.get("q", "Stub City")}}
+
+
+def _osrm(coords: str):
+    (lon1, lat1), (lon2, lat2) = [
+        tuple(float(x) for x in pair.split(",")) for pair in coords.split(";")
+    ]
+    distance_m = (((lat2 - lat1) ** 2 + (lon2 - lon1) ** 2) ** 0.5) * 111_000 * 1.25
+    return {
+        "code": "Ok",
+        "routes": [
+            {
+                "distance": distance_m,
+                "duration": distance_m / 15.0,
+                "geometry": {
+                    "type": "LineString",
+                    "coordinates": [[lon1, lat1], [(lon1 + lon2) / 2, (lat1 + lat2) / 2], [lon2, lat2]],
+                },
+            }
+        ],
+    }
+
+
+# =========================
+# ✅ SERVER LIFECYCLE
+# =========================
+def parse_latency(spec: Optional[str]) -> Dict[str, float]:
+    """
+    "groq=0.8,osrm=0.2" → {"groq": 0.8, "osrm": 0.2} on top of defaults.
+    """
+    latency = dict(DEFAULT_LATENCY)
+    for part in (spec or "").split(","):
+        if "=" in part:
+            name, value = part.split("=", 1)
+            latency[name.strip()] = float(value)
+    return latency
+
+
+def start_stub_server(
+    port: int = 0,
+    latency: Optional[Dict[str, float]] = None,
+    fail_rate: Optional[Dict[str, float]] = None,
+    groq_rpm: int = 0,
+) -> ThreadingHTTPServer:
+    handler = type(
+        "StubHandler",
+        (_StubHandler,),
+        {
+            "latency": latency or dict(DEFAULT_LATENCY),
+            "fail_rate": fail_rate or {},
+            "groq_rpm": groq_rpm,
+            "groq_calls": deque(),
+            "groq_lock": threading.Lock(),
+        },
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_env(server: ThreadingHTTPServer, scratch_dir: str) -> Dict[str, str]:
+    """
+    Environment variables that point the backend at the stub server.
+    The shared cache goes to a file in scratch_dir (created and removed
+    by the caller), so stub answers never land in the host-wide cache.
+    """
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return {
+        "GROQ_BASE_URL": base,
+        "OPENWEATHER_BASE_URL": base,
+        "NOMINATIM_BASE_URL": base,
+        "OSRM_BASE_URL": base,
+        "SHARED_CACHE_PATH": str(Path(scratch_dir) / "shared_cache.db"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run upstream stubs")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", help="e.g. groq=0.8,osrm=0.2 (seconds)")
+    parser.add_argument("--groq-rpm", type=int, default=0, help="answer 429 above this rate")
+    args = parser.parse_args()
+
+    srv = start_stub_server(args.port, parse_latency(args.latency), groq_rpm=args.groq_rpm)
+    scratch = tempfile.mkdtemp(prefix="travel-stubs-")
+    for key, value in stub_env(srv, scratch).items():
+        print(f"export {key}={value}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()
+        shutil.rmtree(scratch, ignore_errors=True)
@@ -0,0 +1,151 @@
+"""
+Times transit_options (RAPTOR over the compiled timetable) on a
+synthetic GTFS feed of realistic size: by default 900 stops and 120
+patterns (60 routes of 12-30 stops served both ways), half rail and
+half bus, with a trip every 20-60 minutes through the day and fares on some routes. Queries depart
+at random times between 06:00 and 20:00.
+
+    python -m benchmarks.transit_timing
+    python -m benchmarks.transit_timing --queries 200 --budget-ms 50
+
+Exit code 1 when the p95 query time is over --budget-ms.
+"""
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+CENTER = (12.97, 77.59)     # ✅ towns are spread over ~130 km around Bengaluru
+SPREAD_DEG = 0.6
+
+
+def _write(path: Path, header: List[str], rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def synthetic_feed(directory: Path, stops: int, patterns: int, seed: int = 7):
+    """
+    Writes stops / routes / trips / stop_times / fares for a grid of
+    towns, each with a railway station and a bus stand 200 m apart
+    (walking transfers). Rail routes call at stations, buses at stands.
+    """
+    rnd = random.Random(seed)
+    towns = stops // 2
+    side = int(towns ** 0.5)
+    step = 2 * SPREAD_DEG / side
+    coords = []
+    for i in range(towns):
+        lat = CENTER[0] - SPREAD_DEG + (i // side) * step
+        lon = CENTER[1] - SPREAD_DEG + (i % side) * step
+        coords += [(lat, lon), (lat + 0.0018, lon)]
+    _write(directory / "stops.txt", ["stop_id", "stop_name", "stop_lat", "stop_lon"],
+           ((f"S{i}", f"{'Station' if i % 2 == 0 else 'Bus Stand'} {i // 2}", f"{lat:.5f}", f"{lon:.5f}")
+            for i, (lat, lon) in enumerate(coords)))
+
+    route_rows, trip_rows, time_rows, fare_rows, rule_rows = [], [], [], [], []
+    for r in range(patterns // 2):
+        rail = r % 2 == 0
+        route_rows.append((f"R{r}", f"{'Exp' if rail else 'Bus'} {r}", "2" if rail else "3"))
+        if r % 3 == 0:
+            fare_rows.append((f"F{r}", f"{rnd.randint(20, 300)}.0", "INR", "0", ""))
+            rule_rows.append((f"F{r}", f"R{r}"))
+
+        # A line wandering across the grid of towns
+        line = [rnd.randrange(side * side)]
+        length = rnd.randint(12, 30)
+        while len(line) < length:
+            row, col = divmod(line[-1], side)
+            row = min(side - 1, max(0, row + rnd.choice((-1, 0, 1, 1))))
+            col = min(side - 1, max(0, col + rnd.choice((-1, 0, 1, 1))))
+            town = row * side + col
+            if town not in line:
+                line.append(town)
+            elif rnd.random() < 0.1:
+                break
+        line = [2 * town + (0 if rail else 1) for town in line]
+
+        # Served both ways: two patterns per route
+        hop_s = 300 if rail else 480
+        headway = rnd.choice((1200, 1800, 2700, 3600))
+        for direction, calls in enumerate((line, line[::-1])):
+            for t, first in enumerate(range(5 * 3600, 23 * 3600, headway)):
+                trip = f"R{r}D{direction}T{t}"
+                trip_rows.append((f"R{r}", "DAILY", trip))
+                for seq, s in enumerate(calls):
+                    clock = first + seq * hop_s
+                    hms = f"{clock // 3600:02d}:{clock % 3600 // 60:02d}:{clock % 60:02d}"
+                    time_rows.append((trip, hms, hms, f"S{s}", seq + 1))
+
+    _write(directory / "routes.txt", ["route_id", "route_short_name", "route_type"], route_rows)
+    _write(directory / "trips.txt", ["route_id", "service_id", "trip_id"], trip_rows)
+    _write(directory / "stop_times.txt",
+           ["trip_id", "arrival_time", "departure_time", "stop_id", "stop_sequence"], time_rows)
+    _write(directory / "fare_attributes.txt",
+           ["fare_id", "price", "currency_type", "payment_method", "transfers"], fare_rows)
+    _write(directory / "fare_rules.txt", ["fare_id", "route_id"], rule_rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="transit_options timing on a synthetic feed")
+    parser.add_argument("--stops", type=int, default=900)
+    parser.add_argument("--patterns", type=int, default=120)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="allowed p95 per query")
+    args = parser.parse_args(argv)
+
+    work = Path(tempfile.mkdtemp(prefix="bench-transit-"))
+    feed_dir, out_dir = work / "gtfs", work / "transit"
+    feed_dir.mkdir()
+    synthetic_feed(feed_dir, args.stops, args.patterns)
+
+    # TRANSIT_DIR is read when the module is imported
+    os.environ["TRANSIT_DIR"] = str(out_dir)
+    from backend.build_transit import build_transit
+    from backend.tools import transit
+
+    build_transit([feed_dir], out_dir)
+    transit.get_timetable()
+
+    rnd = random.Random(11)
+    points = [
+        (CENTER[0] + rnd.uniform(-SPREAD_DEG, SPREAD_DEG), CENTER[1] + rnd.uniform(-SPREAD_DEG, SPREAD_DEG))
+        for _ in range(2 * args.queries)
+    ]
+
+    # Departures spread over the service day, in the feed's time zone
+    morning = datetime(2026, 1, 5, 6, 0, tzinfo=transit.TRANSIT_TZ)
+    departures = [morning + timedelta(minutes=rnd.randrange(14 * 60)) for _ in range(args.queries)]
+
+    timings, answered = [], 0
+    for src, dst, at in zip(points[::2], points[1::2], departures):
+        start = time.perf_counter()
+        options = transit.transit_options("A", "B", src, dst, at)
+        timings.append((time.perf_counter() - start) * 1000)
+        answered += options is not None
+
+    timings.sort()
+    p95 = timings[int(0.95 * (len(timings) - 1))]
+    print(
+        f"transit_options: {len(timings)} queries, {answered} answered, "
+        f"median {statistics.median(timings):.1f} ms, p95 {p95:.1f} ms, max {timings[-1]:.1f} ms"
+    )
+
+    if p95 > args.budget_ms:
+        print(f"❌ p95 over the {args.budget_ms:.0f} ms budget")
+        return 1
+    print(f"✅ p95 within the {args.budget_ms:.0f} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
+import time
 import requests
 
 BASE_URL = "http://127.0.0.1:8000"
+JOB_POLL_INTERVAL = 1.0
+JOB_TIMEOUT = 180
 
 
 def api_chat(session_id: str, message: str, name: str | None = None):
@@ -21,6 +24,7 @@ def api_generate_itinerary(
     budget: float,
     interests,
     food_preferences: str | None,
+    start_date: str | None = None,
 ):
     payload = {
         "session_id": session_id,
@@ -29,7 +33,24 @@ def api_generate_itinerary(
         "budget": budget,
         "interests": interests,
         "food_preferences": food_preferences,
+        "start_date": start_date,
     }
-    res = requests.post(f"{BASE_URL}/generate_itinerary", json=payload, timeout=60)
+    # Submit as a background job, then poll until it finishes
+    res = requests.post(f"{BASE_URL}/itinerary_jobs", json=payload, timeout=10)
     res.raise_for_status()
-    return res.json()
+    job = res.json()
+
+    deadline = time.time() + JOB_TIMEOUT
+    while job["status"] in ("queued", "running"):
+        if time.time() > deadline:
+            raise TimeoutError("Itinerary generation timed out")
+
+        time.sleep(JOB_POLL_INTERVAL)
+        res = requests.get(f"{BASE_URL}/itinerary_jobs/{job['job_id']}", timeout=10)
+        res.raise_for_status()
+        job = res.json()
+
+    if job["status"] == "failed":
+        raise RuntimeError(job.get("error") or "Itinerary generation failed")
+
+    return {"itinerary_text": job["itinerary_text"]}
@@ -1,4 +1,5 @@
 import uuid
+from datetime import date
 import streamlit as st
 import requests
 from api_client import api_chat, api_generate_itinerary
@@ -83,6 +84,7 @@ with st.sidebar:
     st.header("🧭 Trip Preferences")
 
     destination = st.text_input("Destination city", value="Goa")
+    start_date = st.date_input("Start date", value=date.today())
     days = st.number_input("Days", min_value=1, max_value=10, value=3)
     budget = st.number_input("Total budget (₹)", min_value=100.0, value=500.0)
 
@@ -110,6 +112,7 @@ with st.sidebar:
                     float(budget),
                     interests,
                     food_pref,
+                    start_date.isoformat(),
                 )
                 st.session_state.itinerary_text = res["itinerary_text"]
             st.success("Itinerary Ready ✅")
@@ -266,6 +269,9 @@ with tab2:
             f"🚦 Travel options from **{route_origin} → {route_destination}**"
         )
 
+        if routes["recommended"].get("engine") in ("haversine", "estimate"):
+            st.caption("⚠️ Road routing is unavailable right now, distances are approximate.")
+
         def route_card(title, badge, icon, route_data):
             hours = route_data["total_time_min"] // 60
             mins = route_data["total_time_min"] % 60